@@ -0,0 +1,28 @@
+"""event synced_hash
+
+Revision ID: 3b9d2f61c0a4
+Revises: 66de4c77509b
+Create Date: 2026-10-16 09:12:04.118220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9d2f61c0a4'
+down_revision: Union[str, Sequence[str], None] = '66de4c77509b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column('synced_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('events', 'synced_hash')
@@ -0,0 +1,30 @@
+"""unique_location coordinates
+
+Revision ID: 5e0f8b3a7c26
+Revises: d27a5c9e4b18
+Create Date: 2026-10-16 14:22:09.881517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0f8b3a7c26'
+down_revision: Union[str, Sequence[str], None] = 'd27a5c9e4b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('unique_locations', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('unique_locations', sa.Column('longitude', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('unique_locations', 'longitude')
+    op.drop_column('unique_locations', 'latitude')
@@ -0,0 +1,48 @@
+"""teamsnap outbox
+
+Revision ID: 8c41e7a2d5f3
+Revises: 3b9d2f61c0a4
+Create Date: 2026-10-16 11:40:27.502913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c41e7a2d5f3'
+down_revision: Union[str, Sequence[str], None] = '3b9d2f61c0a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('teamsnap_outbox',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('job_id', sa.String(length=36), nullable=False),
+    sa.Column('club_id', sa.String(length=36), nullable=True),
+    sa.Column('kind', sa.String(length=32), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('idempotency_key', sa.String(length=255), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('available_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('idempotency_key', name='uq_outbox_idempotency_key')
+    )
+    op.create_index('ix_outbox_job', 'teamsnap_outbox', ['job_id'], unique=False)
+    op.create_index('ix_outbox_status_available', 'teamsnap_outbox', ['status', 'available_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outbox_status_available', table_name='teamsnap_outbox')
+    op.drop_index('ix_outbox_job', table_name='teamsnap_outbox')
+    op.drop_table('teamsnap_outbox')
@@ -0,0 +1,65 @@
+"""hot path indexes and unique keys
+
+Revision ID: a4c7e19b3d62
+Revises: 5e0f8b3a7c26
+Create Date: 2026-10-16 16:05:41.203318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c7e19b3d62'
+down_revision: Union[str, Sequence[str], None] = '5e0f8b3a7c26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _assert_no_duplicates(table: str, columns: Sequence[str]) -> None:
+    cols = ", ".join(columns)
+    duplicates = op.get_bind().execute(
+        sa.text(f"SELECT {cols}, COUNT(*) FROM {table} GROUP BY {cols} HAVING COUNT(*) > 1")
+    ).fetchall()
+    if duplicates:
+        raise RuntimeError(
+            f"{len(duplicates)} duplicate ({cols}) groups in {table}, e.g. "
+            f"{tuple(duplicates[0])}; merge them before adding the unique key"
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _assert_no_duplicates('opponents', ['team_id', 'name'])
+    _assert_no_duplicates('unique_teams', ['name', 'division_id'])
+
+    op.create_index('ix_events_start_opponent_location', 'events', ['start_date', 'opponent_id', 'location_id'], unique=False)
+    op.create_index('ix_events_uploaded_team', 'events', ['uploaded', 'team_id'], unique=False)
+    op.create_index('ix_locations_team_name', 'locations', ['team_id', 'name'], unique=False)
+    op.create_index('ix_locations_team_address', 'locations', ['team_id', 'address'], unique=False)
+    op.create_index('ix_locations_team_url', 'locations', ['team_id', 'url'], unique=False)
+    op.create_index('ix_unique_locations_name', 'unique_locations', ['name'], unique=False)
+    op.create_index('ix_unique_locations_address', 'unique_locations', ['address'], unique=False)
+    op.create_index('ix_unique_locations_url', 'unique_locations', ['url'], unique=False)
+    with op.batch_alter_table('opponents') as batch_op:
+        batch_op.create_unique_constraint('uq_opponents_team_name', ['team_id', 'name'])
+    with op.batch_alter_table('unique_teams') as batch_op:
+        batch_op.create_unique_constraint('uq_unique_teams_name_division', ['name', 'division_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('unique_teams') as batch_op:
+        batch_op.drop_constraint('uq_unique_teams_name_division', type_='unique')
+    with op.batch_alter_table('opponents') as batch_op:
+        batch_op.drop_constraint('uq_opponents_team_name', type_='unique')
+    op.drop_index('ix_unique_locations_url', table_name='unique_locations')
+    op.drop_index('ix_unique_locations_address', table_name='unique_locations')
+    op.drop_index('ix_unique_locations_name', table_name='unique_locations')
+    op.drop_index('ix_locations_team_url', table_name='locations')
+    op.drop_index('ix_locations_team_address', table_name='locations')
+    op.drop_index('ix_locations_team_name', table_name='locations')
+    op.drop_index('ix_events_uploaded_team', table_name='events')
+    op.drop_index('ix_events_start_opponent_location', table_name='events')
@@ -0,0 +1,60 @@
+"""refresh token store
+
+Revision ID: b6e2d9f41a07
+Revises: a4c7e19b3d62
+Create Date: 2026-10-16 23:20:14.518207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e2d9f41a07'
+down_revision: Union[str, Sequence[str], None] = 'a4c7e19b3d62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('refresh_tokens',
+    sa.Column('jti', sa.String(length=32), nullable=False),
+    sa.Column('family_id', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('parent_jti', sa.String(length=32), nullable=True),
+    sa.Column('issued_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('used_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('revoked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('jti')
+    )
+    op.create_index('ix_refresh_tokens_expires_at', 'refresh_tokens', ['expires_at'], unique=False)
+    op.create_index('ix_refresh_tokens_family', 'refresh_tokens', ['family_id'], unique=False)
+    op.create_index('ix_refresh_tokens_parent', 'refresh_tokens', ['parent_jti'], unique=False)
+    op.create_index('ix_refresh_tokens_user', 'refresh_tokens', ['user_id'], unique=False)
+    op.create_table('revoked_sessions',
+    sa.Column('family_id', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('reason', sa.String(length=32), nullable=True),
+    sa.Column('revoked_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('family_id')
+    )
+    op.create_index('ix_revoked_sessions_expires_at', 'revoked_sessions', ['expires_at'], unique=False)
+    op.create_index('ix_revoked_sessions_revoked_at', 'revoked_sessions', ['revoked_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_revoked_sessions_revoked_at', table_name='revoked_sessions')
+    op.drop_index('ix_revoked_sessions_expires_at', table_name='revoked_sessions')
+    op.drop_table('revoked_sessions')
+    op.drop_index('ix_refresh_tokens_user', table_name='refresh_tokens')
+    op.drop_index('ix_refresh_tokens_parent', table_name='refresh_tokens')
+    op.drop_index('ix_refresh_tokens_family', table_name='refresh_tokens')
+    op.drop_index('ix_refresh_tokens_expires_at', table_name='refresh_tokens')
+    op.drop_table('refresh_tokens')
@@ -0,0 +1,28 @@
+"""teamsnap token expiry index
+
+Revision ID: c3f8a1e6d920
+Revises: b6e2d9f41a07
+Create Date: 2026-10-16 23:48:37.092615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f8a1e6d920'
+down_revision: Union[str, Sequence[str], None] = 'b6e2d9f41a07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_teamsnap_access_expires', 'teamsnap_accounts', ['access_token_expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_teamsnap_access_expires', table_name='teamsnap_accounts')
@@ -0,0 +1,28 @@
+"""oauth state expiry index
+
+Revision ID: e94b7c2f5d18
+Revises: c3f8a1e6d920
+Create Date: 2026-10-17 00:21:09.448130
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e94b7c2f5d18'
+down_revision: Union[str, Sequence[str], None] = 'c3f8a1e6d920'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_oauth_state_expires_at', 'oauth_state', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_oauth_state_expires_at', table_name='oauth_state')
@@ -0,0 +1,44 @@
+"""unique_location coordinates_updated_at
+
+Revision ID: f2a7d4c81b39
+Revises: e94b7c2f5d18
+Create Date: 2026-10-17 09:12:47.305118
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a7d4c81b39'
+down_revision: Union[str, Sequence[str], None] = 'e94b7c2f5d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('unique_locations', sa.Column('coordinates_updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_unique_locations_coordinates_updated_at', 'unique_locations', ['coordinates_updated_at'], unique=False)
+    # Bound in UTC like the app's own stamps (CURRENT_TIMESTAMP is session-local on MySQL)
+    unique_locations = sa.table(
+        'unique_locations',
+        sa.column('coordinates_updated_at', sa.DateTime(timezone=True)),
+        sa.column('latitude', sa.Float),
+        sa.column('longitude', sa.Float),
+    )
+    op.execute(
+        unique_locations.update()
+        .where(unique_locations.c.latitude.isnot(None))
+        .where(unique_locations.c.longitude.isnot(None))
+        .values(coordinates_updated_at=datetime.now(timezone.utc))
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_unique_locations_coordinates_updated_at', table_name='unique_locations')
+    op.drop_column('unique_locations', 'coordinates_updated_at')
@@ -1,34 +1,93 @@
 from __future__ import annotations
-import os
+from importlib import import_module
+from typing import Callable, Dict, Optional
+import threading
+
 from flask import Flask
-from dotenv import load_dotenv
 
-from app.config import Config
+from app.config import Config  # loads .env
 from .logging_cfg import configure_logging
 # Remove CORS import since AWS Lambda Function URL will handle it
 # from flask_cors import CORS
 
+# URL prefix (under API_PREFIX) -> "module:blueprint"
+BLUEPRINTS: Dict[str, str] = {
+    "/clubs": "app.api.clubs:bp",
+    "/health": "app.api.health:bp",
+    "/sync": "app.api.sync:bp",
+    "/auth/teamsnap": "app.api.teamsnap:bp",
+    "/users": "app.api.users:bp",
+}
+
 
-def create_app() -> Flask:
-    # Load env before creating the app (so Config can read it)
-    load_dotenv()
+def _base_app() -> Flask:
     configure_logging()
 
     app = Flask(__name__)
     app.config.from_object(Config)
-    
+
     # CORS is handled by AWS Lambda Function URL configuration
     # No need for Flask-CORS when using Lambda Function URLs
 
-    # Blueprints
-    from app.api.clubs import bp as clubs_bp
-    from app.api.health import bp as health_bp
-    from app.api.teamsnap import bp as teamsnap_bp
-    from app.api.users import bp as users_bp
+    # Carry the read-your-writes window of requests that wrote to the DB
+    from app.db.routing import set_sticky_cookie
+
+    app.after_request(set_sticky_cookie)
+    return app
+
+
+def _register(app: Flask, prefix: str) -> None:
+    module_name, attr = BLUEPRINTS[prefix].split(":")
+    blueprint = getattr(import_module(module_name), attr)
+    app.register_blueprint(blueprint, url_prefix=f"{Config.API_PREFIX}{prefix}")
+
+
+class LazyBlueprintApp:
+    """
+    WSGI app for cold starts: nothing under app.api is imported until the
+    first request for its URL prefix. Each prefix then gets its own Flask
+    app with just that blueprint, so e.g. a health check never pays for
+    SQLAlchemy, bcrypt or cryptography.
+    """
+
+    def __init__(self, factory: Callable[[], Flask] = _base_app):
+        self._factory = factory
+        self._apps: Dict[Optional[str], Flask] = {}
+        self._lock = threading.Lock()
+        self._prefixes = sorted(BLUEPRINTS, key=len, reverse=True)
+
+    def _prefix_for(self, path: str) -> Optional[str]:
+        for prefix in self._prefixes:
+            full = f"{Config.API_PREFIX}{prefix}"
+            if path == full or path.startswith(full + "/"):
+                return prefix
+        return None
+
+    def app_for(self, prefix: Optional[str]) -> Flask:
+        app = self._apps.get(prefix)
+        if app is None:
+            with self._lock:
+                app = self._apps.get(prefix)
+                if app is None:
+                    app = self._factory()
+                    if prefix is not None:
+                        _register(app, prefix)
+                    self._apps[prefix] = app
+        return app
+
+    def __call__(self, environ, start_response):
+        prefix = self._prefix_for(environ.get("PATH_INFO", ""))
+        return self.app_for(prefix)(environ, start_response)
 
-    app.register_blueprint(clubs_bp, url_prefix=f"{Config.API_PREFIX}/clubs")
-    app.register_blueprint(health_bp, url_prefix=f"{Config.API_PREFIX}/health")
-    app.register_blueprint(teamsnap_bp, url_prefix=f"{Config.API_PREFIX}/auth/teamsnap")
-    app.register_blueprint(users_bp, url_prefix=f"{Config.API_PREFIX}/users")
 
+def create_app(lazy: bool = False):
+    """
+    The Flask app with every blueprint registered, or with lazy=True a
+    LazyBlueprintApp that imports each blueprint on its first request.
+    """
+    if lazy:
+        return LazyBlueprintApp()
+    app = _base_app()
+    for prefix in BLUEPRINTS:
+        _register(app, prefix)
     return app
@@ -1,3 +1,5 @@
+import sys
+
 from flask import Blueprint, jsonify
 
 bp = Blueprint("health", __name__)
@@ -5,4 +7,23 @@ bp = Blueprint("health", __name__)
 
 @bp.route("", methods=["GET"], strict_slashes=False)
 def health():
-    return jsonify(status="ok")
+    body = {"status": "ok"}
+    # Only report DB stats once something else loaded the DB layer, so a
+    # health check on a cold instance doesn't import SQLAlchemy.
+    if "app.db.engine" in sys.modules:
+        from app.db.engine import pool_stats
+        from app.db.routing import get_router
+
+        body.update(db_pool=pool_stats(), db_routes=get_router().stats())
+    # Likewise for the password hasher, once a login/signup has run
+    if "app.security.passwords" in sys.modules:
+        from app.security.auth_metrics import auth_latency_stats
+        from app.security.passwords import get_password_hasher
+        from app.security.rate_limit import get_auth_limiter
+
+        body.update(
+            auth_latency=auth_latency_stats(),
+            password_hasher=get_password_hasher().stats(),
+            auth_limits=get_auth_limiter().stats(),
+        )
+    return jsonify(body)
@@ -0,0 +1,73 @@
+from flask import Blueprint, g, jsonify
+from app.api.utils import require_user
+from app.db.session import get_session
+from app.db.models import Club, OutboxMessage, Team
+import logging
+
+bp = Blueprint("sync", __name__)
+logger = logging.getLogger(__name__)
+
+
+@bp.post("/clubs/<club_id>")
+@require_user
+def sync_club(club_id: str):
+    """
+    Queues a TeamSnap sync of every team in the club and returns immediately.
+    The work is done by the outbox worker; poll /sync/jobs/<job_id>.
+    """
+    uid = g.user_id
+
+    # Deferred: pulls in the TeamSnap client and sync services
+    from app.services.outbox_worker import enqueue_club_sync
+
+    with get_session(sticky_key=uid) as db:
+        club = db.get(Club, club_id)
+        if club is None or club.user_id != uid:
+            return jsonify({"ok": False, "error": "club not found"}), 404
+        job_id = enqueue_club_sync(db, club_id)
+
+    logger.info(f"Queued sync job {job_id} for club {club_id}")
+    return jsonify({"ok": True, "job_id": job_id}), 202
+
+
+@bp.post("/teams/<int:team_id>")
+@require_user
+def sync_team(team_id: int):
+    """
+    Queues a TeamSnap sync of one team and returns immediately.
+    """
+    uid = g.user_id
+
+    from app.services.outbox_worker import enqueue_team_sync
+
+    with get_session(sticky_key=uid) as db:
+        team = db.get(Team, team_id)
+        if team is None or team.club is None or team.club.user_id != uid:
+            return jsonify({"ok": False, "error": "team not found"}), 404
+        job_id = enqueue_team_sync(db, team_id, club_id=team.club_id)  # type: ignore
+
+    logger.info(f"Queued sync job {job_id} for team {team_id}")
+    return jsonify({"ok": True, "job_id": job_id}), 202
+
+
+@bp.get("/jobs/<job_id>")
+@require_user
+def job_progress(job_id: str):
+    """
+    Returns message counts per status and overall progress for a job in
+    one of the caller's clubs.
+    """
+    uid = g.user_id
+
+    with get_session(read_only=True, sticky_key=uid) as db:
+        # Jobs in someone else's club look the same as unknown ones
+        club_ids = OutboxMessage.job_club_ids(db, job_id)
+        if not club_ids or None in club_ids:
+            return jsonify({"ok": False, "error": "job not found"}), 404
+        owned = db.query(Club.id).filter(Club.id.in_(club_ids), Club.user_id == uid).count()
+        if owned != len(club_ids):
+            return jsonify({"ok": False, "error": "job not found"}), 404
+        progress = OutboxMessage.job_progress(db, job_id)
+    if progress is None:
+        return jsonify({"ok": False, "error": "job not found"}), 404
+    return jsonify({"ok": True, **progress})
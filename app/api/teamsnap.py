@@ -111,6 +111,11 @@ def teamsnap_callback():
 
         # Cleanup state
         db.delete(st)
+
+        # Sync workers in this process must not keep using the old token
+        from app.services.teamsnap_tokens import forget_club_token  # deferred: sync services
+
+        forget_club_token(club.id)  # type: ignore
         logger.info(
             f"Created Club id={club.id} name={club.name!r} with TeamSnapAccount id={tsa.id} user_id={teamsnap_user_id}"
         )
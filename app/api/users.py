@@ -1,20 +1,26 @@
 # app/api/users.py
 from __future__ import annotations
-from datetime import datetime, timezone
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
 
 from flask import Blueprint, request, jsonify, make_response
 
+from app.api.utils import access_token_from_request, current_user_id
 from app.config import Config
 from app.db.session import get_session
-from app.db.models import User
+from app.db.models import RefreshToken, RevokedSession, User
+from app.db.models.refresh_token import INVALID, REUSED
 from app.security.auth import (
-    hash_password,
-    verify_password,
     make_access_token,
     make_refresh_token,
     decode_token,
 )
+from app.security.auth_metrics import timed
+from app.security.passwords import HasherBusy, get_password_hasher
+from app.security.rate_limit import get_auth_limiter
+from app.security.revocation import get_revocation_list
+from app.security.token_cache import forget_token
+from app.security.user_cache import get_user_profile
 import logging
 
 logger = logging.getLogger(__name__)
@@ -66,32 +72,38 @@ def _current_user_id_from_request() -> Optional[int]:
     Reads the access token from Authorization: Bearer ... or HttpOnly cookie.
     Returns user_id (int) or None.
     """
-    auth = request.headers.get("Authorization", "")
-    token = auth[7:] if auth.startswith("Bearer ") else None
-    logger.info(f"Authorization header token: {'***' if token else 'None'}")
+    return current_user_id()
 
-    if not token:
-        token = request.cookies.get("access_token")
-        logger.info(f"Cookie access_token: {'***' if token else 'None'}")
 
-    if not token:
-        logger.info("No token found in headers or cookies")
-        return None
+def _start_session(db, user_id: int) -> Tuple[str, str]:
+    """Starts a refresh-token family; returns (access, refresh) JWTs."""
+    token = RefreshToken.issue(db, user_id, timedelta(days=Config.JWT_REFRESH_TTL_DAYS))
+    return _tokens_for(token)
 
-    payload = decode_token(token)
-    logger.info(f"Token payload: {payload}")
 
-    if not payload or payload.get("typ") != "access":
-        logger.warning(f"Invalid token payload or wrong type: {payload}")
-        return None
+def _tokens_for(token: RefreshToken) -> Tuple[str, str]:
+    access = make_access_token(token.user_id, sid=token.family_id)  # type: ignore
+    refresh = make_refresh_token(token.user_id, token.jti, token.family_id)  # type: ignore
+    return access, refresh
+
+
+def _revoke_session(family_id: str, user_id: Optional[int], reason: str) -> None:
+    keep_for = timedelta(minutes=Config.JWT_ACCESS_TTL_MIN)
+    with get_session(sticky_key=user_id) as db:
+        RevokedSession.revoke(db, family_id, keep_for, user_id=user_id, reason=reason)
+    get_revocation_list().add(family_id, datetime.now(timezone.utc) + keep_for)
+
+
+def _too_many_attempts(wait: float):
+    resp = make_response(jsonify({"ok": False, "error": "too many attempts"}), 429)
+    resp.headers["Retry-After"] = str(max(1, int(wait + 0.999)))
+    return resp
 
-    try:
-        user_id = int(payload["sub"])
-        logger.info(f"Extracted user_id: {user_id}")
-        return user_id
-    except Exception as e:
-        logger.error(f"Error extracting user_id from payload: {e}")
-        return None
+
+def _hasher_busy():
+    resp = make_response(jsonify({"ok": False, "error": "busy, try again"}), 503)
+    resp.headers["Retry-After"] = "1"
+    return resp
 
 
 # ------------ Endpoints ------------
@@ -103,6 +115,11 @@ def signup():
     Body: { "email": "...", "password": "...", "username": "..." }
     Returns 201 + sets HttpOnly cookies (access/refresh).
     """
+    with timed("signup"):
+        return _signup()
+
+
+def _signup():
     data = request.get_json(force=True) or {}
     email = (data.get("email") or "").strip().lower()
     password = data.get("password") or ""
@@ -111,6 +128,10 @@ def signup():
     if not email or not password or not username:
         return jsonify({"error": "email, password, and username are required"}), 400
 
+    wait = get_auth_limiter().check(request.remote_addr)
+    if wait is not None:
+        return _too_many_attempts(wait)
+
     with get_session() as db:
         existing_email = db.query(User).filter_by(email=email).first()
         if existing_email:
@@ -120,16 +141,20 @@ def signup():
         if existing_username:
             return jsonify({"error": "username already taken"}), 409
 
-        user = User(
-            email=email, username=username, password_hash=hash_password(password)
-        )
+        try:
+            with timed("signup.hash"):
+                password_hash = get_password_hasher().hash(password)
+        except HasherBusy as e:
+            logger.warning(f"Signup shed for {email}: {e}")
+            return _hasher_busy()
+
+        user = User(email=email, username=username, password_hash=password_hash)
         db.add(user)
         db.flush()  # get user.id
 
         user.last_login_at = datetime.now(timezone.utc)  # type: ignore
 
-        access = make_access_token(user.id)  # type: ignore
-        refresh = make_refresh_token(user.id)  # type: ignore
+        access, refresh = _start_session(db, user.id)  # type: ignore
 
         resp = make_response(
             jsonify(
@@ -150,6 +175,11 @@ def login():
     Body: { "email": "...", "password": "..." }
     Returns 200 + sets HttpOnly cookies (access/refresh).
     """
+    with timed("login"):
+        return _login()
+
+
+def _login():
     data = request.get_json(force=True) or {}
     email = (data.get("email") or "").strip().lower()
     password = data.get("password") or ""
@@ -160,16 +190,35 @@ def login():
         logger.warning("Login failed: missing email or password")
         return jsonify({"ok": False, "error": "email and password are required"}), 400
 
+    limiter = get_auth_limiter()
+    wait = limiter.check(request.remote_addr, email)
+    if wait is not None:
+        return _too_many_attempts(wait)
+
     with get_session() as db:
         user = db.query(User).filter_by(email=email).first()
-        if not user or not verify_password(password, user.password_hash):  # type: ignore
+        ok, new_hash = False, None
+        if user:
+            try:
+                with timed("login.verify"):
+                    ok, new_hash = get_password_hasher().verify_and_update(
+                        password, user.password_hash  # type: ignore
+                    )
+            except HasherBusy as e:
+                logger.warning(f"Login shed for {email}: {e}")
+                return _hasher_busy()
+        if not ok:
             logger.warning(f"Login failed: invalid credentials for {email}")
             return jsonify({"ok": False, "error": "invalid credentials"}), 401
 
+        limiter.succeeded(email)
+        if new_hash:
+            # Stored at an old bcrypt cost; upgrade now that we have the password
+            user.password_hash = new_hash  # type: ignore
+
         user.last_login_at = datetime.now(timezone.utc)  # type: ignore
 
-        access = make_access_token(user.id)  # type: ignore
-        refresh = make_refresh_token(user.id)  # type: ignore
+        access, refresh = _start_session(db, user.id)  # type: ignore
 
         logger.info(f"Login successful for user {user.id} ({email})")
 
@@ -189,15 +238,21 @@ def login():
 @bp.post("/refresh")
 def refresh():
     """
-    Uses refresh_token cookie to mint a new access_token.
-    Returns 200 + sets a new access token cookie (refresh remains the same).
+    Spends the refresh_token cookie and sets a new access and refresh token
+    pair. A refresh token that was already spent revokes its whole session.
     """
+    with timed("refresh"):
+        return _refresh()
+
+
+def _refresh():
     rtoken = request.cookies.get("refresh_token")
     if not rtoken:
         return jsonify({"error": "no refresh token"}), 401
 
     payload = decode_token(rtoken)
-    if not payload or payload.get("typ") != "refresh":
+    if not payload or payload.get("typ") != "refresh" or not payload.get("jti"):
+        # Tokens from before rotation carry no jti; those users log in again
         return jsonify({"error": "invalid refresh token"}), 401
 
     try:
@@ -205,57 +260,82 @@ def refresh():
     except Exception:
         return jsonify({"error": "invalid refresh token"}), 401
 
-    access = make_access_token(user_id)
+    with get_session(sticky_key=user_id) as db:
+        outcome, child = RefreshToken.rotate(
+            db,
+            payload["jti"],
+            ttl=timedelta(days=Config.JWT_REFRESH_TTL_DAYS),
+            grace=timedelta(seconds=Config.REFRESH_REUSE_GRACE_SEC),
+            revoke_for=timedelta(minutes=Config.JWT_ACCESS_TTL_MIN),
+        )
+        tokens = _tokens_for(child) if child is not None else None
+
+    if outcome == REUSED:
+        get_revocation_list().add(
+            payload.get("sid", ""),
+            datetime.now(timezone.utc) + timedelta(minutes=Config.JWT_ACCESS_TTL_MIN),
+        )
+    if outcome in (INVALID, REUSED) or tokens is None:
+        resp = make_response(jsonify({"error": "invalid refresh token"}), 401)
+        return _clear_auth_cookies(resp)
+
+    access, new_refresh = tokens
     resp = make_response(jsonify({"access_refreshed": True, "ok": True}))
-    # Keep the same refresh cookie; only rotate if you want sliding sessions
-    return _set_auth_cookies(resp, access, rtoken)
+    return _set_auth_cookies(resp, access, new_refresh)
 
 
 @bp.get("/me")
 def me():
     """
     Returns the current user's profile (via access token).
+    Served from the token and profile caches once warm.
     """
-    logger.info("GET /me endpoint called")
+    with timed("me"):
+        return _me()
 
-    # Log cookies for debugging
-    cookies = request.cookies
-    logger.info(f"Cookies received: {dict(cookies)}")
 
+def _me():
     uid = _current_user_id_from_request()
-    logger.info(f"User ID from request: {uid}")
-
     if not uid:
-        logger.info("No valid user ID found, returning unauthenticated")
         return jsonify({"authenticated": False}), 200
 
-    with get_session() as db:
-        u = db.get(User, uid)
-        if not u:
-            # token valid but user deleted
-            logger.warning(f"Token valid but user {uid} not found in database")
-            resp = make_response(jsonify({"authenticated": False}))
-            return _clear_auth_cookies(resp)
-
-        logger.info(f"User {uid} authenticated successfully")
-        return jsonify(
-            {
-                "authenticated": True,
-                "ok": True,
-                "id": u.id,
-                "email": u.email,
-                "username": u.username,
-                "last_login_at": (
-                    u.last_login_at.isoformat() if u.last_login_at else None  # type: ignore
-                ),
-            }
-        )
+    profile = get_user_profile(uid)
+    if profile is None:
+        # token valid but user deleted
+        logger.warning(f"Token valid but user {uid} not found in database")
+        resp = make_response(jsonify({"authenticated": False}))
+        return _clear_auth_cookies(resp)
+
+    last_login_at = profile["last_login_at"]
+    return jsonify(
+        {
+            "authenticated": True,
+            "ok": True,
+            "id": profile["id"],
+            "email": profile["email"],
+            "username": profile["username"],
+            "last_login_at": last_login_at.isoformat() if last_login_at else None,
+        }
+    )
 
 
 @bp.post("/logout")
 def logout():
     """
-    Clears auth cookies.
+    Revokes the session (its refresh tokens and any access tokens minted
+    from it) and clears auth cookies.
     """
+    token = access_token_from_request()
+    if token:
+        forget_token(token)
+    payload = decode_token(request.cookies.get("refresh_token") or "")
+    if not payload and token:
+        payload = decode_token(token)
+    if payload and payload.get("sid"):
+        try:
+            user_id: Optional[int] = int(payload["sub"])
+        except Exception:
+            user_id = None
+        _revoke_session(payload["sid"], user_id, reason="logout")
     resp = make_response(jsonify({"ok": True}))
     return _clear_auth_cookies(resp)
@@ -1,22 +1,155 @@
-from flask import current_app
-from cryptography.fernet import Fernet
-import base64, hashlib, os
+from __future__ import annotations
+from flask import current_app, g, jsonify, request
+from functools import wraps
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
+import base64, hashlib, os, threading
 
+if TYPE_CHECKING:
+    from cryptography.fernet import Fernet, MultiFernet
 
-def _get_fernet() -> Fernet:
-    # Derive a key from an env var (rotateable)
-    secret = os.environ["TOKEN_ENC_SECRET"].encode("utf-8")  # 32+ chars recommended
-    key = base64.urlsafe_b64encode(hashlib.sha256(secret).digest())
+
+def keyring_secrets() -> List[str]:
+    """
+    Token encryption secrets, newest first. TOKEN_ENC_SECRETS is a
+    comma-separated keyring for rotation: prepend the new secret, run the
+    re-encryption job, then drop the old one. Falls back to the single
+    TOKEN_ENC_SECRET.
+    """
+    raw = os.environ.get("TOKEN_ENC_SECRETS") or os.environ["TOKEN_ENC_SECRET"]
+    secrets = [s.strip() for s in raw.split(",") if s.strip()]
+    if not secrets:
+        raise KeyError("TOKEN_ENC_SECRETS is empty")
+    return secrets
+
+
+def _derive_fernet(secret: str) -> Fernet:
+    from cryptography.fernet import Fernet  # deferred: heavy on cold start
+
+    # 32+ chars recommended
+    key = base64.urlsafe_b64encode(hashlib.sha256(secret.encode("utf-8")).digest())
     return Fernet(key)
 
 
+# (secrets it was built from, primary-key-only Fernet, full keyring)
+_cipher: Optional[Tuple[Tuple[str, ...], Fernet, MultiFernet]] = None
+_cipher_lock = threading.Lock()
+
+
+def _get_ciphers() -> Tuple[Fernet, MultiFernet]:
+    """
+    Cached per process and rebuilt only when the configured keyring changes,
+    so encrypt/decrypt don't derive keys on every call.
+    """
+    from cryptography.fernet import MultiFernet
+
+    global _cipher
+    secrets = tuple(keyring_secrets())
+    cached = _cipher
+    if cached is None or cached[0] != secrets:
+        with _cipher_lock:
+            cached = _cipher
+            if cached is None or cached[0] != secrets:
+                fernets = [_derive_fernet(s) for s in secrets]
+                cached = _cipher = (secrets, fernets[0], MultiFernet(fernets))
+    return cached[1], cached[2]
+
+
+def _get_fernet() -> MultiFernet:
+    """Encrypts with the newest key and decrypts with any key in the keyring."""
+    return _get_ciphers()[1]
+
+
+def reset_cipher() -> None:
+    """Drops the cached keyring, e.g. in scripts that change the env."""
+    global _cipher
+    with _cipher_lock:
+        _cipher = None
+
+
 def _cfg(key: str) -> str:
     return current_app.config[key]
 
 
+# ---------------- Authenticated requests ---------------- #
+
+
+def access_token_from_request() -> Optional[str]:
+    """The access token from Authorization: Bearer ... or the HttpOnly cookie."""
+    auth = request.headers.get("Authorization", "")
+    if auth.startswith("Bearer "):
+        return auth[7:]
+    return request.cookies.get("access_token")
+
+
+def current_user_id() -> Optional[int]:
+    """
+    The authenticated user's id for this request, or None. Verified claims
+    are cached per token, so a repeat caller costs no signature check.
+    """
+    if "user_id" in g:
+        return g.user_id
+    from app.security.token_cache import verify_access_token  # deferred: pulls in PyJWT and bcrypt
+
+    uid = None
+    token = access_token_from_request()
+    claims = verify_access_token(token) if token else None
+    if claims:
+        try:
+            uid = int(claims["sub"])
+        except (KeyError, TypeError, ValueError):
+            uid = None
+    g.user_id = uid
+    return uid
+
+
+def require_user(view):
+    """Answers 401 unless the request is authenticated; the view reads g.user_id."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if current_user_id() is None:
+            return jsonify({"ok": False, "error": "authentication required"}), 401
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
 def encrypt(s: str) -> str:
     return _get_fernet().encrypt(s.encode("utf-8")).decode("utf-8")
 
 
 def decrypt(s: str) -> str:
     return _get_fernet().decrypt(s.encode("utf-8")).decode("utf-8")
+
+
+def encrypt_many(values: Iterable[Optional[str]]) -> List[Optional[str]]:
+    """encrypt() over a batch with one keyring lookup; None stays None."""
+    f = _get_fernet()
+    return [
+        None if v is None else f.encrypt(v.encode("utf-8")).decode("utf-8") for v in values
+    ]
+
+
+def decrypt_many(values: Iterable[Optional[str]]) -> List[Optional[str]]:
+    """decrypt() over a batch with one keyring lookup; None stays None."""
+    f = _get_fernet()
+    return [
+        None if v is None else f.decrypt(v.encode("utf-8")).decode("utf-8") for v in values
+    ]
+
+
+def is_current(token: str) -> bool:
+    """True if the token is encrypted under the newest key (no rotation needed)."""
+    from cryptography.fernet import InvalidToken
+
+    primary, _ = _get_ciphers()
+    try:
+        primary.decrypt(token.encode("utf-8"))
+        return True
+    except InvalidToken:
+        return False
+
+
+def rotate(token: str) -> str:
+    """Re-encrypts a token under the newest key; raises InvalidToken if no key matches."""
+    return _get_fernet().rotate(token.encode("utf-8")).decode("utf-8")
@@ -1,4 +1,9 @@
+from typing import Optional
+
+
 class GoogleAPIError(Exception):
     """General exception for Google Maps API errors."""
 
-    pass
+    def __init__(self, message: str, status: Optional[str] = None) -> None:
+        super().__init__(message)
+        self.status = status  # Google API status, e.g. "OVER_QUERY_LIMIT"
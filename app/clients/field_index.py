@@ -0,0 +1,215 @@
+from __future__ import annotations
+from datetime import timedelta
+from math import asin, cos, floor, radians, sin, sqrt
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+import re
+import threading
+import time
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config import Config
+from app.db.watermark import Watermark
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = 111.32
+
+_PLACE_ID = re.compile(r"place_id:([A-Za-z0-9_-]+)")
+
+# How far before the previous refresh each refresh re-reads (see Watermark)
+WATERMARK_OVERLAP = timedelta(seconds=60)
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    dlat = radians(lat2 - lat1)
+    dlng = radians(lng2 - lng1)
+    a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(sqrt(a))
+
+
+class SpatialGrid:
+    """
+    Fixed-size lat/lng grid. A radius query only visits the cells that
+    overlap the query's bounding box, so lookups cost a few dict reads and
+    haversines regardless of how many points are stored.
+    """
+
+    def __init__(self, cell_deg: float = 0.05):
+        self.cell_deg = cell_deg
+        self._cells: Dict[Tuple[int, int], List[Tuple[float, float, Any]]] = {}
+        self.size = 0
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return floor(lat / self.cell_deg), floor(lng / self.cell_deg)
+
+    def add(self, lat: float, lng: float, item: Any) -> None:
+        self._cells.setdefault(self._cell(lat, lng), []).append((lat, lng, item))
+        self.size += 1
+
+    def remove(self, lat: float, lng: float, match: Callable[[Any], bool]) -> None:
+        """Drops the items stored at (lat, lng) for which match(item) is true."""
+        cell = self._cell(lat, lng)
+        points = self._cells.get(cell, [])
+        kept = [p for p in points if not (p[0] == lat and p[1] == lng and match(p[2]))]
+        self.size -= len(points) - len(kept)
+        if kept:
+            self._cells[cell] = kept
+        else:
+            self._cells.pop(cell, None)
+
+    def nearest(
+        self, lat: float, lng: float, radius_km: float
+    ) -> Optional[Tuple[float, Any]]:
+        dlat = radius_km / KM_PER_DEG_LAT
+        dlng = radius_km / (KM_PER_DEG_LAT * max(cos(radians(lat)), 1e-6))
+        lat_lo, lng_lo = self._cell(lat - dlat, lng - dlng)
+        lat_hi, lng_hi = self._cell(lat + dlat, lng + dlng)
+
+        best: Optional[Tuple[float, Any]] = None
+        for i in range(lat_lo, lat_hi + 1):
+            for j in range(lng_lo, lng_hi + 1):
+                for p_lat, p_lng, item in self._cells.get((i, j), ()):
+                    distance = haversine_km(lat, lng, p_lat, p_lng)
+                    if distance <= radius_km and (best is None or distance < best[0]):
+                        best = (distance, item)
+        return best
+
+
+class FieldIndex:
+    """
+    In-memory index over unique_locations rows with coordinates.
+
+    Loaded lazily on the first query, then refreshed incrementally: every
+    FIELD_INDEX_REFRESH_SEC only rows whose coordinates were set since the
+    last refresh (by coordinates_updated_at) are fetched, so rows that gain
+    or change coordinates later are picked up too. add() indexes a row
+    immediately.
+    """
+
+    def __init__(
+        self, refresh_seconds: Optional[float] = None, cell_deg: float = 0.05
+    ):
+        self.refresh_seconds = (
+            Config.FIELD_INDEX_REFRESH_SEC if refresh_seconds is None else refresh_seconds
+        )
+        self._grid = SpatialGrid(cell_deg)
+        self._points: Dict[int, Tuple[float, float]] = {}
+        self._watermark = Watermark(WATERMARK_OVERLAP)
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _index(self, location_id: int, lat: float, lng: float, field: Dict[str, Any]) -> bool:
+        previous = self._points.get(location_id)
+        if previous == (lat, lng):
+            return False
+        if previous is not None:
+            self._grid.remove(
+                *previous, lambda item: item["unique_location_id"] == location_id
+            )
+        self._points[location_id] = (lat, lng)
+        self._grid.add(lat, lng, field)
+        return True
+
+    def add(self, location: Any) -> None:
+        field = self._as_field(location)
+        if field is None:
+            return
+        with self._lock:
+            self._index(location.location_id, location.latitude, location.longitude, field)
+
+    @staticmethod
+    def _as_field(location: Any) -> Optional[Dict[str, Any]]:
+        """
+        The indexed entry for a row, or None if it has no coordinates or no
+        Google place_id in its url (a hit must carry one, like a Places
+        result would).
+        """
+        if location.latitude is None or location.longitude is None:
+            return None
+        match = _PLACE_ID.search(location.url or "")
+        if match is None:
+            return None
+        return {
+            "formatted_address": f"{location.name}, {location.address}",
+            "location": {"lat": location.latitude, "lng": location.longitude},
+            "place_id": match.group(1),
+            "unique_location_id": location.location_id,
+        }
+
+    def refresh(self, force: bool = False) -> int:
+        """
+        Pulls rows whose coordinates were set since the last refresh.
+        Returns how many were indexed or moved.
+        """
+        now = time.monotonic()
+        if (
+            not force
+            and self._loaded_at is not None
+            and now - self._loaded_at < self.refresh_seconds
+        ):
+            return 0
+
+        from app.db.models import UniqueLocation
+        from app.db.session import get_isolated_session
+
+        added = 0
+        since, started = self._watermark.begin()
+        try:
+            with get_isolated_session() as db:
+                rows = UniqueLocation.get_with_coordinates(db, since=since)
+                with self._lock:
+                    for row in rows:
+                        field = self._as_field(row)
+                        if field is not None:
+                            added += self._index(
+                                row.location_id,  # type: ignore
+                                row.latitude,  # type: ignore
+                                row.longitude,  # type: ignore
+                                field,
+                            )
+            self._watermark.advance(started)
+        except SQLAlchemyError as e:
+            logger.warning("Field index refresh failed: %s", e)
+        self._loaded_at = now
+        if added:
+            logger.info("Field index: +%d locations (%d total)", added, self._grid.size)
+        return added
+
+    def nearest(
+        self, lat: float, lng: float, radius_km: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        The closest known field within radius_km (FIELD_INDEX_RADIUS_KM by
+        default), with its distance, or None.
+        """
+        self.refresh()
+        radius_km = Config.FIELD_INDEX_RADIUS_KM if radius_km is None else radius_km
+        with self._lock:
+            hit = self._grid.nearest(lat, lng, radius_km)
+        if hit is None:
+            return None
+        distance, field = hit
+        return {**field, "distance_km": round(distance, 3)}
+
+    def __len__(self) -> int:
+        return self._grid.size
+
+
+_index: Optional[FieldIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_field_index() -> FieldIndex:
+    """
+    Returns the process-wide field index shared by every GoogleClient.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = FieldIndex()
+    return _index
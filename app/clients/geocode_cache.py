@@ -0,0 +1,197 @@
+from __future__ import annotations
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+import logging
+import re
+import threading
+import unicodedata
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+KIND_GEOCODE = "geocode"
+KIND_NEAREST_FIELD = "nearest_field"
+
+# Sentinel stored for ZERO_RESULTS lookups
+NEGATIVE: Dict[str, Any] = {}
+
+_SPACES = re.compile(r"\s+")
+_PUNCT = re.compile(r"[^\w\s]")
+
+
+def normalize(text: str) -> str:
+    """
+    Case-, accent-width-, punctuation- and whitespace-insensitive form, so
+    "St. Andrew's Park " and "st andrews park" share a cache entry.
+    """
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    text = _PUNCT.sub("", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def cache_key(kind: str, place: str, city: str) -> Tuple[str, str, str]:
+    place_n, city_n = normalize(place), normalize(city)
+    digest = hashlib.sha256(f"{kind}|{place_n}|{city_n}".encode("utf-8")).hexdigest()
+    return digest, place_n, city_n
+
+
+class GeocodeCache:
+    """
+    Two-level cache for Google lookups: a bounded in-process LRU in front of
+    the geocode_cache table. Positive entries live GEOCODE_CACHE_TTL_DAYS,
+    ZERO_RESULTS entries GEOCODE_NEGATIVE_TTL_HOURS. Database errors are
+    logged and treated as misses so lookups never fail because of the cache.
+    """
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        ttl: Optional[timedelta] = None,
+        negative_ttl: Optional[timedelta] = None,
+        persistent: bool = True,
+    ):
+        self.maxsize = maxsize or Config.GEOCODE_LRU_SIZE
+        self.ttl = ttl or timedelta(days=Config.GEOCODE_CACHE_TTL_DAYS)
+        self.negative_ttl = negative_ttl or timedelta(
+            hours=Config.GEOCODE_NEGATIVE_TTL_HOURS
+        )
+        self.persistent = persistent
+        self._lru: "OrderedDict[str, Tuple[datetime, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {
+            "lru_hits": 0,
+            "db_hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "db_errors": 0,
+        }
+
+    # ---------------- Stats ---------------- #
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._stats)
+            out["lru_size"] = len(self._lru)
+        hits = out["lru_hits"] + out["db_hits"]
+        lookups = hits + out["misses"]
+        out["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        return out
+
+    # ---------------- LRU ---------------- #
+
+    def _lru_get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            item = self._lru.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= now:
+                del self._lru[key]
+                return None
+            self._lru.move_to_end(key)
+            return value
+
+    def _lru_put(self, key: str, value: Dict[str, Any], expires_at: datetime) -> None:
+        with self._lock:
+            self._lru[key] = (expires_at, value)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.maxsize:
+                self._lru.popitem(last=False)
+
+    # ---------------- Public API ---------------- #
+
+    def get(self, kind: str, place: str, city: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached result, NEGATIVE for a cached ZERO_RESULTS, or
+        None on a miss.
+        """
+        key, _, _ = cache_key(kind, place, city)
+        value = self._lru_get(key)
+        if value is not None:
+            self._count("lru_hits")
+            if value is NEGATIVE:
+                self._count("negative_hits")
+            return value
+
+        if self.persistent:
+            from app.db.models import GeocodeCacheEntry
+            from app.db.session import get_isolated_session
+
+            try:
+                with get_isolated_session() as db:
+                    entry = GeocodeCacheEntry.get_valid(db, key)
+                    if entry is not None:
+                        value = entry.result if entry.result is not None else NEGATIVE
+                        expires_at = entry.expires_at
+                        if expires_at.tzinfo is None:
+                            expires_at = expires_at.replace(tzinfo=timezone.utc)
+            except SQLAlchemyError as e:
+                logger.warning("Geocode cache read failed: %s", e)
+                self._count("db_errors")
+                value = None
+            if value is not None:
+                self._lru_put(key, value, expires_at)
+                self._count("db_hits")
+                if value is NEGATIVE:
+                    self._count("negative_hits")
+                return value
+
+        self._count("misses")
+        return None
+
+    def put(
+        self, kind: str, place: str, city: str, result: Optional[Dict[str, Any]]
+    ) -> None:
+        """
+        Stores a result; pass None to record a ZERO_RESULTS lookup.
+        """
+        key, place_n, city_n = cache_key(kind, place, city)
+        ttl = self.ttl if result is not None else self.negative_ttl
+        expires_at = datetime.now(timezone.utc) + ttl
+        self._lru_put(key, result if result is not None else NEGATIVE, expires_at)
+        self._count("stores")
+
+        if self.persistent:
+            from app.db.models import GeocodeCacheEntry
+            from app.db.session import get_isolated_session
+
+            try:
+                with get_isolated_session() as db:
+                    GeocodeCacheEntry.store(
+                        db, key, kind, place_n, city_n, result, expires_at
+                    )
+            except SQLAlchemyError as e:
+                logger.warning("Geocode cache write failed: %s", e)
+                self._count("db_errors")
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._lru.clear()
+
+
+_cache: Optional[GeocodeCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_geocode_cache() -> GeocodeCache:
+    """
+    Returns the process-wide cache shared by every GoogleClient.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = GeocodeCache()
+    return _cache
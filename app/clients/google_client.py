@@ -1,21 +1,56 @@
 import os
 import logging
-from typing import Any, Dict, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 import requests
 from requests.exceptions import RequestException
 from app.clients.exceptions import GoogleAPIError
+from app.clients.field_index import FieldIndex, get_field_index
+from app.clients.geocode_cache import (
+    KIND_GEOCODE,
+    KIND_NEAREST_FIELD,
+    NEGATIVE,
+    GeocodeCache,
+    cache_key,
+    get_geocode_cache,
+)
+from app.clients.request_scheduler import TokenBucket
+from app.config import Config
 from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
+_limiter: Optional[TokenBucket] = None
+_limiter_lock = threading.Lock()
+
+
+def _geocode_limiter() -> TokenBucket:
+    """
+    Process-wide limiter keeping live Geocoding calls under GOOGLE_GEOCODE_QPS.
+    """
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                qps = Config.GOOGLE_GEOCODE_QPS
+                _limiter = TokenBucket(rate=qps, capacity=max(1, int(qps)))
+    return _limiter
+
 
 class GoogleClient:
     GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
     MAPS_URL_TEMPLATE = "https://www.google.com/maps/place/?q=place_id:{place_id}"
     NEARBY_SEARCH_URL = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
 
-    def __init__(self, api_key: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache: Optional[GeocodeCache] = None,
+        field_index: Optional[FieldIndex] = None,
+    ) -> None:
         if api_key:
             self.api_key = api_key
         else:
@@ -26,6 +61,10 @@ class GoogleClient:
             raise ValueError(
                 "Google API key not provided; set GOOGLE_API_KEY in environment or pass it explicitly."
             )
+        self.cache = cache if cache is not None else get_geocode_cache()
+        self.field_index = (
+            field_index if field_index is not None else get_field_index()
+        )
 
     def get_address(self, city_name: str, place: str) -> Dict[str, Any]:
         """
@@ -35,12 +74,27 @@ class GoogleClient:
           - place_id
           - a Google Maps URL
 
+        Results (including ZERO_RESULTS) are served from the geocode cache
+        when present, so repeat lookups cost no network or quota.
+
         :param city_name: e.g. "Toronto"
         :param place:     e.g. "CN Tower"
         :return:          Dict with those keys
         :raises GoogleAPIError: on network, JSON, or API‐status errors
         """
+        cached = self.cache.get(KIND_GEOCODE, place, city_name)
+        if cached is NEGATIVE:
+            raise GoogleAPIError(f"No address found for '{place}, {city_name}'")
+        if cached is not None:
+            return dict(cached)
+        return self._fetch_address(city_name, place)
+
+    def _fetch_address(self, city_name: str, place: str) -> Dict[str, Any]:
+        """
+        Live Geocoding call behind get_address; stores the outcome in the cache.
+        """
         query = f"{place}, {city_name}"
+        _geocode_limiter().acquire()
         params = {
             "address": query,
             "key": self.api_key,
@@ -63,10 +117,16 @@ class GoogleClient:
 
         # 3) API‐level errors
         status = data.get("status")
+        if status == "ZERO_RESULTS":
+            logger.info("No geocode results for query %r", query)
+            self.cache.put(KIND_GEOCODE, place, city_name, None)
+            raise GoogleAPIError(f"No address found for '{query}'", status=status)
         if status != "OK":
             err_msg = data.get("error_message") or status
             logger.warning("Geocoding API error %s: %s", status, err_msg)
-            raise GoogleAPIError(f"Geocoding API error: {status} – {err_msg}")
+            raise GoogleAPIError(
+                f"Geocoding API error: {status} – {err_msg}", status=status
+            )
 
         results = data.get("results", [])
         if not results:
@@ -85,22 +145,43 @@ class GoogleClient:
         # Build the Maps URL
         map_url = self.MAPS_URL_TEMPLATE.format(place_id=place_id)
 
-        return {
+        result = {
             "formatted_address": formatted_address,
             "location": location,
             "place_id": place_id,
             "maps_url": map_url,
         }
+        self.cache.put(KIND_GEOCODE, place, city_name, result)
+        return result
 
     def find_nearest_soccer_field(self, city_name: str, place: str) -> Dict[str, Any]:
         """
         Find the closest 'soccer field' near the given place in the city,
         returning the same keys as get_address.
+
+        Fields already in unique_locations are answered from the local
+        spatial index; Places Nearby Search is only called when none lies
+        within FIELD_INDEX_RADIUS_KM of the place.
         """
+        cached = self.cache.get(KIND_NEAREST_FIELD, place, city_name)
+        if cached is NEGATIVE:
+            raise GoogleAPIError(f"No soccer field found near '{place}, {city_name}'")
+        if cached is not None:
+            return dict(cached)
+
         # 1) Get the base location
         base = self.get_address(city_name, place)
         lat, lng = base["location"]["lat"], base["location"]["lng"]
 
+        local = self.field_index.nearest(lat, lng)
+        if local is not None:
+            return {
+                "formatted_address": local["formatted_address"],
+                "location": local["location"],
+                "place_id": local["place_id"],
+                "maps_url": self.MAPS_URL_TEMPLATE.format(place_id=local["place_id"]),
+            }
+
         params = {
             "location": f"{lat},{lng}",
             "rankby": "distance",
@@ -126,6 +207,7 @@ class GoogleClient:
         # 4) API‐status
         status = data.get("status")
         if status == "ZERO_RESULTS":
+            self.cache.put(KIND_NEAREST_FIELD, place, city_name, None)
             raise GoogleAPIError(f"No soccer field found near '{place}, {city_name}'")
         if status != "OK":
             err = data.get("error_message") or status
@@ -143,9 +225,129 @@ class GoogleClient:
         vic = field.get("vicinity", "")
         addr = f"{name}, {vic}" if vic else name
 
-        return {
+        result = {
             "formatted_address": addr,
             "location": field["geometry"]["location"],
             "place_id": pid,
             "maps_url": self.MAPS_URL_TEMPLATE.format(place_id=pid),
         }
+        self.cache.put(KIND_NEAREST_FIELD, place, city_name, result)
+        return result
+
+    def geocode_many(
+        self, queries: Sequence[Tuple[str, str]], max_workers: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Geocode many (place, city) pairs at once.
+
+        Queries are deduplicated after normalization, cached answers are
+        served first, and the rest are resolved concurrently through a
+        bounded pool behind the shared QPS limiter. OVER_QUERY_LIMIT pauses
+        the limiter and retries.
+
+        :param queries: e.g. [("CN Tower", "Toronto"), ...]
+        :return: one dict per input, in input order:
+                 {"place", "city", "result": <get_address dict> | None,
+                  "error": str | None}
+        """
+        slots: Dict[str, List[int]] = {}
+        unique: Dict[str, Tuple[str, str]] = {}
+        for index, (place, city) in enumerate(queries):
+            key = cache_key(KIND_GEOCODE, place, city)[0]
+            slots.setdefault(key, []).append(index)
+            unique.setdefault(key, (place, city))
+
+        outcomes: Dict[str, Tuple[Optional[Dict[str, Any]], Optional[str]]] = {}
+        misses: List[str] = []
+        for key, (place, city) in unique.items():
+            cached = self.cache.get(KIND_GEOCODE, place, city)
+            if cached is NEGATIVE:
+                outcomes[key] = (None, f"No address found for '{place}, {city}'")
+            elif cached is not None:
+                outcomes[key] = (dict(cached), None)
+            else:
+                misses.append(key)
+
+        def resolve(key: str) -> Tuple[str, Optional[Dict[str, Any]], Optional[str]]:
+            place, city = unique[key]
+            for attempt in range(3):
+                try:
+                    return key, self._fetch_address(city, place), None
+                except GoogleAPIError as e:
+                    if e.status == "OVER_QUERY_LIMIT" and attempt < 2:
+                        _geocode_limiter().pause(2.0 * (attempt + 1))
+                        continue
+                    return key, None, str(e)
+            return key, None, "retries exhausted"
+
+        if misses:
+            workers = min(max_workers or Config.GOOGLE_GEOCODE_WORKERS, len(misses))
+            with ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="geocode"
+            ) as pool:
+                for key, result, error in pool.map(resolve, misses):
+                    outcomes[key] = (result, error)
+
+        results: List[Dict[str, Any]] = [{} for _ in queries]
+        for key, indexes in slots.items():
+            result, error = outcomes[key]
+            for index in indexes:
+                place, city = queries[index]
+                results[index] = {
+                    "place": place,
+                    "city": city,
+                    "result": dict(result) if result is not None else None,
+                    "error": error,
+                }
+        logger.info(
+            "geocode_many: %d queries, %d unique, %d live lookups",
+            len(queries),
+            len(unique),
+            len(misses),
+        )
+        return results
+
+    def backfill_coordinates(self) -> int:
+        """
+        Geocodes unique_locations rows that have no coordinates yet (as
+        "name, address") and stores lat/lng so the field index can use them.
+        Returns the number of rows updated.
+        """
+        from app.db.models import UniqueLocation
+        from app.db.session import get_session
+
+        # Read and write in separate sessions; geocoding in between uses the
+        # cache, which opens sessions of its own.
+        with get_session() as db:
+            pending = [
+                (r.location_id, r.name, r.address)
+                for r in UniqueLocation.get_missing_coordinates(db)
+            ]
+        results = self.geocode_many([(name, address) for _, name, address in pending])  # type: ignore
+
+        coordinates = {}
+        for (location_id, _, _), outcome in zip(pending, results):
+            location = (outcome["result"] or {}).get("location") or {}
+            if "lat" in location and "lng" in location:
+                coordinates[location_id] = (location["lat"], location["lng"])
+
+        written = []
+        with get_session() as db:
+            for row in db.query(UniqueLocation).filter(
+                UniqueLocation.location_id.in_(list(coordinates))
+            ):
+                row.set_coordinates(*coordinates[row.location_id])  # type: ignore
+                written.append(
+                    SimpleNamespace(
+                        location_id=row.location_id,
+                        latitude=row.latitude,
+                        longitude=row.longitude,
+                        name=row.name,
+                        address=row.address,
+                        url=row.url,
+                    )
+                )
+        # Indexed now rather than on the next refresh, once the rows are committed
+        for location in written:
+            self.field_index.add(location)
+        return len(written)
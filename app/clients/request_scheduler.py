@@ -0,0 +1,304 @@
+from __future__ import annotations
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+import logging
+import random
+import threading
+import time
+
+import requests
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Statuses worth another attempt. 429 and 503 mean the server refused the
+# request outright, so they are safe to retry even for POST.
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+REFUSED_STATUSES = {429, 503}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Parses a Retry-After header (delta-seconds or HTTP-date) into seconds to wait.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    now = time.time() if now is None else now
+    return max(when.timestamp() - now, 0.0)
+
+
+def parse_rate_limit_reset(headers: Any, now: Optional[float] = None) -> Optional[float]:
+    """
+    Returns seconds until the quota resets when X-RateLimit-Remaining is 0.
+    X-RateLimit-Reset may be an epoch timestamp or a delta in seconds.
+    """
+    remaining = headers.get("X-RateLimit-Remaining")
+    reset = headers.get("X-RateLimit-Reset")
+    if remaining is None or reset is None:
+        return None
+    try:
+        if int(float(remaining)) > 0:
+            return None
+        reset_value = float(reset)
+    except ValueError:
+        return None
+    now = time.time() if now is None else now
+    if reset_value > 1_000_000_000:  # epoch seconds
+        return max(reset_value - now, 0.0)
+    return max(reset_value, 0.0)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. acquire() blocks until a token is available
+    (or a server-imposed pause has elapsed) and returns the time waited.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.waiting = 0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self._updated = now
+
+    def acquire(self) -> float:
+        started = self._clock()
+        with self._lock:
+            self.waiting += 1
+        try:
+            while True:
+                with self._lock:
+                    now = self._clock()
+                    if now < self._paused_until:
+                        delay = self._paused_until - now
+                    else:
+                        self._refill(now)
+                        if self.tokens >= 1:
+                            self.tokens -= 1
+                            return self._clock() - started
+                        delay = (1 - self.tokens) / self.rate
+                self._sleep(delay)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stops handing out tokens for `seconds` and drains the bucket, so
+        callers resume one at a time after the pause.
+        """
+        with self._lock:
+            now = self._clock()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self.tokens = 0.0
+            self._updated = self._paused_until
+
+    def set_rate(self, rate: float) -> None:
+        with self._lock:
+            self._refill(self._clock())
+            self.rate = float(rate)
+
+
+class RequestScheduler:
+    """
+    Sends every TeamSnap request through one shared token bucket.
+
+    - Idempotent calls are retried with jittered exponential backoff on
+      connection errors and 429/5xx; POSTs only when the server refused them.
+    - Retry-After and X-RateLimit-* headers set the earliest retry and, on
+      429, pause the whole bucket; waits over max_pause fail the request.
+    - The send rate backs off multiplicatively on 429 and climbs back
+      additively on success, so it settles just under the API ceiling.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+        max_pause: Optional[float] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.max_rate = float(rate or Config.TEAMSNP_RATE_LIMIT_PER_SEC)
+        self.min_rate = max(self.max_rate / 20, 0.1)
+        self.max_retries = (
+            Config.TEAMSNP_MAX_RETRIES if max_retries is None else max_retries
+        )
+        self.backoff_base = backoff_base or Config.TEAMSNP_BACKOFF_BASE
+        self.backoff_max = backoff_max or Config.TEAMSNP_BACKOFF_MAX
+        self.max_pause = max_pause or Config.TEAMSNP_MAX_PAUSE
+        self._sleep = sleep
+        self.bucket = TokenBucket(
+            self.max_rate, burst or Config.TEAMSNP_RATE_BURST, sleep=sleep
+        )
+        self._lock = threading.Lock()
+        self._stats: Dict[str, float] = {
+            "requests": 0,
+            "retries": 0,
+            "throttled": 0,
+            "failures": 0,
+            "wait_total_seconds": 0.0,
+            "wait_max_seconds": 0.0,
+        }
+
+    # ---------------- Observability ---------------- #
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            out = dict(self._stats)
+        acquired = out["requests"] + out["retries"]
+        out["wait_avg_seconds"] = (
+            out["wait_total_seconds"] / acquired if acquired else 0.0
+        )
+        out["queue_depth"] = self.bucket.waiting
+        out["current_rate"] = self.bucket.rate
+        return out
+
+    def _record(self, key: str, amount: float = 1) -> None:
+        with self._lock:
+            self._stats[key] += amount
+
+    def _acquire(self) -> None:
+        waited = self.bucket.acquire()
+        with self._lock:
+            self._stats["wait_total_seconds"] += waited
+            if waited > self._stats["wait_max_seconds"]:
+                self._stats["wait_max_seconds"] = waited
+
+    # ---------------- Rate adaptation ---------------- #
+
+    def _on_success(self) -> None:
+        rate = self.bucket.rate
+        if rate < self.max_rate:
+            self.bucket.set_rate(min(self.max_rate, rate + self.max_rate * 0.05))
+
+    def _on_throttled(self, pause: float) -> None:
+        self._record("throttled")
+        self.bucket.set_rate(max(self.min_rate, self.bucket.rate / 2))
+        self.bucket.pause(pause)
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, min(max, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def _can_retry(self, method: str, attempt: int, status: Optional[int]) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        if method in IDEMPOTENT_METHODS:
+            return True
+        return status in REFUSED_STATUSES
+
+    # ---------------- Sending ---------------- #
+
+    def send(
+        self, session: requests.Session, method: str, url: str, **kwargs: Any
+    ) -> requests.Response:
+        """
+        Sends one request, waiting for rate-limit capacity and retrying
+        transient failures. Returns the final response (which may still be
+        an error status) or raises the last RequestException.
+        """
+        method = method.upper()
+        self._record("requests")
+        attempt = 0
+        while True:
+            self._acquire()
+            try:
+                response = session.request(method, url, **kwargs)
+            except requests.ConnectTimeout:
+                # Never reached the server, so even a POST can go again
+                if attempt >= self.max_retries:
+                    self._record("failures")
+                    raise
+                delay = self._backoff(attempt)
+            except (requests.ConnectionError, requests.Timeout):
+                if not self._can_retry(method, attempt, None):
+                    self._record("failures")
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                status = response.status_code
+                reset = parse_rate_limit_reset(response.headers)
+                if status not in RETRYABLE_STATUSES:
+                    if reset:
+                        self.bucket.pause(min(reset, self.max_pause))
+                    if status < 400:
+                        self._on_success()
+                    return response
+                if not self._can_retry(method, attempt, status):
+                    self._record("failures")
+                    logger.warning(
+                        f"{method} {url} failed with {status} after {attempt + 1} attempt(s)"
+                    )
+                    return response
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                # The server's wait is the earliest we may retry, never a cap
+                delay = max(self._backoff(attempt), retry_after or 0.0, reset or 0.0)
+                if delay > self.max_pause:
+                    if status == 429:
+                        self._on_throttled(self.max_pause)
+                    self._record("failures")
+                    logger.warning(
+                        f"{method} {url} got {status}; not retrying after the "
+                        f"requested {delay:.0f}s (max {self.max_pause:.0f}s)"
+                    )
+                    return response
+                if status == 429:
+                    self._on_throttled(delay)
+                    delay = 0.0  # the bucket pause already holds us back
+                response.close()
+
+            attempt += 1
+            self._record("retries")
+            logger.info(f"Retrying {method} {url} (attempt {attempt + 1})")
+            if delay > 0:
+                self._sleep(delay)
+
+
+_scheduler: Optional[RequestScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> RequestScheduler:
+    """
+    Returns the process-wide scheduler shared by every TeamSnapClient.
+    """
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = RequestScheduler()
+    return _scheduler
@@ -1,67 +1,206 @@
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Tuple, Union
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 import logging
+from app.clients.request_scheduler import RequestScheduler, get_scheduler
+from app.clients.teamsnap_records import TeamSnapRecord, iter_records
+from app.config import Config
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
+Timeout = Union[float, Tuple[float, float]]
+
+BULK_LOAD_TYPES = ("team", "opponent", "location", "event")
+
+# One pooled session per process. Module state survives warm Lambda
+# invocations, so kept-alive TLS connections are reused between events.
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """
+    Returns the process-wide pooled session, creating it on first use.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=Config.TEAMSNP_HTTP_POOL_CONNECTIONS,
+                    pool_maxsize=Config.TEAMSNP_HTTP_POOL_MAXSIZE,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def reset_http_session() -> None:
+    """
+    Closes the shared session (and its pooled connections).
+    The next client call builds a fresh one.
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def transport_stats() -> Dict[str, int]:
+    """
+    Counts requests sent vs. connections opened on the shared pool.
+    Every request beyond the first on a connection is a TCP+TLS
+    handshake saved.
+    """
+    sent = opened = 0
+    session = _session
+    if session is not None:
+        adapters = {id(a): a for a in session.adapters.values()}.values()
+        for adapter in adapters:
+            pools = adapter.poolmanager.pools  # type: ignore[attr-defined]
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                sent += pool.num_requests
+                opened += pool.num_connections
+    return {
+        "requests": sent,
+        "connections": opened,
+        "handshakes_saved": max(sent - opened, 0),
+    }
+
+
+TOKEN_PATH = "/oauth/token"
+
+
+def refresh_access_token(refresh_token: str, timeout: Optional[Timeout] = None) -> Dict[str, Any]:
+    """
+    Trades a refresh token for a new access token at TEAMSNP_AUTH_BASE.
+    Returns the token response (access_token, expires_in and possibly a
+    new refresh_token) or {"error": ..., "status": ...} on failure.
+    """
+    data = {
+        "grant_type": "refresh_token",
+        "refresh_token": refresh_token,
+        "client_id": Config.TEAMSNP_CLIENT_ID,
+    }
+    if Config.TEAMSNP_CLIENT_SECRET:
+        data["client_secret"] = Config.TEAMSNP_CLIENT_SECRET
+    try:
+        response = get_http_session().post(
+            f"{Config.TEAMSNP_AUTH_BASE}{TOKEN_PATH}",
+            data=data,
+            timeout=timeout
+            or (Config.TEAMSNP_HTTP_CONNECT_TIMEOUT, Config.TEAMSNP_HTTP_READ_TIMEOUT),
+        )
+    except requests.RequestException as e:
+        return {"error": str(e), "status": None}
+    if response.status_code != 200:
+        return {"error": response.text[:500], "status": response.status_code}
+    return response.json()
+
 
 class TeamSnapClient:
-    def __init__(self, bearer_token: str, base_url: str):
+    def __init__(
+        self,
+        bearer_token: str,
+        base_url: str,
+        timeout: Optional[Timeout] = None,
+        scheduler: Optional[RequestScheduler] = None,
+    ):
         self.base_url: str = base_url.rstrip("/")
         self.headers: Dict[str, str] = {
             "Authorization": f"Bearer {bearer_token}",
             "Content-Type": "application/json",
         }
+        self.timeout: Timeout = timeout or (
+            Config.TEAMSNP_HTTP_CONNECT_TIMEOUT,
+            Config.TEAMSNP_HTTP_READ_TIMEOUT,
+        )
+        self.session: requests.Session = get_http_session()
+        self.scheduler: RequestScheduler = scheduler or get_scheduler()
+
+    def _send(
+        self, method: str, url: str, timeout: Optional[Timeout] = None, **kwargs: Any
+    ) -> requests.Response:
+        return self.scheduler.send(
+            self.session,
+            method,
+            url,
+            headers=self.headers,
+            timeout=timeout or self.timeout,
+            **kwargs,
+        )
 
     def _get(
-        self, endpoint: str, params: Optional[Dict[str, Any]] = None
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[Timeout] = None,
     ) -> Dict[str, Any]:
         url: str = f"{self.base_url}/{endpoint.lstrip('/')}"
         try:
-            response = requests.get(url, headers=self.headers, params=params)
+            response = self._send("GET", url, timeout=timeout, params=params)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
             return {"error": str(e)}
 
     def _post(
-        self, endpoint: str, data: Optional[Dict[str, Any]] = None
+        self,
+        endpoint: str,
+        data: Optional[Dict[str, Any]] = None,
+        timeout: Optional[Timeout] = None,
     ) -> Dict[str, Any]:
         url: str = f"{self.base_url}/{endpoint.lstrip('/')}"
         try:
-            response = requests.post(url, headers=self.headers, json=data)
+            response = self._send("POST", url, timeout=timeout, json=data)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
             return {"error": str(e)}
 
     def _put(
-        self, endpoint: str, data: Optional[Dict[str, Any]] = None
+        self,
+        endpoint: str,
+        data: Optional[Dict[str, Any]] = None,
+        timeout: Optional[Timeout] = None,
     ) -> Dict[str, Any]:
         url: str = f"{self.base_url}/{endpoint.lstrip('/')}"
         try:
-            response = requests.put(url, headers=self.headers, json=data)
+            response = self._send("PUT", url, timeout=timeout, json=data)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
             return {"error": str(e)}
 
-    def _delete(self, endpoint: str) -> Dict[str, Any]:
+    def _delete(
+        self, endpoint: str, timeout: Optional[Timeout] = None
+    ) -> Dict[str, Any]:
         url: str = f"{self.base_url}/{endpoint.lstrip('/')}"
         try:
-            response = requests.delete(url, headers=self.headers)
+            response = self._send("DELETE", url, timeout=timeout)
             response.raise_for_status()
             return {"success": True}
         except requests.RequestException as e:
-            return {"error": str(e)}
+            status = e.response.status_code if e.response is not None else None
+            return {"error": str(e), "status": status}
 
     def _patch(
-        self, endpoint: str, data: Optional[Dict[str, Any]] = None
+        self,
+        endpoint: str,
+        data: Optional[Dict[str, Any]] = None,
+        timeout: Optional[Timeout] = None,
     ) -> Dict[str, Any]:
         url: str = f"{self.base_url}/{endpoint.lstrip('/')}"
         try:
-            response = requests.patch(url, headers=self.headers, json=data)
+            response = self._send("PATCH", url, timeout=timeout, json=data)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
@@ -216,3 +355,44 @@ class TeamSnapClient:
                 locations.append({"id": location_id, "name": name, "address": address})
 
         return {"locations": locations}
+
+    def iter_bulk_load(
+        self,
+        team_ids: Iterable[Union[int, str]],
+        types: Iterable[str] = BULK_LOAD_TYPES,
+    ) -> Iterator[TeamSnapRecord]:
+        """
+        Streams typed records for every requested type across all given teams
+        from a single /bulk_load call, parsing items as they arrive.
+        Raises requests.RequestException on HTTP errors.
+        """
+        url = f"{self.base_url}/bulk_load"
+        params = {
+            "team_id": ",".join(str(t) for t in team_ids),
+            "types": ",".join(types),
+        }
+        response = self._send("GET", url, params=params, stream=True)
+        try:
+            response.raise_for_status()
+            yield from iter_records(response.iter_content(chunk_size=64 * 1024))
+        finally:
+            response.close()
+
+    def bulk_load(
+        self,
+        team_ids: Iterable[Union[int, str]],
+        types: Iterable[str] = BULK_LOAD_TYPES,
+    ) -> Dict[str, Any]:
+        """
+        Fetches opponents, locations, events and teams for many teams in one
+        round trip. Returns records grouped by type, e.g.
+        {"opponent": [TeamSnapOpponent, ...], "event": [...], ...}.
+        """
+        types = tuple(types)
+        grouped: Dict[str, Any] = {t: [] for t in types}
+        try:
+            for record in self.iter_bulk_load(team_ids, types):
+                grouped.setdefault(record.type, []).append(record)
+        except (requests.RequestException, ValueError) as e:
+            return {"error": f"Failed to bulk load {','.join(types)}: {e}"}
+        return grouped
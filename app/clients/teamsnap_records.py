@@ -0,0 +1,208 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional, Type
+import codecs
+import json
+import re
+
+
+@dataclass
+class TeamSnapRecord:
+    """
+    One collection+json item, flattened. `data` keeps every name/value pair.
+    """
+
+    type: str
+    id: Optional[str]
+    data: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_data(cls, type_: str, data: Dict[str, Any]) -> "TeamSnapRecord":
+        return cls(type=type_, id=_str_or_none(data.get("id")), data=data)
+
+
+@dataclass
+class TeamSnapTeam(TeamSnapRecord):
+    name: Optional[str] = None
+
+    @classmethod
+    def from_data(cls, type_: str, data: Dict[str, Any]) -> "TeamSnapTeam":
+        return cls(
+            type=type_,
+            id=_str_or_none(data.get("id")),
+            data=data,
+            name=data.get("name"),
+        )
+
+
+@dataclass
+class TeamSnapOpponent(TeamSnapRecord):
+    team_id: Optional[str] = None
+    name: Optional[str] = None
+    contacts_name: Optional[str] = None
+    contacts_phone: Optional[str] = None
+    contacts_email: Optional[str] = None
+
+    @classmethod
+    def from_data(cls, type_: str, data: Dict[str, Any]) -> "TeamSnapOpponent":
+        return cls(
+            type=type_,
+            id=_str_or_none(data.get("id")),
+            data=data,
+            team_id=_str_or_none(data.get("team_id")),
+            name=data.get("name"),
+            contacts_name=data.get("contacts_name"),
+            contacts_phone=data.get("contacts_phone"),
+            contacts_email=data.get("contacts_email"),
+        )
+
+
+@dataclass
+class TeamSnapLocation(TeamSnapRecord):
+    team_id: Optional[str] = None
+    name: Optional[str] = None
+    address: Optional[str] = None
+    url: Optional[str] = None
+
+    @classmethod
+    def from_data(cls, type_: str, data: Dict[str, Any]) -> "TeamSnapLocation":
+        return cls(
+            type=type_,
+            id=_str_or_none(data.get("id")),
+            data=data,
+            team_id=_str_or_none(data.get("team_id")),
+            name=data.get("name"),
+            address=data.get("address"),
+            url=data.get("url"),
+        )
+
+
+@dataclass
+class TeamSnapEvent(TeamSnapRecord):
+    team_id: Optional[str] = None
+    opponent_id: Optional[str] = None
+    location_id: Optional[str] = None
+    start_date: Optional[datetime] = None
+    duration_in_minutes: Optional[int] = None
+    is_game: bool = False
+    updated_at: Optional[datetime] = None
+
+    @classmethod
+    def from_data(cls, type_: str, data: Dict[str, Any]) -> "TeamSnapEvent":
+        return cls(
+            type=type_,
+            id=_str_or_none(data.get("id")),
+            data=data,
+            team_id=_str_or_none(data.get("team_id")),
+            opponent_id=_str_or_none(data.get("opponent_id")),
+            location_id=_str_or_none(data.get("location_id")),
+            start_date=_parse_datetime(data.get("start_date")),
+            duration_in_minutes=data.get("duration_in_minutes"),
+            is_game=bool(data.get("is_game")),
+            updated_at=_parse_datetime(data.get("updated_at")),
+        )
+
+
+RECORD_TYPES: Dict[str, Type[TeamSnapRecord]] = {
+    "team": TeamSnapTeam,
+    "opponent": TeamSnapOpponent,
+    "location": TeamSnapLocation,
+    "event": TeamSnapEvent,
+}
+
+
+def _str_or_none(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def record_from_item(item: Dict[str, Any]) -> TeamSnapRecord:
+    """
+    Converts one collection+json item into its typed record.
+    """
+    data = {d["name"]: d.get("value") for d in item.get("data", []) if "name" in d}
+    type_ = data.get("type") or ""
+    return RECORD_TYPES.get(type_, TeamSnapRecord).from_data(type_, data)
+
+
+_ITEMS_KEY = re.compile(r'(?<!\\)"items"\s*:\s*\[')
+
+
+def _missing_items(document: str) -> ValueError:
+    """
+    The error for a document without `collection.items`, carrying the
+    collection's own error message when it has one.
+    """
+    try:
+        collection = json.loads(document).get("collection") or {}
+        error = collection.get("error") or {}
+        message = error.get("message") or error.get("title")
+    except (ValueError, AttributeError):
+        message = None
+    if message:
+        return ValueError(f"collection+json error: {message}")
+    return ValueError("collection+json document has no items array")
+
+
+def iter_collection_items(chunks: Iterable[bytes]) -> Iterator[Dict[str, Any]]:
+    """
+    Incrementally yields the objects of `collection.items` from a byte stream,
+    decoding one item at a time so the full document is never held in memory.
+    Raises ValueError if the stream ends inside the items array, or if the
+    document has no items array at all (e.g. a collection+json error).
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    in_items = False
+    done = False
+
+    for chunk in chunks:
+        if done:
+            break
+        buf = buf[pos:] + utf8.decode(chunk)
+        pos = 0
+
+        if not in_items:
+            # Everything before the items array is kept: it is small, and it
+            # is the whole document if the array never shows up
+            match = _ITEMS_KEY.search(buf)
+            if match is None:
+                continue
+            pos = match.end()
+            in_items = True
+
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf):
+                break
+            if buf[pos] == "]":
+                done = True
+                break
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break  # incomplete item; wait for the next chunk
+            pos = end
+            yield obj
+
+    if not in_items:
+        raise _missing_items(buf + utf8.decode(b"", final=True))
+    if not done:
+        raise ValueError("collection+json stream ended inside items array")
+
+
+def iter_records(chunks: Iterable[bytes]) -> Iterator[TeamSnapRecord]:
+    for item in iter_collection_items(chunks):
+        yield record_from_item(item)
@@ -16,8 +16,71 @@ class Config:
         "TEAMSNP_REDIRECT_URI", "urn:ietf:wg:oauth:2.0:oob"
     )
     TEAMSNP_SCOPES = os.getenv("TEAMSNP_SCOPES", "read write")
+    TEAMSNP_API_BASE = os.getenv(
+        "TEAMSNP_API_BASE", "https://api.teamsnap.com/v3"
+    ).rstrip("/")
+    # TeamSnap HTTP transport (shared keep-alive pool, timeouts in seconds)
+    TEAMSNP_HTTP_POOL_CONNECTIONS = int(os.getenv("TEAMSNP_HTTP_POOL_CONNECTIONS", "4"))
+    TEAMSNP_HTTP_POOL_MAXSIZE = int(os.getenv("TEAMSNP_HTTP_POOL_MAXSIZE", "16"))
+    TEAMSNP_HTTP_CONNECT_TIMEOUT = float(os.getenv("TEAMSNP_HTTP_CONNECT_TIMEOUT", "5"))
+    TEAMSNP_HTTP_READ_TIMEOUT = float(os.getenv("TEAMSNP_HTTP_READ_TIMEOUT", "30"))
+    # TeamSnap request scheduling (token bucket + retries)
+    TEAMSNP_RATE_LIMIT_PER_SEC = float(os.getenv("TEAMSNP_RATE_LIMIT_PER_SEC", "10"))
+    TEAMSNP_RATE_BURST = int(os.getenv("TEAMSNP_RATE_BURST", "10"))
+    TEAMSNP_MAX_RETRIES = int(os.getenv("TEAMSNP_MAX_RETRIES", "4"))
+    TEAMSNP_BACKOFF_BASE = float(os.getenv("TEAMSNP_BACKOFF_BASE", "0.5"))
+    TEAMSNP_BACKOFF_MAX = float(os.getenv("TEAMSNP_BACKOFF_MAX", "30"))
+    # Longest server-requested wait (Retry-After / quota reset) worth retrying
+    # after; longer ones fail the request instead of stalling every caller
+    TEAMSNP_MAX_PAUSE = float(os.getenv("TEAMSNP_MAX_PAUSE", "60"))
+    # Concurrent writes per bulk upload (keep <= TEAMSNP_HTTP_POOL_MAXSIZE)
+    TEAMSNP_UPLOAD_WORKERS = int(os.getenv("TEAMSNP_UPLOAD_WORKERS", "8"))
+    # Events read per keyset page when streaming the upload backlog
+    TEAMSNP_UPLOAD_CHUNK_SIZE = int(os.getenv("TEAMSNP_UPLOAD_CHUNK_SIZE", "500"))
+    # How long a fetched TeamSnap event snapshot is reused by the diff sync
+    TEAMSNP_SNAPSHOT_TTL_SEC = float(os.getenv("TEAMSNP_SNAPSHOT_TTL_SEC", "60"))
+    # TeamSnap access tokens: refresh those expiring within the window ahead
+    # of time; workers treat a token as expired this much early
+    TEAMSNP_TOKEN_REFRESH_WINDOW_SEC = int(os.getenv("TEAMSNP_TOKEN_REFRESH_WINDOW_SEC", "900"))
+    TEAMSNP_TOKEN_REFRESH_BATCH_SIZE = int(os.getenv("TEAMSNP_TOKEN_REFRESH_BATCH_SIZE", "50"))
+    TEAMSNP_TOKEN_REFRESH_WORKERS = int(os.getenv("TEAMSNP_TOKEN_REFRESH_WORKERS", "4"))
+    TEAMSNP_TOKEN_SKEW_SEC = int(os.getenv("TEAMSNP_TOKEN_SKEW_SEC", "60"))
+    TEAMSNP_TOKEN_CACHE_SIZE = int(os.getenv("TEAMSNP_TOKEN_CACHE_SIZE", "1024"))
+    # Outbox worker
+    OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+    OUTBOX_LEASE_SEC = int(os.getenv("OUTBOX_LEASE_SEC", "300"))
+    # create_event messages uploaded (and committed) together
+    OUTBOX_CREATE_CHUNK_SIZE = int(os.getenv("OUTBOX_CREATE_CHUNK_SIZE", "25"))
+    # Google lookups cache
+    GEOCODE_LRU_SIZE = int(os.getenv("GEOCODE_LRU_SIZE", "512"))
+    GEOCODE_CACHE_TTL_DAYS = int(os.getenv("GEOCODE_CACHE_TTL_DAYS", "30"))
+    GEOCODE_NEGATIVE_TTL_HOURS = int(os.getenv("GEOCODE_NEGATIVE_TTL_HOURS", "24"))
+    GOOGLE_GEOCODE_QPS = float(os.getenv("GOOGLE_GEOCODE_QPS", "25"))
+    GOOGLE_GEOCODE_WORKERS = int(os.getenv("GOOGLE_GEOCODE_WORKERS", "8"))
+    # Local nearest-field index over unique_locations
+    FIELD_INDEX_RADIUS_KM = float(os.getenv("FIELD_INDEX_RADIUS_KM", "1.5"))
+    FIELD_INDEX_REFRESH_SEC = float(os.getenv("FIELD_INDEX_REFRESH_SEC", "300"))
     # Database settings
     DB_URI = os.getenv("EZ_SCHEDULE_DB_URI", "sqlite:///./test.db")
+    DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+    # Engine pool profile: auto (lambda on AWS Lambda, else wsgi), lambda, wsgi, worker
+    DB_POOL_STRATEGY = os.getenv("DB_POOL_STRATEGY", "auto")
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE")) if os.getenv("DB_POOL_SIZE") else None
+    DB_POOL_RECYCLE_SEC = int(os.getenv("DB_POOL_RECYCLE_SEC", "1800"))
+    # Ping a pooled connection on checkout only after this much idle time
+    DB_IDLE_PING_SEC = float(os.getenv("DB_IDLE_PING_SEC", "60"))
+    DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "5"))
+    # Optional read replica for get_session(read_only=True)
+    DB_REPLICA_URI = os.getenv("EZ_SCHEDULE_DB_REPLICA_URI", "")
+    # After a write, that caller's reads stay on the primary this long
+    DB_READ_STICKY_SEC = float(os.getenv("DB_READ_STICKY_SEC", "5"))
+    # Raise (instead of log) when a guarded code path exceeds its query budget
+    QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "false").lower() == "true"
+    # In-process name -> id cache for unique_divisions/teams/locations
+    INTERN_CACHE_SIZE = int(os.getenv("INTERN_CACHE_SIZE", "4096"))
+    # Accounts per batch when re-encrypting TeamSnap tokens after a key rotation
+    TOKEN_REENCRYPT_BATCH_SIZE = int(os.getenv("TOKEN_REENCRYPT_BATCH_SIZE", "200"))
     POST_AUTH_REDIRECT = os.getenv("POST_AUTH_REDIRECT", "http://localhost:3000")
     API_PREFIX = os.getenv("API_PREFIX", "/api/v1")
 
@@ -25,6 +88,31 @@ class Config:
     JWT_SECRET = os.getenv("JWT_SECRET", "dev")
     JWT_ACCESS_TTL_MIN = int(os.getenv("JWT_ACCESS_TTL_MIN", "15"))
     JWT_REFRESH_TTL_DAYS = int(os.getenv("JWT_REFRESH_TTL_DAYS", "30"))
+    # A rotated refresh token presented again within this window (parallel
+    # refreshes) gets the same successor; later it revokes the whole session
+    REFRESH_REUSE_GRACE_SEC = float(os.getenv("REFRESH_REUSE_GRACE_SEC", "10"))
+    # How often each process picks up sessions revoked by other instances
+    REVOCATION_SYNC_SEC = float(os.getenv("REVOCATION_SYNC_SEC", "10"))
+    # Rows deleted per batch by the maintenance compaction tasks
+    COMPACTION_BATCH_SIZE = int(os.getenv("COMPACTION_BATCH_SIZE", "500"))
+    # Verified access-token claims and /users/me profiles kept in process
+    AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+    AUTH_TOKEN_CACHE_TTL_SEC = float(os.getenv("AUTH_TOKEN_CACHE_TTL_SEC", "60"))
+    USER_PROFILE_CACHE_SIZE = int(os.getenv("USER_PROFILE_CACHE_SIZE", "10000"))
+    USER_PROFILE_CACHE_TTL_SEC = float(os.getenv("USER_PROFILE_CACHE_TTL_SEC", "300"))
+
+    # Password hashing (bcrypt). Existing hashes at another cost are rehashed on login.
+    PASSWORD_BCRYPT_ROUNDS = int(os.getenv("PASSWORD_BCRYPT_ROUNDS", "12"))
+    # Hasher pool: auto (threads on Lambda, else processes), process, thread
+    PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "auto")
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    # Hash jobs queued or running at once before new ones are turned away (503)
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "8"))
+    PASSWORD_HASH_TIMEOUT_SEC = float(os.getenv("PASSWORD_HASH_TIMEOUT_SEC", "10"))
+    # Login/signup attempts allowed per window, per client IP and per email
+    AUTH_RATE_WINDOW_SEC = int(os.getenv("AUTH_RATE_WINDOW_SEC", "300"))
+    AUTH_RATE_MAX_PER_IP = int(os.getenv("AUTH_RATE_MAX_PER_IP", "30"))
+    AUTH_RATE_MAX_PER_EMAIL = int(os.getenv("AUTH_RATE_MAX_PER_EMAIL", "5"))
 
     # Cookie settings
     COOKIE_SECURE = os.getenv("COOKIE_SECURE", "false").lower() == "true"
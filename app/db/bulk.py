@@ -0,0 +1,133 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, TypeVar
+import logging
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Keeps IN lists and multi-row VALUES well under driver/placeholder limits
+CHUNK_SIZE = 500
+
+T = TypeVar("T")
+
+
+def chunked(items: Sequence[T], size: int = CHUNK_SIZE) -> Iterator[Sequence[T]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _uniform(table: Any, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    A multi-row VALUES clause needs the same columns in every row; fill the
+    gaps with each column's scalar default (or NULL).
+    """
+    columns = unique(key for row in rows for key in row)
+    fill: Dict[str, Any] = {}
+    for name in columns:
+        default = table.c[name].default
+        fill[name] = default.arg if default is not None and default.is_scalar else None
+    return [{**fill, **row} for row in rows]
+
+
+def insert_missing(session: Session, model: Any, rows: Iterable[Dict[str, Any]]) -> int:
+    """
+    Inserts rows with one multi-row INSERT per chunk. On MySQL, SQLite and
+    PostgreSQL, rows that collide with a unique constraint (e.g. inserted
+    by a concurrent import) are left untouched instead of failing the
+    statement. Returns the number of rows sent.
+
+    IDs are not returned portably by multi-row inserts, so callers re-select
+    the keys they inserted.
+    """
+    table = model.__table__
+    rows = _uniform(table, list(rows))
+    if not rows:
+        return 0
+    dialect = session.get_bind().dialect.name
+
+    for chunk in chunked(rows):
+        if dialect == "mysql":
+            pk = table.primary_key.columns.values()[0].name
+            stmt = mysql.insert(table).values(list(chunk))
+            # SET pk = pk keeps the existing row as is; unlike INSERT IGNORE
+            # it doesn't hide other errors
+            stmt = stmt.on_duplicate_key_update({pk: table.c[pk]})
+        elif dialect == "sqlite":
+            stmt = sqlite.insert(table).values(list(chunk)).on_conflict_do_nothing()
+        elif dialect == "postgresql":
+            stmt = postgresql.insert(table).values(list(chunk)).on_conflict_do_nothing()
+        else:
+            stmt = insert(table).values(list(chunk))
+        session.execute(stmt)
+
+    logger.info(f"Inserted up to {len(rows)} rows into {table.name}")
+    return len(rows)
+
+
+def unique(values: Iterable[T]) -> List[T]:
+    return list(dict.fromkeys(values))
+
+
+def update_by_pk(
+    session: Session,
+    model: Any,
+    values: Dict[int, Dict[str, Any]],
+    scope: Optional[Any] = None,
+) -> Set[int]:
+    """
+    Applies per-row values keyed by primary key with one executemany
+    UPDATE, after one IN query per chunk that finds which keys exist
+    (optionally within `scope`, an extra WHERE clause such as team_id == x).
+
+    Returns the keys that matched no row; those are not written.
+    """
+    if not values:
+        return set()
+    pk = model.__mapper__.primary_key[0]
+    keys = list(values)
+    matched: Set[int] = set()
+    for chunk in chunked(keys):
+        query = select(pk).where(pk.in_(list(chunk)))
+        if scope is not None:
+            query = query.where(scope)
+        matched.update(session.execute(query).scalars())
+    if matched:
+        session.execute(
+            update(model),
+            [{pk.key: key, **values[key]} for key in keys if key in matched],
+        )
+    return set(keys) - matched
+
+
+def update_if_unchanged(
+    session: Session,
+    model: Any,
+    values: Dict[int, Dict[str, Any]],
+    expected: Dict[int, Dict[str, Any]],
+) -> Set[int]:
+    """
+    Compare-and-swap counterpart of update_by_pk: each row is written with
+    UPDATE ... WHERE pk = :pk AND <column> = <value read> for every column
+    in its `expected` entry, so rows another writer changed since they were
+    read are left alone.
+
+    Returns the keys that were not written (changed or gone).
+    """
+    pk = model.__mapper__.primary_key[0]
+    skipped: Set[int] = set()
+    for key, row in values.items():
+        conditions = [pk == key]
+        for column, value in expected[key].items():
+            conditions.append(getattr(model, column) == value)
+        result = session.execute(
+            update(model)
+            .where(*conditions)
+            .values(**row)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            skipped.add(key)
+    return skipped
@@ -0,0 +1,223 @@
+from __future__ import annotations
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import QueuePool
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+STRATEGY_LAMBDA = "lambda"
+STRATEGY_WSGI = "wsgi"
+STRATEGY_WORKER = "worker"
+
+# Pool shape per deployment profile. Lambda runs one request at a time, so
+# one connection is kept across invocations; the small overflow only serves
+# helpers that open their own session from a thread (e.g. geocode cache).
+POOL_PROFILES: Dict[str, Dict[str, Any]] = {
+    STRATEGY_LAMBDA: {"pool_size": 1, "max_overflow": 2, "pool_timeout": 10},
+    STRATEGY_WSGI: {"pool_size": 5, "max_overflow": 10, "pool_timeout": 30},
+    STRATEGY_WORKER: {"pool_size": 2, "max_overflow": 4, "pool_timeout": 30},
+}
+
+
+def resolve_strategy(strategy: Optional[str] = None) -> str:
+    strategy = (strategy or Config.DB_POOL_STRATEGY).lower()
+    if strategy == "auto":
+        return STRATEGY_LAMBDA if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else STRATEGY_WSGI
+    if strategy not in POOL_PROFILES:
+        raise ValueError(f"Unknown DB_POOL_STRATEGY {strategy!r}")
+    return strategy
+
+
+class PoolMetrics:
+    """Checkout latency (time spent waiting for a pooled connection) and connects."""
+
+    def __init__(self, window: int = 1024):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.idle_pings = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def observe_checkout(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = sorted(self._samples)
+            out: Dict[str, Any] = {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "idle_pings": self.idle_pings,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3)
+                if self.checkouts
+                else 0.0,
+            }
+        for name, q in (("p50_wait_ms", 0.5), ("p95_wait_ms", 0.95), ("p99_wait_ms", 0.99)):
+            out[name] = (
+                round(samples[min(int(q * len(samples)), len(samples) - 1)] * 1000, 3)
+                if samples
+                else 0.0
+            )
+        return out
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited."""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.metrics.observe_checkout(time.perf_counter() - started)
+
+
+def _install_idle_ping(engine: Engine, metrics: PoolMetrics, idle_seconds: float) -> None:
+    """
+    Pings a connection on checkout only if it sat idle longer than
+    idle_seconds (e.g. across a frozen Lambda), instead of pool_pre_ping's
+    round trip on every checkout. A dead connection is replaced
+    transparently by raising DisconnectionError.
+    """
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.connects += 1
+        connection_record.info["last_used"] = time.monotonic()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        connection_record.info["last_used"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        last_used = connection_record.info.get("last_used", 0.0)
+        if time.monotonic() - last_used < idle_seconds:
+            return
+        metrics.idle_pings += 1
+        try:
+            if hasattr(dbapi_connection, "ping"):
+                dbapi_connection.ping(False)  # PyMySQL: no implicit reconnect
+            else:
+                cursor = dbapi_connection.cursor()
+                try:
+                    cursor.execute("SELECT 1")
+                finally:
+                    cursor.close()
+        except Exception as e:
+            logger.info(f"Discarding stale pooled connection: {e}")
+            raise exc.DisconnectionError() from e
+
+
+def build_engine(url: Optional[str] = None, strategy: Optional[str] = None) -> Engine:
+    """
+    Creates an engine for the given (or configured) pool strategy:
+    "lambda", "wsgi", "worker", or "auto" to pick lambda when running on
+    AWS Lambda and wsgi otherwise.
+    """
+    url = url or Config.DB_URI
+    if not url:
+        raise ValueError("Database URI is not set in the configuration.")
+    strategy = resolve_strategy(strategy)
+    parsed = make_url(url)
+    metrics = PoolMetrics()
+
+    kwargs: Dict[str, Any] = {"echo": Config.DB_ECHO}
+    in_memory = parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+    if not in_memory:
+        pool_class = type("TimedQueuePool", (TimedQueuePool,), {"metrics": metrics})
+        kwargs.update(POOL_PROFILES[strategy])
+        kwargs.update(poolclass=pool_class, pool_recycle=Config.DB_POOL_RECYCLE_SEC)
+        if Config.DB_POOL_SIZE is not None:
+            kwargs["pool_size"] = Config.DB_POOL_SIZE
+    if parsed.get_backend_name() == "mysql":
+        kwargs["connect_args"] = {"connect_timeout": Config.DB_CONNECT_TIMEOUT}
+
+    engine = create_engine(url, **kwargs)
+    engine.info = {"strategy": strategy, "metrics": metrics}  # type: ignore[attr-defined]
+    _install_idle_ping(engine, metrics, Config.DB_IDLE_PING_SEC)
+    logger.info(f"Created {strategy} engine for {parsed.render_as_string(hide_password=True)}")
+    return engine
+
+
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> Engine:
+    """
+    Returns the process-wide engine, creating it on first use so importing
+    the app (e.g. on a Lambda cold start) never builds a pool or connects.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = build_engine()
+    return _engine
+
+
+_replica: Optional[Engine] = None
+
+
+def get_replica_engine() -> Optional[Engine]:
+    """
+    The read-replica engine, created on first use, or None when
+    EZ_SCHEDULE_DB_REPLICA_URI is not set.
+    """
+    global _replica
+    if not Config.DB_REPLICA_URI:
+        return None
+    if _replica is None:
+        with _engine_lock:
+            if _replica is None:
+                _replica = build_engine(Config.DB_REPLICA_URI)
+    return _replica
+
+
+def dispose_engine() -> None:
+    """Closes pooled connections, e.g. after fork or in tests/scripts."""
+    global _engine, _replica
+    with _engine_lock:
+        for engine in (_engine, _replica):
+            if engine is not None:
+                engine.dispose()
+        _engine = _replica = None
+
+
+def _engine_stats(engine: Optional[Engine]) -> Dict[str, Any]:
+    if engine is None:
+        return {"created": False}
+    info = engine.info  # type: ignore[attr-defined]
+    return {
+        "created": True,
+        "strategy": info["strategy"],
+        "pool": engine.pool.status(),
+        **info["metrics"].snapshot(),
+    }
+
+
+def pool_stats() -> Dict[str, Any]:
+    stats = _engine_stats(_engine)
+    if Config.DB_REPLICA_URI:
+        stats["replica"] = _engine_stats(_replica)
+    return stats
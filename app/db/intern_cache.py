@@ -0,0 +1,152 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+import logging
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# session.info slot holding IDs learned in the session's open transaction,
+# one dict per transaction or savepoint that staged them
+_STAGED = "intern_cache_staged"
+
+
+def _boundary(transaction: Any) -> Any:
+    """The savepoint or root transaction `transaction` belongs to."""
+    while transaction.parent is not None and not transaction.nested:
+        transaction = transaction.parent
+    return transaction
+
+
+class InternCache:
+    """
+    Bounded name -> id cache for rows that are looked up far more often than
+    they are created (unique_divisions, unique_teams, unique_locations).
+
+    IDs resolved inside a transaction are staged on the session and only
+    published process-wide once that transaction commits, so an insert that
+    gets rolled back never leaves a dangling ID behind. IDs staged inside a
+    begin_nested() savepoint move to the enclosing transaction when it is
+    released and are dropped when it rolls back. Within the session the
+    staged IDs are visible straight away.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None):
+        self.maxsize = maxsize or Config.INTERN_CACHE_SIZE
+        self._ids: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {
+            "hits": 0,
+            "staged_hits": 0,
+            "misses": 0,
+            "published": 0,
+            "discarded": 0,
+        }
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += n
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._stats)
+            out["size"] = len(self._ids)
+        hits = out["hits"] + out["staged_hits"]
+        lookups = hits + out["misses"]
+        out["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        return out
+
+    def get(self, session: Session, key: Hashable) -> Optional[int]:
+        for staged in (session.info.get(_STAGED) or {}).values():
+            if key in staged:
+                self._count("staged_hits")
+                return staged[key]
+        with self._lock:
+            value = self._ids.get(key)
+            if value is not None:
+                self._ids.move_to_end(key)
+                self._stats["hits"] += 1
+                return value
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, session: Session, key: Hashable, value: int) -> None:
+        """Stages an ID until the session's transaction commits."""
+        transaction = session.get_nested_transaction() or session.get_transaction()
+        session.info.setdefault(_STAGED, {}).setdefault(transaction, {})[key] = value
+
+    def publish(self, values: Dict[Hashable, int]) -> None:
+        with self._lock:
+            for key, value in values.items():
+                self._ids[key] = value
+                self._ids.move_to_end(key)
+            while len(self._ids) > self.maxsize:
+                self._ids.popitem(last=False)
+            self._stats["published"] += len(values)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
+
+
+_cache: Optional[InternCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_intern_cache() -> InternCache:
+    """
+    Returns the process-wide cache used by the Unique* get_or_create methods.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = InternCache()
+    return _cache
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_staged(session: Session) -> None:
+    # Also fires when a savepoint is released; its IDs then belong to the
+    # enclosing transaction until that commits.
+    frames = session.info.get(_STAGED)
+    if not frames:
+        return
+    savepoint = session.get_nested_transaction()
+    if savepoint is not None:
+        staged = frames.pop(savepoint, None)
+        if staged and savepoint.parent is not None:
+            frames.setdefault(_boundary(savepoint.parent), {}).update(staged)
+        return
+    session.info.pop(_STAGED, None)
+    published: Dict[Hashable, int] = {}
+    for staged in frames.values():
+        published.update(staged)
+    if published:
+        get_intern_cache().publish(published)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_staged(session: Session, transaction) -> None:
+    # Runs after _publish_staged on commit; anything still staged when a
+    # savepoint or the outermost transaction ends was rolled back or closed
+    # without a commit.
+    if transaction.parent is not None and not transaction.nested:
+        return
+    frames = session.info.get(_STAGED)
+    if not frames:
+        return
+    if transaction.parent is None:
+        dropped = session.info.pop(_STAGED, {}).values()
+    else:
+        dropped = [frames.pop(transaction, {})]
+    count = sum(len(staged) for staged in dropped)
+    if count:
+        get_intern_cache()._count("discarded", count)
+        logger.debug(f"Discarded {count} interned IDs on rollback")
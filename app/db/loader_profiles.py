@@ -0,0 +1,89 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+PROFILE_UPLOAD = "upload"
+PROFILE_EXPORT = "export"
+PROFILE_LISTING = "listing"
+
+
+def _event_profiles() -> Dict[str, Callable[[], List[Any]]]:
+    from app.db.models import Event, Team
+
+    return {
+        # Building TeamSnap payloads: every many-to-one in the same SELECT
+        PROFILE_UPLOAD: lambda: [
+            joinedload(Event.team),
+            joinedload(Event.opponent),
+            joinedload(Event.location),
+        ],
+        # Cross-club exports also need each team's club
+        PROFILE_EXPORT: lambda: [
+            joinedload(Event.team).joinedload(Team.club),
+            joinedload(Event.opponent),
+            joinedload(Event.location),
+        ],
+        # Schedule listings show opponent and location names; anything else
+        # touched by mistake raises instead of quietly lazy-loading per row
+        PROFILE_LISTING: lambda: [
+            selectinload(Event.opponent),
+            selectinload(Event.location),
+            raiseload("*"),
+        ],
+    }
+
+
+def _team_profiles() -> Dict[str, Callable[[], List[Any]]]:
+    from app.db.models import Team
+
+    return {
+        PROFILE_UPLOAD: lambda: [joinedload(Team.club)],
+        PROFILE_EXPORT: lambda: [joinedload(Team.club)],
+        PROFILE_LISTING: lambda: [joinedload(Team.club), raiseload("*")],
+    }
+
+
+def _opponent_profiles() -> Dict[str, Callable[[], List[Any]]]:
+    from app.db.models import Opponent
+
+    return {PROFILE_UPLOAD: lambda: [joinedload(Opponent.team)]}
+
+
+def _location_profiles() -> Dict[str, Callable[[], List[Any]]]:
+    from app.db.models import Location
+
+    return {PROFILE_UPLOAD: lambda: [joinedload(Location.team)]}
+
+
+_REGISTRY: Dict[str, Callable[[], Dict[str, Callable[[], List[Any]]]]] = {
+    "Event": _event_profiles,
+    "Team": _team_profiles,
+    "Opponent": _opponent_profiles,
+    "Location": _location_profiles,
+}
+_resolved: Dict[Tuple[str, str], Callable[[], List[Any]]] = {}
+
+
+def loader_options(model: Any, profile: Optional[str]) -> List[Any]:
+    """
+    The loader options for a named profile on a model, for
+    `query.options(*loader_options(Event, "upload"))`. None means the
+    relationships' default (lazy) loading.
+    Raises ValueError for an unknown model/profile pair.
+    """
+    if profile is None:
+        return []
+    key = (model.__name__, profile)
+    factory = _resolved.get(key)
+    if factory is None:
+        profiles = _REGISTRY.get(model.__name__)
+        factory = profiles().get(profile) if profiles else None
+        if factory is None:
+            raise ValueError(f"No loader profile {profile!r} for {model.__name__}")
+        _resolved[key] = factory
+    return factory()
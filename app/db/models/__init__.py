@@ -7,3 +7,6 @@ from app.db.models.unique_location import UniqueLocation
 from app.db.models.unique_division import UniqueDivision
 from app.db.models.unique_team import UniqueTeam
 from app.db.models.user import User
+from app.db.models.outbox import OutboxMessage
+from app.db.models.geocode_cache import GeocodeCacheEntry
+from app.db.models.refresh_token import RefreshToken, RevokedSession
@@ -8,8 +8,10 @@ from sqlalchemy import (
     UniqueConstraint,
     Index,
     JSON,
+    delete,
+    select,
 )
-from sqlalchemy.orm import relationship, declarative_base
+from sqlalchemy.orm import relationship, declarative_base, Session
 from datetime import datetime, timezone, timedelta
 import uuid
 from app.db.base import Base
@@ -50,6 +52,23 @@ class OAuthState(Base):
         JSON, nullable=True
     )  # e.g., {"name": "...", "contact_email": "..."}
 
+    __table_args__ = (Index("ix_oauth_state_expires_at", "expires_at"),)
+
+    @classmethod
+    def delete_expired(cls, session: Session, limit: int = 500) -> int:
+        """
+        Deletes up to `limit` abandoned states (expired, callback never
+        completed) by primary key after an index range on expires_at.
+        """
+        ids = list(
+            session.execute(
+                select(cls.id).where(cls.expires_at < now_utc()).limit(limit)
+            ).scalars()
+        )
+        if ids:
+            session.execute(delete(cls).where(cls.id.in_(ids)))
+        return len(ids)
+
 
 class TeamSnapAccount(Base):
     __tablename__ = "teamsnap_accounts"
@@ -68,4 +87,5 @@ class TeamSnapAccount(Base):
     __table_args__ = (
         UniqueConstraint("club_id", "teamsnap_user_id", name="uq_club_teamsnapid"),
         Index("ix_teamsnap_user", "teamsnap_user_id"),
+        Index("ix_teamsnap_access_expires", "access_token_expires_at"),
     )
@@ -1,9 +1,13 @@
 from __future__ import annotations
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index, select
 from sqlalchemy.orm import relationship
 from app.db.base import Base
+from app.db.bulk import chunked, insert_missing, unique, update_by_pk
+from app.db.loader_profiles import PROFILE_UPLOAD, loader_options
+from app.db.models.outbox import KIND_CREATE_EVENT, OutboxMessage
+from app.db.models.team import Team
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Iterator, Set, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -43,12 +47,91 @@ class Event(Base):
     location = relationship("Location", backref="events")
 
     teamsnap_event_id = Column(String(255), nullable=True)
+    # Fingerprint of the synced fields as of the last successful sync
+    synced_hash = Column(String(64), nullable=True)
+
+    __table_args__ = (
+        # get_or_create natural key; start_date leads so bulk_get_or_create's
+        # start_date IN (...) uses it too
+        Index("ix_events_start_opponent_location", "start_date", "opponent_id", "location_id"),
+        # get_not_uploaded, with or without a team filter
+        Index("ix_events_uploaded_team", "uploaded", "team_id"),
+    )
 
     def __repr__(self):
         return f"<Event(event_id={self.event_id}, team_id={self.team_id}, start_date={self.start_date})>"
 
+    # Own columns to_teamsnap_payload sends
+    PAYLOAD_COLUMNS = (
+        "opponent_id",
+        "location_id",
+        "start_date",
+        "duration_in_minutes",
+        "is_game",
+        "is_tbd",
+        "tracks_availability",
+        "browser_time_zone",
+        "time_zone",
+        "notify_team",
+        "notify_opponent",
+        "notify_opponent_contacts_name",
+        "notify_opponent_contacts_email",
+        "notify_team_as_member_id",
+    )
+
+    def to_teamsnap_payload(
+        self,
+        teamsnap_opponent_id: Optional[str] = None,
+        teamsnap_location_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Builds the TeamSnap event body for this row.
+        The optional IDs override the related rows' values, for opponents and
+        locations created in TeamSnap but not yet written back to the DB.
+        Raises ValueError if the team, opponent or location has no TeamSnap ID yet.
+        """
+        if not self.team or not self.team.teamsnap_team_id:
+            raise ValueError(f"Team {self.team_id} is not linked to TeamSnap")
+        if self.opponent is not None:
+            teamsnap_opponent_id = (
+                teamsnap_opponent_id or self.opponent.teamsnap_opponent_id
+            )
+            if not teamsnap_opponent_id:
+                raise ValueError(f"Opponent {self.opponent_id} is not in TeamSnap yet")
+        if self.location is not None:
+            teamsnap_location_id = (
+                teamsnap_location_id or self.location.teamsnap_location_id
+            )
+            if not teamsnap_location_id:
+                raise ValueError(f"Location {self.location_id} is not in TeamSnap yet")
+
+        return {
+            "team_id": self.team.teamsnap_team_id,
+            "opponent_id": teamsnap_opponent_id,
+            "location_id": teamsnap_location_id,
+            "start_date": self.start_date.isoformat(),
+            "duration_in_minutes": self.duration_in_minutes,
+            "is_game": bool(self.is_game),
+            "is_tbd": bool(self.is_tbd),
+            "tracks_availability": bool(self.tracks_availability),
+            "browser_time_zone": self.browser_time_zone,
+            "time_zone": self.time_zone,
+            "notify_team": bool(self.notify_team),
+            "notify_opponent": bool(self.notify_opponent),
+            "notify_opponent_contacts_name": self.notify_opponent_contacts_name,
+            "notify_opponent_contacts_email": self.notify_opponent_contacts_email,
+            "notify_team_as_member_id": self.notify_team_as_member_id,
+        }
+
     @classmethod
-    def get_or_create(cls, session: Session, **kwargs) -> Optional[Event]:
+    def get_or_create(
+        cls, session: Session, job_id: Optional[str] = None, **kwargs
+    ) -> Optional[Event]:
+        """
+        job_id: if given, a new event is also queued for upload to TeamSnap
+        (an outbox create_event message under that job) in the same
+        transaction
+        """
         opponent_id = kwargs.get("opponent_id")
         location_id = kwargs.get("location_id")
         start_date = kwargs.get("start_date")
@@ -65,19 +148,145 @@ class Event(Base):
             return existing_event
         event = cls(**kwargs)
         session.add(event)
+        session.flush()
         session.refresh(event)
+        if job_id is not None:
+            OutboxMessage.enqueue_event_write(session, KIND_CREATE_EVENT, event, job_id)
         return event
 
+    @staticmethod
+    def natural_key(values: Dict[str, Any]) -> Tuple[Any, Any, Any]:
+        """The columns get_or_create matches on."""
+        return (values.get("opponent_id"), values.get("location_id"), values["start_date"])
+
     @classmethod
-    def get_not_uploaded(cls, session: Session, team_id: Optional[int] = None) -> List:
-        if team_id is None:
-            return session.query(cls).filter(cls.uploaded == False).all()
-        return (
-            session.query(cls)
-            .filter(cls.uploaded == False, cls.team_id == team_id)
-            .all()
+    def _ids_for_keys(
+        cls, session: Session, keys: List[Tuple[Any, Any, Any]]
+    ) -> Dict[Tuple[Any, Any, Any], int]:
+        # opponent_id/location_id may be NULL, which a tuple IN never
+        # matches, so narrow by start_date in SQL and compare keys here.
+        wanted = set(keys)
+        found: Dict[Tuple[Any, Any, Any], int] = {}
+        for chunk in chunked(unique(key[2] for key in keys)):
+            rows = session.execute(
+                select(cls.opponent_id, cls.location_id, cls.start_date, cls.event_id)
+                .where(cls.start_date.in_(list(chunk)))
+                .order_by(cls.event_id)
+            )
+            for opponent_id, location_id, start_date, event_id in rows:
+                key = (opponent_id, location_id, start_date)
+                if key in wanted:
+                    found.setdefault(key, event_id)
+        return found
+
+    @classmethod
+    def bulk_get_or_create(
+        cls,
+        session: Session,
+        candidates: List[Dict[str, Any]],
+        job_id: Optional[str] = None,
+    ) -> Dict[Tuple[Any, Any, Any], int]:
+        """
+        Set-based get_or_create for a whole schedule: existing events are
+        resolved with one IN query per chunk of start dates, the rest are
+        inserted with one multi-row INSERT and read back the same way.
+
+        Args:
+            candidates (list): dicts of Event columns; "start_date" required
+            job_id (str): if given, the events created here are also queued
+                for upload under that outbox job, in the same transaction
+
+        Returns:
+            dict: (opponent_id, location_id, start_date) -> event_id for every candidate
+        """
+        by_key = {cls.natural_key(c): c for c in candidates}
+        found = cls._ids_for_keys(session, list(by_key))
+        missing = [key for key in by_key if key not in found]
+        if missing:
+            insert_missing(session, cls, [by_key[key] for key in missing])
+            created = cls._ids_for_keys(session, missing)
+            found.update(created)
+            if job_id is not None and created:
+                cls._queue_creates(session, job_id, created, by_key)
+        logger.info(f"Resolved {len(by_key)} events ({len(missing)} created)")
+        return found
+
+    @classmethod
+    def _queue_creates(
+        cls,
+        session: Session,
+        job_id: str,
+        created: Dict[Tuple[Any, Any, Any], int],
+        by_key: Dict[Tuple[Any, Any, Any], Dict[str, Any]],
+    ) -> None:
+        team_ids = unique(by_key[key]["team_id"] for key in created)
+        clubs = {
+            team_id: club_id
+            for team_id, club_id in session.execute(
+                select(Team.team_id, Team.club_id).where(Team.team_id.in_(team_ids))
+            )
+        }
+        OutboxMessage.enqueue_event_creates(
+            session,
+            job_id,
+            {event_id: clubs.get(by_key[key]["team_id"]) for key, event_id in created.items()},
         )
 
+    @classmethod
+    def get_not_uploaded(
+        cls,
+        session: Session,
+        team_id: Optional[int] = None,
+        profile: Optional[str] = None,
+    ) -> List:
+        """
+        profile: a loader profile name from app.db.loader_profiles, e.g.
+        "upload" to eager-load what to_teamsnap_payload reads
+        """
+        query = session.query(cls).options(*loader_options(cls, profile))
+        if team_id is None:
+            return query.filter(cls.uploaded == False).all()
+        return query.filter(cls.uploaded == False, cls.team_id == team_id).all()
+
+    @classmethod
+    def iter_not_uploaded(
+        cls,
+        session: Session,
+        team_id: Optional[int] = None,
+        chunk_size: int = 500,
+        profile: Optional[str] = PROFILE_UPLOAD,
+    ) -> Iterator[List[Event]]:
+        """
+        Streams the not-uploaded backlog in event_id order, one list of at
+        most chunk_size events at a time.
+
+        Each chunk is its own keyset page (event_id > last seen), so rows
+        marked uploaded between chunks never shift the window, and only one
+        chunk of ORM objects is alive at once. Pages are used instead of one
+        streamed yield_per cursor because callers write on the same
+        connection between chunks, which an open MySQL stream won't allow.
+
+        The default "upload" loader profile joins team, opponent and location
+        into each page so building payloads doesn't lazy-load.
+        """
+        last_id = 0
+        while True:
+            query = session.query(cls).filter(cls.uploaded == False, cls.event_id > last_id)
+            if team_id is not None:
+                query = query.filter(cls.team_id == team_id)
+            chunk = (
+                query.options(*loader_options(cls, profile))
+                .order_by(cls.event_id)
+                .limit(chunk_size)
+                .all()
+            )
+            if not chunk:
+                return
+            last_id = chunk[-1].event_id  # type: ignore
+            yield chunk
+            if len(chunk) < chunk_size:
+                return
+
     @classmethod
     def update_uploaded_status(
         cls, session: Session, event_id: int, teamsnap_event_id: str
@@ -89,3 +298,31 @@ class Event(Base):
             logger.info(f"Successfully updated event: {db_event}")
             return True
         return False
+
+    @classmethod
+    def bulk_update_uploaded_status(
+        cls, session: Session, uploads: Dict[int, str]
+    ) -> Set[int]:
+        """
+        Bulk counterpart of update_uploaded_status: marks many events
+        uploaded with one executemany UPDATE.
+
+        Args:
+            uploads (dict): local event_id -> teamsnap_event_id
+
+        Returns:
+            set: event_ids with no matching row (e.g. deleted mid-upload)
+        """
+        unmatched = update_by_pk(
+            session,
+            cls,
+            {
+                event_id: {"uploaded": True, "teamsnap_event_id": ts_id}
+                for event_id, ts_id in uploads.items()
+            },
+        )
+        if uploads:
+            logger.info(f"Marked {len(uploads) - len(unmatched)} events as uploaded")
+        if unmatched:
+            logger.warning(f"No event rows for uploaded IDs {sorted(unmatched)}")
+        return unmatched
@@ -0,0 +1,71 @@
+from __future__ import annotations
+from sqlalchemy import Column, String, DateTime, JSON, Index
+from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+import logging
+from app.db.base import Base
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+def now_utc() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class GeocodeCacheEntry(Base):
+    """
+    A stored Google lookup, keyed by a hash of (kind, normalized place, city).
+    A NULL result marks a negative entry (Google returned ZERO_RESULTS).
+    """
+
+    __tablename__ = "geocode_cache"
+
+    cache_key = Column(String(64), primary_key=True)
+    kind = Column(String(32), nullable=False)  # "geocode" | "nearest_field"
+    place = Column(String(255), nullable=False)
+    city = Column(String(255), nullable=False)
+    result = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=now_utc, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (Index("ix_geocode_cache_expires_at", "expires_at"),)
+
+    def __repr__(self):
+        return f"<GeocodeCacheEntry(kind={self.kind!r}, place={self.place!r}, city={self.city!r})>"
+
+    @classmethod
+    def get_valid(cls, session: Session, cache_key: str) -> Optional[GeocodeCacheEntry]:
+        entry = session.get(cls, cache_key)
+        if entry is None:
+            return None
+        expires_at = entry.expires_at
+        if expires_at.tzinfo is None:  # SQLite drops tzinfo
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        if expires_at <= now_utc():
+            return None
+        return entry
+
+    @classmethod
+    def store(
+        cls,
+        session: Session,
+        cache_key: str,
+        kind: str,
+        place: str,
+        city: str,
+        result: Optional[Dict[str, Any]],
+        expires_at: datetime,
+    ) -> None:
+        session.merge(
+            cls(
+                cache_key=cache_key,
+                kind=kind,
+                place=place[:255],
+                city=city[:255],
+                result=result,
+                created_at=now_utc(),
+                expires_at=expires_at,
+            )
+        )
@@ -1,8 +1,11 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from __future__ import annotations
+from sqlalchemy import Column, Integer, String, ForeignKey, Index, select
 from sqlalchemy.orm import relationship
 from app.db.base import Base
+from app.db.bulk import chunked, insert_missing, update_by_pk
+from app.db.loader_profiles import loader_options
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Set, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,9 +24,59 @@ class Location(Base):
     team_id = Column(Integer, ForeignKey("teams.team_id"), nullable=False)
     team = relationship("Team", backref="locations")
 
+    # One index per matched column; see find_existing
+    __table_args__ = (
+        Index("ix_locations_team_name", "team_id", "name"),
+        Index("ix_locations_team_address", "team_id", "address"),
+        Index("ix_locations_team_url", "team_id", "url"),
+    )
+
+    MATCH_FIELDS = ("name", "address", "url")
+
     def __repr__(self):
         return f"<Location(location_id={self.location_id}, name='{self.name}', teamsnap_location_id={self.teamsnap_location_id})>"
 
+    def to_teamsnap_payload(self) -> Dict[str, Any]:
+        """
+        Builds the TeamSnap location body for this row.
+        Raises ValueError if the owning team is not linked to TeamSnap.
+        """
+        if not self.team or not self.team.teamsnap_team_id:
+            raise ValueError(f"Team {self.team_id} is not linked to TeamSnap")
+        return {
+            "team_id": self.team.teamsnap_team_id,
+            "name": self.name,
+            "address": self.address,
+            "url": self.url,
+        }
+
+    @classmethod
+    def find_existing(
+        cls,
+        session: Session,
+        team_id: int,
+        name: str,
+        address: str,
+        url: Optional[str] = None,
+    ) -> Optional[Location]:
+        """
+        The team's location matching name, address or url, tried in that
+        order. Separate equality probes each use their own (team_id, column)
+        index, where a single OR query would scan the table.
+        """
+        for field, value in zip(cls.MATCH_FIELDS, (name, address, url)):
+            if value is None:
+                continue
+            existing = (
+                session.query(cls)
+                .filter(cls.team_id == team_id, getattr(cls, field) == value)
+                .order_by(cls.location_id)
+                .first()
+            )
+            if existing:
+                return existing
+        return None
+
     @classmethod
     def get_or_create(
         cls,
@@ -34,14 +87,7 @@ class Location(Base):
         url: Optional[str] = None,
         teamsnap_location_id: Optional[str] = None,
     ):
-        existing = (
-            session.query(cls)
-            .filter(
-                (cls.name == name) | (cls.address == address) | (cls.url == url),
-                cls.team_id == team_id,
-            )
-            .first()
-        )
+        existing = cls.find_existing(session, team_id, name, address, url)
         if existing:
             return existing
         location = cls(
@@ -57,13 +103,89 @@ class Location(Base):
         return location
 
     @classmethod
-    def get_locations(cls, session: Session, team_id: int) -> Optional[List]:
+    def _match_existing(
+        cls, session: Session, candidates: List[Dict[str, Any]]
+    ) -> Dict[Tuple[int, str], int]:
+        """
+        Same matching as find_existing, resolved with one indexed
+        team_id IN / column IN query per match field and chunk of candidates.
+        """
+        found: Dict[Tuple[int, str], int] = {}
+        for chunk in chunked(candidates):
+            by_field: Dict[Tuple[str, int, Any], int] = {}
+            for field in cls.MATCH_FIELDS:
+                keys = {(c["team_id"], c[field]) for c in chunk if c.get(field)}
+                if not keys:
+                    continue
+                column = getattr(cls, field)
+                rows = session.execute(
+                    select(cls.team_id, column, cls.location_id)
+                    .where(
+                        cls.team_id.in_({team_id for team_id, _ in keys}),
+                        column.in_({value for _, value in keys}),
+                    )
+                    .order_by(cls.location_id)
+                )
+                for team_id, value, location_id in rows:
+                    if (team_id, value) in keys:
+                        by_field.setdefault((field, team_id, value), location_id)
+
+            for c in chunk:
+                for field in cls.MATCH_FIELDS:
+                    location_id = by_field.get((field, c["team_id"], c.get(field)))
+                    if location_id:
+                        found[(c["team_id"], c["name"])] = location_id
+                        break
+        return found
+
+    @classmethod
+    def bulk_get_or_create(
+        cls, session: Session, candidates: List[Dict[str, Any]]
+    ) -> Dict[Tuple[int, str], int]:
+        """
+        Set-based get_or_create for many locations: one lookup query per
+        chunk, one multi-row INSERT for the rows that don't exist yet and
+        one query to read their IDs back.
+
+        Args:
+            candidates (list): dicts of Location columns; "team_id", "name" and "address" required
+
+        Returns:
+            dict: (team_id, name) -> location_id for every candidate
+        """
+        by_key = {(c["team_id"], c["name"]): c for c in candidates}
+        found = cls._match_existing(session, list(by_key.values()))
+        missing = [by_key[key] for key in by_key if key not in found]
+        if missing:
+            # Candidates sharing an address or url with an earlier one map
+            # to that row, as they would with sequential get_or_create calls
+            seen = set()
+            to_insert = []
+            for c in missing:
+                aliases = {("address", c["team_id"], c["address"])}
+                if c.get("url"):
+                    aliases.add(("url", c["team_id"], c["url"]))
+                if not aliases & seen:
+                    to_insert.append(c)
+                seen |= aliases
+            insert_missing(session, cls, to_insert)
+            found.update(cls._match_existing(session, missing))
+        logger.info(
+            f"Resolved {len(by_key)} locations ({len(missing)} created)"
+        )
+        return found
+
+    @classmethod
+    def get_locations(
+        cls, session: Session, team_id: int, profile: Optional[str] = None
+    ) -> Optional[List]:
         """
         Retrieves a list of locations for a specific team that do not have a Teamsnap ID.
 
         Args:
             team_id (int): ID of the team to check against
-            teamsnap_location_id (str): Optional Teamsnap opponent ID to filter by
+            profile (str): Optional loader profile name from app.db.loader_profiles,
+                e.g. "upload" to eager-load what to_teamsnap_payload reads
 
         Returns:
             list: List of Opponent objects if found, empty list otherwise
@@ -71,6 +193,7 @@ class Location(Base):
 
         locations = (
             session.query(cls)
+            .options(*loader_options(cls, profile))
             .filter(cls.team_id == team_id, cls.teamsnap_location_id == None)
             .all()
         )
@@ -91,3 +214,33 @@ class Location(Base):
             logger.info(f"Successfully updated location: {db_location}")
             return True
         return False
+
+    @classmethod
+    def bulk_update_locations(
+        cls, session: Session, mapping: Dict[int, str], team_id: Optional[int] = None
+    ) -> Set[int]:
+        """
+        Bulk counterpart of update_location: stores many TeamSnap location IDs
+        with one executemany UPDATE.
+
+        Args:
+            mapping (dict): local location_id -> teamsnap_location_id
+            team_id (int): Optional team the rows must belong to
+
+        Returns:
+            set: location_ids with no matching row (those are not written)
+        """
+        unmatched = update_by_pk(
+            session,
+            cls,
+            {
+                local_id: {"teamsnap_location_id": ts_id}
+                for local_id, ts_id in mapping.items()
+            },
+            scope=(cls.team_id == team_id) if team_id is not None else None,
+        )
+        if mapping:
+            logger.info(f"Updated TeamSnap IDs for {len(mapping) - len(unmatched)} locations")
+        if unmatched:
+            logger.warning(f"No location rows for IDs {sorted(unmatched)}")
+        return unmatched
@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint, select
 from sqlalchemy.orm import relationship
 from app.db.base import Base
+from app.db.bulk import chunked, insert_missing, update_by_pk
+from app.db.loader_profiles import loader_options
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Set, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -24,9 +26,28 @@ class Opponent(Base):
 
     teamsnap_opponent_id = Column(String(255), nullable=True)
 
+    __table_args__ = (
+        UniqueConstraint("team_id", "name", name="uq_opponents_team_name"),
+    )
+
     def __repr__(self):
         return f"<Opponent(opponent_id={self.opponent_id}, name='{self.name}', team_id={self.team_id}, teamsnap_opponent_id={self.teamsnap_opponent_id})>"
 
+    def to_teamsnap_payload(self) -> Dict[str, Any]:
+        """
+        Builds the TeamSnap opponent body for this row.
+        Raises ValueError if the owning team is not linked to TeamSnap.
+        """
+        if not self.team or not self.team.teamsnap_team_id:
+            raise ValueError(f"Team {self.team_id} is not linked to TeamSnap")
+        return {
+            "team_id": self.team.teamsnap_team_id,
+            "name": self.name,
+            "contacts_name": self.contacts_name,
+            "contacts_phone": self.contacts_phone,
+            "contacts_email": self.contacts_email,
+        }
+
     @classmethod
     def get_or_create(
         cls,
@@ -59,19 +80,71 @@ class Opponent(Base):
         return opponent
 
     @classmethod
-    def get_opponents(cls, session: Session, team_id: int) -> Optional[List]:
+    def _ids_for_keys(
+        cls, session: Session, keys: List[Tuple[int, str]]
+    ) -> Dict[Tuple[int, str], int]:
+        # Two plain INs (not a tuple IN) so every dialect can range-scan the
+        # (team_id, name) key; exact pairs are picked out here.
+        wanted = set(keys)
+        found: Dict[Tuple[int, str], int] = {}
+        for chunk in chunked(keys):
+            rows = session.execute(
+                select(cls.team_id, cls.name, cls.opponent_id).where(
+                    cls.team_id.in_({team_id for team_id, _ in chunk}),
+                    cls.name.in_({name for _, name in chunk}),
+                )
+            )
+            for team_id, name, opponent_id in rows:
+                if (team_id, name) in wanted:
+                    found.setdefault((team_id, name), opponent_id)
+        return found
+
+    @classmethod
+    def bulk_get_or_create(
+        cls, session: Session, candidates: List[Dict[str, Any]]
+    ) -> Dict[Tuple[int, str], int]:
+        """
+        Set-based get_or_create for many opponents.
+
+        Existing rows are resolved with one (team_id, name) IN query per
+        chunk, the rest are inserted with one multi-row INSERT and read
+        back the same way.
+
+        Args:
+            candidates (list): dicts of Opponent columns; "team_id" and "name" required
+
+        Returns:
+            dict: (team_id, name) -> opponent_id for every candidate
+        """
+        by_key = {(c["team_id"], c["name"]): c for c in candidates}
+        found = cls._ids_for_keys(session, list(by_key))
+        missing = [key for key in by_key if key not in found]
+        if missing:
+            insert_missing(session, cls, [by_key[key] for key in missing])
+            found.update(cls._ids_for_keys(session, missing))
+        logger.info(
+            f"Resolved {len(by_key)} opponents ({len(missing)} created)"
+        )
+        return found
+
+    @classmethod
+    def get_opponents(
+        cls, session: Session, team_id: int, profile: Optional[str] = None
+    ) -> Optional[List]:
         """
         Retrieves a list of opponents for a specific team that do not have a Teamsnap ID.
 
         Args:
             team_id (int): ID of the team to check against
-            teamsnap_opponent_id (str): Optional Teamsnap opponent ID to filter by
+            profile (str): Optional loader profile name from app.db.loader_profiles,
+                e.g. "upload" to eager-load what to_teamsnap_payload reads
 
         Returns:
             list: List of Opponent objects if found, empty list otherwise
         """
         opponents = (
             session.query(cls)
+            .options(*loader_options(cls, profile))
             .filter(cls.team_id == team_id, cls.teamsnap_opponent_id == None)
             .all()
         )
@@ -92,3 +165,33 @@ class Opponent(Base):
             logger.info(f"Successfully updated opponent: {db_opponent}")
             return True
         return False
+
+    @classmethod
+    def bulk_update_opponents(
+        cls, session: Session, mapping: Dict[int, str], team_id: Optional[int] = None
+    ) -> Set[int]:
+        """
+        Bulk counterpart of update_opponent: stores many TeamSnap opponent IDs
+        with one executemany UPDATE.
+
+        Args:
+            mapping (dict): local opponent_id -> teamsnap_opponent_id
+            team_id (int): Optional team the rows must belong to
+
+        Returns:
+            set: opponent_ids with no matching row (those are not written)
+        """
+        unmatched = update_by_pk(
+            session,
+            cls,
+            {
+                local_id: {"teamsnap_opponent_id": ts_id}
+                for local_id, ts_id in mapping.items()
+            },
+            scope=(cls.team_id == team_id) if team_id is not None else None,
+        )
+        if mapping:
+            logger.info(f"Updated TeamSnap IDs for {len(mapping) - len(unmatched)} opponents")
+        if unmatched:
+            logger.warning(f"No opponent rows for IDs {sorted(unmatched)}")
+        return unmatched
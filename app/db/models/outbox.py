@@ -0,0 +1,224 @@
+from __future__ import annotations
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    DateTime,
+    Text,
+    JSON,
+    Index,
+    UniqueConstraint,
+    func,
+)
+from sqlalchemy.orm import Session
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, List, Optional
+import logging
+import uuid
+from app.db.base import Base
+from app.db.bulk import insert_missing
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+STATUS_PENDING = "pending"
+STATUS_IN_PROGRESS = "in_progress"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+KIND_SYNC_TEAM = "sync_team"
+KIND_SYNC_CLUB = "sync_club"
+KIND_CREATE_EVENT = "create_event"
+KIND_UPDATE_EVENT = "update_event"
+KIND_DELETE_EVENT = "delete_event"
+
+
+def now_utc() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class OutboxMessage(Base):
+    """
+    A TeamSnap write to perform later. Rows are added in the same session
+    as the Event/Opponent/Location changes they describe, so the write is
+    queued if and only if those changes commit.
+    """
+
+    __tablename__ = "teamsnap_outbox"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String(36), nullable=False)
+    club_id = Column(String(36), nullable=True)
+    kind = Column(String(32), nullable=False)  # e.g. "create_event", "sync_team"
+    payload = Column(JSON, nullable=False)
+    idempotency_key = Column(String(255), nullable=False)
+
+    status = Column(String(16), nullable=False, default=STATUS_PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    result = Column(JSON, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), default=now_utc, nullable=False)
+    available_at = Column(DateTime(timezone=True), default=now_utc, nullable=False)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("idempotency_key", name="uq_outbox_idempotency_key"),
+        Index("ix_outbox_status_available", "status", "available_at"),
+        Index("ix_outbox_job", "job_id"),
+    )
+
+    def __repr__(self):
+        return f"<OutboxMessage(id={self.id}, kind={self.kind!r}, status={self.status!r}, job_id={self.job_id})>"
+
+    @classmethod
+    def enqueue(
+        cls,
+        session: Session,
+        job_id: str,
+        kind: str,
+        payload: Dict[str, Any],
+        idempotency_key: str,
+        club_id: Optional[str] = None,
+    ) -> OutboxMessage:
+        """
+        Queues a message unless one with the same idempotency key is still
+        pending, in which case that message is returned instead.
+        """
+        existing = (
+            session.query(cls).filter(cls.idempotency_key == idempotency_key).first()
+        )
+        if existing is not None:
+            if existing.status == STATUS_PENDING:
+                return existing
+            # Running or finished: free the key so the write runs again. A
+            # running message has already read its rows and would miss this
+            # change.
+            existing.idempotency_key = f"{idempotency_key}#{existing.id}"  # type: ignore
+            session.flush()
+        message = cls(
+            job_id=job_id,
+            club_id=club_id,
+            kind=kind,
+            payload=payload,
+            idempotency_key=idempotency_key,
+        )
+        session.add(message)
+        session.flush()  # sessions don't autoflush; make the key visible
+        return message
+
+    @classmethod
+    def enqueue_event_write(
+        cls, session: Session, kind: str, event: Any, job_id: Optional[str] = None
+    ) -> str:
+        """
+        Queues a create/update/delete of one event in the caller's
+        transaction and returns its job ID.
+        """
+        job_id = job_id or str(uuid.uuid4())
+        payload: Dict[str, Any] = {"event_id": event.event_id}
+        if kind == KIND_DELETE_EVENT:
+            payload["teamsnap_event_id"] = event.teamsnap_event_id
+            key = f"{kind}:{event.teamsnap_event_id}"
+        else:
+            key = f"{kind}:{event.event_id}"
+        club_id = event.team.club_id if event.team else None
+        cls.enqueue(
+            session, job_id=job_id, kind=kind, payload=payload, idempotency_key=key, club_id=club_id
+        )
+        return job_id
+
+    @classmethod
+    def enqueue_event_creates(
+        cls, session: Session, job_id: str, club_by_event: Dict[int, Optional[str]]
+    ) -> int:
+        """
+        Bulk counterpart of enqueue_event_write for newly inserted events:
+        one multi-row INSERT per chunk. Keys already queued are left alone.
+        """
+        now = now_utc()
+        return insert_missing(
+            session,
+            cls,
+            [
+                {
+                    "job_id": job_id,
+                    "club_id": club_id,
+                    "kind": KIND_CREATE_EVENT,
+                    "payload": {"event_id": event_id},
+                    "idempotency_key": f"{KIND_CREATE_EVENT}:{event_id}",
+                    "status": STATUS_PENDING,
+                    "attempts": 0,
+                    "created_at": now,
+                    "available_at": now,
+                }
+                for event_id, club_id in club_by_event.items()
+            ],
+        )
+
+    @classmethod
+    def claim_batch(
+        cls, session: Session, limit: int, lease_seconds: int
+    ) -> List[OutboxMessage]:
+        """
+        Leases up to `limit` due messages. Uses SKIP LOCKED where the
+        dialect supports it so concurrent workers never claim the same row.
+        Messages whose lease expired (crashed worker) are picked up again.
+        """
+        now = now_utc()
+        messages = (
+            session.query(cls)
+            .filter(
+                (
+                    (cls.status == STATUS_PENDING) & (cls.available_at <= now)
+                )
+                | ((cls.status == STATUS_IN_PROGRESS) & (cls.locked_until < now))
+            )
+            .order_by(cls.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        for message in messages:
+            message.status = STATUS_IN_PROGRESS  # type: ignore
+            message.attempts = (message.attempts or 0) + 1  # type: ignore
+            message.locked_until = now + timedelta(seconds=lease_seconds)  # type: ignore
+        return messages
+
+    @classmethod
+    def job_club_ids(cls, session: Session, job_id: str) -> List[Optional[str]]:
+        """The clubs a job's messages belong to; empty if there is no such job."""
+        return [
+            club_id
+            for (club_id,) in session.query(cls.club_id)
+            .filter(cls.job_id == job_id)
+            .distinct()
+        ]
+
+    @classmethod
+    def job_progress(cls, session: Session, job_id: str) -> Optional[Dict[str, Any]]:
+        rows = (
+            session.query(cls.status, func.count(cls.id))
+            .filter(cls.job_id == job_id)
+            .group_by(cls.status)
+            .all()
+        )
+        if not rows:
+            return None
+        counts = {status: count for status, count in rows}
+        total = sum(counts.values())
+        finished = counts.get(STATUS_DONE, 0) + counts.get(STATUS_FAILED, 0)
+        errors = [
+            {"id": m.id, "kind": m.kind, "error": m.last_error}
+            for m in session.query(cls)
+            .filter(cls.job_id == job_id, cls.status == STATUS_FAILED)
+            .limit(50)
+        ]
+        return {
+            "job_id": job_id,
+            "total": total,
+            "counts": counts,
+            "done": finished == total,
+            "progress": round(finished / total, 3),
+            "errors": errors,
+        }
@@ -0,0 +1,214 @@
+from __future__ import annotations
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, delete, select, update
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+import logging
+import uuid
+from app.db.base import Base
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# RefreshToken.rotate() outcomes
+ROTATED = "rotated"
+REPLAYED = "replayed"  # the same token again within the grace window
+REUSED = "reused"  # an already-rotated token: the family is revoked
+INVALID = "invalid"  # unknown, expired or revoked
+
+
+def now_utc() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:  # SQLite drops tzinfo
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def new_id() -> str:
+    return uuid.uuid4().hex
+
+
+class RefreshToken(Base):
+    """
+    One issued refresh token. Every login starts a family (a browser
+    session); each /refresh spends the presented token and issues its
+    child in the same family. Presenting a spent token again means it was
+    copied, so the whole family is revoked.
+    """
+
+    __tablename__ = "refresh_tokens"
+
+    jti = Column(String(32), primary_key=True)
+    family_id = Column(String(32), nullable=False)
+    user_id = Column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    parent_jti = Column(String(32), nullable=True)
+    issued_at = Column(DateTime(timezone=True), default=now_utc, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    used_at = Column(DateTime(timezone=True), nullable=True)  # rotated
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_refresh_tokens_family", "family_id"),
+        Index("ix_refresh_tokens_parent", "parent_jti"),
+        Index("ix_refresh_tokens_user", "user_id"),
+        Index("ix_refresh_tokens_expires_at", "expires_at"),
+    )
+
+    def __repr__(self):
+        return f"<RefreshToken(jti={self.jti!r}, family_id={self.family_id!r}, user_id={self.user_id})>"
+
+    @classmethod
+    def issue(
+        cls,
+        session: Session,
+        user_id: int,
+        ttl: timedelta,
+        family_id: Optional[str] = None,
+        parent_jti: Optional[str] = None,
+    ) -> RefreshToken:
+        now = now_utc()
+        token = cls(
+            jti=new_id(),
+            family_id=family_id or new_id(),
+            user_id=user_id,
+            parent_jti=parent_jti,
+            issued_at=now,
+            expires_at=now + ttl,
+        )
+        session.add(token)
+        session.flush()
+        return token
+
+    @classmethod
+    def rotate(
+        cls, session: Session, jti: str, ttl: timedelta, grace: timedelta, revoke_for: timedelta
+    ) -> Tuple[str, Optional[RefreshToken]]:
+        """
+        Spends token `jti` and returns (ROTATED, child). A token spent less
+        than `grace` ago (two tabs refreshing at once) returns (REPLAYED,
+        the child already issued); after that (REUSED, None) and the family
+        is revoked for `revoke_for`. Unknown, expired or revoked tokens give
+        (INVALID, None).
+        """
+        token = session.execute(
+            select(cls).where(cls.jti == jti).with_for_update()
+        ).scalar_one_or_none()
+        now = now_utc()
+        if token is None or token.revoked_at is not None or _aware(token.expires_at) <= now:  # type: ignore
+            return INVALID, None
+
+        if token.used_at is not None:
+            child = session.execute(
+                select(cls).where(cls.parent_jti == jti, cls.revoked_at.is_(None))
+            ).scalar_one_or_none()
+            if child is not None and now - _aware(token.used_at) <= grace:  # type: ignore
+                return REPLAYED, child
+            logger.warning(
+                f"Refresh token reuse for user {token.user_id}; revoking family {token.family_id}"
+            )
+            RevokedSession.revoke(
+                session, token.family_id, revoke_for, user_id=token.user_id, reason=REUSED  # type: ignore
+            )
+            return REUSED, None
+
+        token.used_at = now  # type: ignore
+        child = cls.issue(
+            session, token.user_id, ttl, family_id=token.family_id, parent_jti=jti  # type: ignore
+        )
+        return ROTATED, child
+
+    @classmethod
+    def delete_expired(cls, session: Session, limit: int = 500) -> int:
+        """Deletes up to `limit` expired tokens (via the expires_at index)."""
+        jtis = list(
+            session.execute(
+                select(cls.jti).where(cls.expires_at < now_utc()).limit(limit)
+            ).scalars()
+        )
+        if jtis:
+            session.execute(delete(cls).where(cls.jti.in_(jtis)))
+        return len(jtis)
+
+
+class RevokedSession(Base):
+    """
+    A revoked refresh-token family. Access tokens carry their family as the
+    `sid` claim, so a row here also cuts off access tokens that are still
+    unexpired. Rows are only needed until those access tokens expire
+    (expires_at); the compaction job removes them after that.
+    """
+
+    __tablename__ = "revoked_sessions"
+
+    family_id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, nullable=True)
+    reason = Column(String(32), nullable=True)  # "logout" | "reused" | ...
+    revoked_at = Column(DateTime(timezone=True), default=now_utc, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_revoked_sessions_revoked_at", "revoked_at"),
+        Index("ix_revoked_sessions_expires_at", "expires_at"),
+    )
+
+    def __repr__(self):
+        return f"<RevokedSession(family_id={self.family_id!r}, reason={self.reason!r})>"
+
+    @classmethod
+    def revoke(
+        cls,
+        session: Session,
+        family_id: str,
+        keep_for: timedelta,
+        user_id: Optional[int] = None,
+        reason: Optional[str] = None,
+    ) -> None:
+        """
+        Revokes every token of the family and records the family for
+        `keep_for` (the access token lifetime) so access tokens minted from
+        it are refused.
+        """
+        now = now_utc()
+        session.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+        )
+        session.merge(
+            cls(
+                family_id=family_id,
+                user_id=user_id,
+                reason=reason,
+                revoked_at=now,
+                expires_at=now + keep_for,
+            )
+        )
+
+    @classmethod
+    def revoked_since(
+        cls, session: Session, since: Optional[datetime]
+    ) -> List[Tuple[str, datetime, datetime]]:
+        """
+        (family_id, revoked_at, expires_at) of live revocations, all of them
+        or only those recorded after `since`.
+        """
+        query = select(cls.family_id, cls.revoked_at, cls.expires_at)
+        if since is None:
+            query = query.where(cls.expires_at > now_utc())
+        else:
+            query = query.where(cls.revoked_at > since)
+        return [tuple(row) for row in session.execute(query)]  # type: ignore
+
+    @classmethod
+    def delete_expired(cls, session: Session, limit: int = 500) -> int:
+        ids = list(
+            session.execute(
+                select(cls.family_id).where(cls.expires_at < now_utc()).limit(limit)
+            ).scalars()
+        )
+        if ids:
+            session.execute(delete(cls).where(cls.family_id.in_(ids)))
+        return len(ids)
@@ -2,6 +2,8 @@ from sqlalchemy import Column, Integer, String, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm import Session
 from app.db.base import Base
+from app.db.loader_profiles import loader_options
+from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,5 +28,12 @@ class Team(Base):
         return f"<Team(team_id={self.team_id}, team_name='{self.team_name}', club_id={self.club_id}, teamsnap_id={self.teamsnap_id})>"
 
     @classmethod
-    def get_teams_by_club_id(cls, session: Session, club_id: int):
-        return session.query(cls).filter_by(club_id=club_id).all()
+    def get_teams_by_club_id(
+        cls, session: Session, club_id: int, profile: Optional[str] = None
+    ):
+        return (
+            session.query(cls)
+            .options(*loader_options(cls, profile))
+            .filter_by(club_id=club_id)
+            .all()
+        )
@@ -2,6 +2,7 @@ from __future__ import annotations
 from sqlalchemy import Column, Integer, String
 from sqlalchemy.orm import Session
 from app.db.base import Base
+from app.db.intern_cache import get_intern_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,10 +20,15 @@ class UniqueDivision(Base):
 
     @classmethod
     def get_or_create(cls, session: Session, name: str) -> int:
+        cache = get_intern_cache()
+        key = (cls.__tablename__, name)
+        cached = cache.get(session, key)
+        if cached is not None:
+            return cached
         instance = session.query(cls).filter_by(name=name).first()
-        if instance:
-            return instance.division_id  # type: ignore
-        instance = cls(name=name)
-        session.add(instance)
-        session.flush()
+        if not instance:
+            instance = cls(name=name)
+            session.add(instance)
+            session.flush()
+        cache.put(session, key, instance.division_id)  # type: ignore
         return instance.division_id  # type: ignore
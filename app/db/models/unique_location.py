@@ -1,8 +1,10 @@
 from __future__ import annotations
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index
 from sqlalchemy.orm import Session
 from app.db.base import Base
-from typing import Optional
+from app.db.intern_cache import get_intern_cache
+from datetime import datetime, timezone
+from typing import Optional, List
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,10 +18,50 @@ class UniqueLocation(Base):
     name = Column(String(255), nullable=False)
     address = Column(String(512), nullable=False)
     url = Column(String(512), nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    # When latitude/longitude were last set; the field index refreshes by it
+    coordinates_updated_at = Column(DateTime(timezone=True), nullable=True)
+
+    # One index per matched column; see find_existing
+    __table_args__ = (
+        Index("ix_unique_locations_name", "name"),
+        Index("ix_unique_locations_address", "address"),
+        Index("ix_unique_locations_url", "url"),
+        Index("ix_unique_locations_coordinates_updated_at", "coordinates_updated_at"),
+    )
+
+    MATCH_FIELDS = ("name", "address", "url")
 
     def __repr__(self):
         return f"<Location(location_id={self.location_id}, name='{self.name}')>"
 
+    def set_coordinates(self, latitude: float, longitude: float) -> None:
+        self.latitude = latitude  # type: ignore
+        self.longitude = longitude  # type: ignore
+        self.coordinates_updated_at = datetime.now(timezone.utc)  # type: ignore
+
+    @classmethod
+    def find_existing(
+        cls, session: Session, name: str, address: str, url: Optional[str] = None
+    ) -> Optional[UniqueLocation]:
+        """
+        The row matching name, address or url, tried in that order so each
+        probe is a single indexed equality lookup instead of an OR scan.
+        """
+        for field, value in zip(cls.MATCH_FIELDS, (name, address, url)):
+            if value is None:
+                continue
+            existing = (
+                session.query(cls)
+                .filter(getattr(cls, field) == value)
+                .order_by(cls.location_id)
+                .first()
+            )
+            if existing:
+                return existing
+        return None
+
     @classmethod
     def get_or_create(
         cls,
@@ -27,20 +69,47 @@ class UniqueLocation(Base):
         name: str,
         address: str,
         url: Optional[str] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
     ) -> UniqueLocation:
-        existing = (
-            session.query(cls)
-            .filter((cls.name == name) | (cls.address == address) | (cls.url == url))
-            .first()
-        )
+        cache = get_intern_cache()
+        key = (cls.__tablename__, name, address, url)
+        cached = cache.get(session, key)
+        # A primary-key get is served from the identity map once loaded
+        existing = session.get(cls, cached) if cached is not None else None
+        if existing is None:
+            existing = cls.find_existing(session, name, address, url)
         if existing:
+            if existing.latitude is None and latitude is not None and longitude is not None:
+                existing.set_coordinates(latitude, longitude)
+            cache.put(session, key, existing.location_id)  # type: ignore
             return existing
         location = cls(name=name, address=address, url=url)
+        if latitude is not None and longitude is not None:
+            location.set_coordinates(latitude, longitude)
         session.add(location)
         session.flush()
         session.refresh(location)
+        cache.put(session, key, location.location_id)  # type: ignore
         return location
 
     @classmethod
     def get_by_name(cls, session: Session, name: str) -> Optional[UniqueLocation]:
         return session.query(cls).filter(cls.name == name).first()
+
+    @classmethod
+    def get_with_coordinates(
+        cls, session: Session, since: Optional[datetime] = None
+    ) -> List[UniqueLocation]:
+        """
+        Rows that have coordinates, only those set after `since` if given,
+        in coordinates_updated_at order.
+        """
+        query = session.query(cls).filter(cls.latitude != None, cls.longitude != None)
+        if since is not None:
+            query = query.filter(cls.coordinates_updated_at > since)
+        return query.order_by(cls.coordinates_updated_at, cls.location_id).all()
+
+    @classmethod
+    def get_missing_coordinates(cls, session: Session) -> List[UniqueLocation]:
+        return session.query(cls).filter(cls.latitude == None).all()
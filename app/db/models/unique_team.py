@@ -1,7 +1,8 @@
 from __future__ import annotations
 from sqlalchemy.orm import Session
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, UniqueConstraint
 from app.db.base import Base
+from app.db.intern_cache import get_intern_cache
 import logging
 from sqlalchemy import ForeignKey
 
@@ -18,17 +19,26 @@ class UniqueTeam(Base):
         Integer, ForeignKey("unique_divisions.division_id"), nullable=False
     )
 
+    __table_args__ = (
+        UniqueConstraint("name", "division_id", name="uq_unique_teams_name_division"),
+    )
+
     def __repr__(self):
         return f"<Team(team_id={self.team_id}, name='{self.name}', division_id={self.division_id})>"
 
     @classmethod
     def get_or_create(cls, session: Session, name: str, division_id: int) -> int:
+        cache = get_intern_cache()
+        key = (cls.__tablename__, name, division_id)
+        cached = cache.get(session, key)
+        if cached is not None:
+            return cached
         instance = (
             session.query(cls).filter_by(name=name, division_id=division_id).first()
         )
-        if instance:
-            return instance.team_id  # type: ignore
-        instance = cls(name=name, division_id=division_id)
-        session.add(instance)
-        session.flush()
+        if not instance:
+            instance = cls(name=name, division_id=division_id)
+            session.add(instance)
+            session.flush()
+        cache.put(session, key, instance.team_id)  # type: ignore
         return instance.team_id  # type: ignore
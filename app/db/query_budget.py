@@ -0,0 +1,101 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Generator, List, Optional
+import logging
+import threading
+
+from sqlalchemy import event
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A code path issued more SQL statements than its budget allows."""
+
+    def __init__(self, label: str, budget: int, statements: List[str]):
+        self.label = label
+        self.budget = budget
+        self.statements = statements
+        listing = "\n".join(f"  {i + 1}. {s[:200]}" for i, s in enumerate(statements))
+        super().__init__(
+            f"{label}: {len(statements)} queries, budget {budget}\n{listing}"
+        )
+
+
+class QueryCounter:
+    """Statements executed on the counting thread inside a query_budget block."""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+_local = threading.local()
+_listening = False
+_listen_lock = threading.Lock()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    for counter in getattr(_local, "counters", ()):
+        counter.statements.append(statement)
+
+
+def _ensure_listening() -> None:
+    global _listening
+    if _listening:
+        return
+    with _listen_lock:
+        if not _listening:
+            from sqlalchemy.engine import Engine
+
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            _listening = True
+
+
+@contextmanager
+def query_budget(
+    budget: int, label: str = "query budget", strict: Optional[bool] = None
+) -> Generator[QueryCounter, None, None]:
+    """
+    Counts the SQL statements this thread runs inside the block. Going over
+    `budget` raises QueryBudgetExceeded when strict (QUERY_BUDGET_STRICT,
+    meant for dev and CI) and logs a warning otherwise, so an N+1 that
+    sneaks into a guarded path shows up with the offending statements.
+    """
+    _ensure_listening()
+    strict = Config.QUERY_BUDGET_STRICT if strict is None else strict
+    counter = QueryCounter()
+    counters = getattr(_local, "counters", None)
+    if counters is None:
+        counters = _local.counters = []
+    counters.append(counter)
+    try:
+        yield counter
+    finally:
+        counters.remove(counter)
+    if counter.count > budget:
+        error = QueryBudgetExceeded(label, budget, counter.statements)
+        if strict:
+            raise error
+        logger.warning(str(error))
+
+
+def within_query_budget(budget: int, label: Optional[str] = None) -> Callable:
+    """Decorator form of query_budget."""
+
+    def decorator(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with query_budget(budget, label or fn.__qualname__):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,140 @@
+from __future__ import annotations
+from typing import Any, Dict, Hashable, Optional
+import logging
+import threading
+import time
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+TARGET_PRIMARY = "primary"
+TARGET_REPLICA = "replica"
+
+# Cookie carrying the read-your-writes window across Lambda instances
+STICKY_COOKIE = "db_sticky_until"
+
+
+def _request_context():
+    """Flask's request and g when called inside a request, else (None, None)."""
+    try:
+        from flask import g, has_request_context, request
+    except ImportError:  # pragma: no cover - flask is a hard dependency
+        return None, None
+    if not has_request_context():
+        return None, None
+    return request, g
+
+
+class ReadRouter:
+    """
+    Decides whether a read-only session may use the replica.
+
+    After a caller writes, its sticky key (usually the user id) is pinned
+    to the primary for DB_READ_STICKY_SEC so it reads its own writes
+    despite replica lag. The pin is kept in-process and, inside a Flask
+    request, mirrored to a short-lived cookie so the next request sticks
+    even when it lands on another Lambda instance.
+    """
+
+    def __init__(self, sticky_seconds: Optional[float] = None):
+        self.sticky_seconds = (
+            Config.DB_READ_STICKY_SEC if sticky_seconds is None else sticky_seconds
+        )
+        self._written: Dict[Hashable, float] = {}
+        self._routes: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    # ---------------- Stickiness ---------------- #
+
+    def mark_write(self, key: Optional[Hashable] = None) -> None:
+        until = time.time() + self.sticky_seconds
+        if key is not None:
+            with self._lock:
+                self._written[key] = until
+                if len(self._written) > 10000:
+                    now = time.time()
+                    self._written = {k: v for k, v in self._written.items() if v > now}
+        _, g = _request_context()
+        if g is not None:
+            g.db_sticky_until = until
+
+    def is_sticky(self, key: Optional[Hashable] = None) -> bool:
+        now = time.time()
+        if key is not None:
+            with self._lock:
+                until = self._written.get(key)
+            if until is not None and until > now:
+                return True
+        request, g = _request_context()
+        if request is None:
+            return False
+        if getattr(g, "db_sticky_until", 0) > now:
+            return True
+        try:
+            return float(request.cookies.get(STICKY_COOKIE, 0)) > now
+        except ValueError:
+            return False
+
+    # ---------------- Routing ---------------- #
+
+    def choose(
+        self, has_replica: bool, key: Optional[Hashable] = None, route: Optional[str] = None
+    ) -> str:
+        if not has_replica:
+            target, reason = TARGET_PRIMARY, "no_replica"
+        elif self.is_sticky(key):
+            target, reason = TARGET_PRIMARY, "sticky"
+        else:
+            target, reason = TARGET_REPLICA, TARGET_REPLICA
+        self._count(route, reason)
+        return target
+
+    def _count(self, route: Optional[str], outcome: str) -> None:
+        if route is None:
+            request, _ = _request_context()
+            route = (request.endpoint if request is not None else None) or "-"
+        with self._lock:
+            counts = self._routes.setdefault(route, {})
+            counts[outcome] = counts.get(outcome, 0) + 1
+
+    def count_write(self, route: Optional[str] = None) -> None:
+        self._count(route, "write")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {route: dict(counts) for route, counts in self._routes.items()}
+
+
+_router: Optional[ReadRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> ReadRouter:
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ReadRouter()
+    return _router
+
+
+def set_sticky_cookie(response):
+    """
+    Flask after_request hook: passes the read-your-writes window of a
+    request that wrote on to the client.
+    """
+    _, g = _request_context()
+    until = getattr(g, "db_sticky_until", None) if g is not None else None
+    if until:
+        response.set_cookie(
+            STICKY_COOKIE,
+            f"{until:.3f}",
+            max_age=int(Config.DB_READ_STICKY_SEC) + 1,
+            httponly=True,
+            secure=Config.COOKIE_SECURE,
+            samesite=Config.COOKIE_SAMESITE,
+            domain=Config.COOKIE_DOMAIN,
+        )
+    return response
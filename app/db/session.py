@@ -1,29 +1,137 @@
 from contextlib import contextmanager
-from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, scoped_session, Session
-from typing import Generator
-from app.config import Config
-import os
+from typing import Generator, Hashable, Optional
+from app.db.engine import get_engine, get_replica_engine
+from app.db.routing import TARGET_REPLICA, get_router
 
-ENV = os.getenv("APP_ENV", "development")
 
-if not Config.DB_URI:
-    raise ValueError("Database URI is not set in the configuration.")
+class LazyBindSession(Session):
+    """Binds to the process engine on first use rather than at import."""
+
+    def get_bind(self, mapper=None, **kwargs) -> Engine:
+        return get_engine()
 
-engine = create_engine(
-    Config.DB_URI,
-    echo=(ENV != "production"),
-    pool_pre_ping=True,
-)
 
 SessionLocal = scoped_session(
-    sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    sessionmaker(class_=LazyBindSession, autocommit=False, autoflush=False)
 )
 
+# Read-only sessions get an explicit bind (replica or primary) per call
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+
+def __getattr__(name: str):
+    # Keeps `from app.db.session import engine` working without creating
+    # the engine at import time.
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# ---------------- Write tracking (read-your-writes) ---------------- #
+
+
+@event.listens_for(LazyBindSession, "after_flush")
+def _flagged_flush(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(LazyBindSession, "do_orm_execute")
+def _flagged_dml(orm_execute_state):
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(LazyBindSession, "after_commit")
+def _pin_writer(session):
+    if session.info.pop("wrote", False):
+        router = get_router()
+        router.mark_write(session.info.get("sticky_key"))
+        router.count_write(session.info.get("route"))
+
+
+@event.listens_for(LazyBindSession, "after_soft_rollback")
+def _forget_writes(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop("wrote", None)
+
+
+def _reject_flush(session, flush_context, instances):
+    raise RuntimeError("Attempted to write through a read-only session")
+
+
+# ---------------- Sessions ---------------- #
+
 
 @contextmanager
-def get_session() -> Generator[Session, None, None]:
+def get_session(
+    read_only: bool = False,
+    sticky_key: Optional[Hashable] = None,
+    route: Optional[str] = None,
+) -> Generator[Session, None, None]:
+    """
+    The thread-local read/write session on the primary, committed on exit.
+
+    With read_only=True a separate session is opened on the read replica
+    (EZ_SCHEDULE_DB_REPLICA_URI) instead, unless none is configured or the
+    caller wrote within DB_READ_STICKY_SEC, in which case it reads from the
+    primary. sticky_key identifies the caller (usually the user id) for
+    that read-your-writes window; writes made through a session opened with
+    the same key start it. route labels the routing stats (defaults to the
+    Flask endpoint); commits that wrote count as "write" there.
+    """
+    if read_only:
+        with _read_session(sticky_key, route) as session:
+            yield session
+        return
+
     session = SessionLocal()  # Each call gets a thread-local session
+    if sticky_key is not None:
+        session.info["sticky_key"] = sticky_key
+    if route is not None:
+        session.info["route"] = route
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.info.pop("sticky_key", None)
+        session.info.pop("route", None)
+        session.close()
+
+
+@contextmanager
+def _read_session(
+    sticky_key: Optional[Hashable], route: Optional[str]
+) -> Generator[Session, None, None]:
+    replica = get_replica_engine()
+    target = get_router().choose(replica is not None, sticky_key, route)
+    bind = replica if target == TARGET_REPLICA else get_engine()
+    session = ReadSessionLocal(bind=bind)
+    event.listen(session, "before_flush", _reject_flush)
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+@contextmanager
+def get_isolated_session() -> Generator[Session, None, None]:
+    """
+    Like get_session(), but on a fresh Session instead of the thread-local
+    one, so helpers can commit their own work while a caller's
+    get_session() block is still open.
+    """
+    session = SessionLocal.session_factory()
     try:
         yield session
         session.commit()
@@ -0,0 +1,35 @@
+from __future__ import annotations
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+
+class Watermark:
+    """
+    Lower bound for incremental reads of rows whose change timestamp is
+    stamped by the writer before it commits.
+
+    Such a row can become visible to a reader only after a read that started
+    later than its stamp (slow commit, replica lag, clock skew between
+    instances), so the next read must not start from the newest stamp seen.
+    Instead it starts from when the previous successful read began, minus
+    `overlap`; the overlap has to cover the longest gap between stamping a
+    row and that row being readable where the refresh reads from.
+
+        since, started = watermark.begin()   # None: read everything
+        rows = read_changed_since(since)
+        watermark.advance(started)           # only after the read succeeded
+    """
+
+    def __init__(self, overlap: timedelta):
+        self.overlap = overlap
+        self._started: Optional[datetime] = None
+
+    def begin(self) -> Tuple[Optional[datetime], datetime]:
+        started = datetime.now(timezone.utc)
+        if self._started is None:
+            return None, started
+        return self._started - self.overlap, started
+
+    def advance(self, started: datetime) -> None:
+        if self._started is None or started > self._started:
+            self._started = started
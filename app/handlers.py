@@ -0,0 +1,16 @@
+from typing import Any, Optional
+import time
+
+# Batch jobs stop starting new work this long before Lambda's hard timeout
+SAFETY_MARGIN_SEC = 30
+
+
+def deadline_from(context: Any, margin: float = SAFETY_MARGIN_SEC) -> Optional[float]:
+    """
+    time.monotonic() deadline for a Lambda invocation, `margin` seconds
+    before its hard timeout. None without a Lambda context (local runs).
+    """
+    if context is None or not hasattr(context, "get_remaining_time_in_millis"):
+        return None
+    remaining = context.get_remaining_time_in_millis() / 1000.0
+    return time.monotonic() + max(remaining - margin, 0)
@@ -13,14 +13,19 @@ from app.config import Config
 # ---------------- Password Hashing ---------------- #
 
 
-def hash_password(plain: str) -> str:
+def hash_password(plain: str, rounds: Optional[int] = None) -> str:
     """
-    Hash a plaintext password with bcrypt.
+    Hash a plaintext password with bcrypt at `rounds` (default
+    Config.PASSWORD_BCRYPT_ROUNDS).
     Returns a UTF-8 string you can store in the DB.
+
+    This runs on the calling thread; request handlers should go through
+    app.security.passwords.get_password_hasher() instead.
     """
     if not isinstance(plain, str) or not plain:
         raise ValueError("Password must be a non-empty string")
-    hashed = bcrypt.hashpw(plain.encode("utf-8"), bcrypt.gensalt(rounds=12))
+    rounds = rounds or Config.PASSWORD_BCRYPT_ROUNDS
+    hashed = bcrypt.hashpw(plain.encode("utf-8"), bcrypt.gensalt(rounds=rounds))
     return hashed.decode("utf-8")
 
 
@@ -37,6 +42,19 @@ def verify_password(plain: str, hashed: str) -> bool:
         return False
 
 
+def bcrypt_rounds(hashed: str) -> Optional[int]:
+    """The cost factor of a bcrypt hash ("$2b$12$..." -> 12), or None."""
+    try:
+        return int(hashed.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def needs_rehash(hashed: str, rounds: Optional[int] = None) -> bool:
+    """True if the hash was made at a different cost than the configured one."""
+    return bcrypt_rounds(hashed) != (rounds or Config.PASSWORD_BCRYPT_ROUNDS)
+
+
 # ---------------- JWT Helpers ---------------- #
 
 
@@ -44,13 +62,14 @@ def _now() -> int:
     return int(time.time())
 
 
-def make_access_token(user_id: int) -> str:
+def make_access_token(user_id: int, sid: Optional[str] = None) -> str:
     """
     Create a short-lived access token.
     Claims:
       - sub: user id (string)
       - typ: "access"
       - iat/exp: issued-at / expiry
+      - sid: the refresh-token family (session) it was minted for
     """
     now = _now()
     payload = {
@@ -59,21 +78,27 @@ def make_access_token(user_id: int) -> str:
         "iat": now,
         "exp": now + Config.JWT_ACCESS_TTL_MIN * 60,
     }
+    if sid:
+        payload["sid"] = sid
     return jwt.encode(payload, Config.JWT_SECRET, algorithm="HS256")
 
 
-def make_refresh_token(user_id: int) -> str:
+def make_refresh_token(user_id: int, jti: str, sid: str) -> str:
     """
-    Create a longer-lived refresh token.
+    Create a longer-lived refresh token for a stored RefreshToken row.
     Claims:
       - sub: user id (string)
       - typ: "refresh"
+      - jti: the RefreshToken row, spent on use
+      - sid: its family (session)
       - iat/exp
     """
     now = _now()
     payload = {
         "sub": str(user_id),
         "typ": "refresh",
+        "jti": jti,
+        "sid": sid,
         "iat": now,
         "exp": now + Config.JWT_REFRESH_TTL_DAYS * 86400,
     }
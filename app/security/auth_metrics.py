@@ -0,0 +1,69 @@
+from __future__ import annotations
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Generator, List, Sequence
+import threading
+import time
+
+# Upper bounds (ms) of the latency buckets; anything slower lands in "+Inf"
+DEFAULT_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (cumulative counts, Prometheus style)."""
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.bounds: List[float] = sorted(buckets_ms)
+        self._counts = [0] * (len(self.bounds) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        with self._lock:
+            self._counts[bisect_left(self.bounds, ms)] += 1
+            self.count += 1
+            self.total_ms += ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            out: Dict[str, Any] = {
+                "count": self.count,
+                "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            }
+        buckets: Dict[str, int] = {}
+        running = 0
+        for bound, n in zip([*map(str, self.bounds), "+Inf"], counts):
+            running += n
+            buckets[f"le_{bound}"] = running
+        out["buckets"] = buckets
+        return out
+
+
+_histograms: Dict[str, LatencyHistogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def histogram(name: str) -> LatencyHistogram:
+    hist = _histograms.get(name)
+    if hist is None:
+        with _histograms_lock:
+            hist = _histograms.setdefault(name, LatencyHistogram())
+    return hist
+
+
+@contextmanager
+def timed(name: str) -> Generator[None, None, None]:
+    """Records the block's wall time under `name`, e.g. "login" or "login.bcrypt"."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram(name).observe((time.perf_counter() - started) * 1000)
+
+
+def auth_latency_stats() -> Dict[str, Any]:
+    with _histograms_lock:
+        names = sorted(_histograms)
+    return {name: _histograms[name].snapshot() for name in names}
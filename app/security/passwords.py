@@ -0,0 +1,172 @@
+from __future__ import annotations
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+import logging
+import multiprocessing
+import os
+import threading
+
+from app.config import Config
+from app.security.auth import hash_password, needs_rehash, verify_password
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+EXECUTOR_PROCESS = "process"
+EXECUTOR_THREAD = "thread"
+
+
+class HasherBusy(Exception):
+    """Too many hash jobs queued (or one timed out); answer 503 and let the client retry."""
+
+    pass
+
+
+def resolve_executor(kind: Optional[str] = None) -> str:
+    kind = (kind or Config.PASSWORD_HASH_EXECUTOR).lower()
+    if kind == "auto":
+        # Lambda has no /dev/shm, so multiprocessing queues can't be created
+        # there; bcrypt releases the GIL, so threads still keep it off the
+        # request thread.
+        return EXECUTOR_THREAD if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else EXECUTOR_PROCESS
+    if kind not in (EXECUTOR_PROCESS, EXECUTOR_THREAD):
+        raise ValueError(f"Unknown PASSWORD_HASH_EXECUTOR {kind!r}")
+    return kind
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small bounded pool instead of the request thread.
+
+    At most max_pending jobs may be queued or running; beyond that (or when
+    a job outlives timeout) HasherBusy is raised straight away, so a burst
+    of logins is shed instead of piling up behind the CPU.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[str] = None,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        timeout: Optional[float] = None,
+        rounds: Optional[int] = None,
+    ):
+        self.kind = resolve_executor(executor)
+        self.workers = workers or Config.PASSWORD_HASH_WORKERS
+        self.max_pending = max_pending or Config.PASSWORD_HASH_MAX_PENDING
+        self.timeout = timeout or Config.PASSWORD_HASH_TIMEOUT_SEC
+        self.rounds = rounds or Config.PASSWORD_BCRYPT_ROUNDS
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.rehashed = 0
+
+    def _executor(self) -> Executor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = self._create_pool()
+        return self._pool
+
+    def _create_pool(self) -> Executor:
+        if self.kind == EXECUTOR_PROCESS:
+            try:
+                # spawn: never fork a process that already runs threads
+                return ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            except (OSError, NotImplementedError) as e:
+                logger.warning(f"Process pool unavailable ({e}); hashing on threads")
+                self.kind = EXECUTOR_THREAD
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+
+    def _release(self, _future: Any) -> None:
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise HasherBusy("password hasher is at capacity")
+        with self._lock:
+            self.in_flight += 1
+        try:
+            future = self._executor().submit(fn, *args)
+        except BrokenProcessPool:
+            self._release(None)
+            self._reset_pool()
+            raise HasherBusy("password hasher pool restarted")
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            self.timeouts += 1
+            raise HasherBusy("password hashing timed out")
+        except BrokenProcessPool:
+            self._reset_pool()
+            raise HasherBusy("password hasher pool restarted")
+
+    def _reset_pool(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def hash(self, plain: str) -> str:
+        return self._run(hash_password, plain, self.rounds)
+
+    def verify(self, plain: str, hashed: str) -> bool:
+        return bool(self._run(verify_password, plain, hashed))
+
+    def verify_and_update(self, plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verifies the password and, when it matches a hash made at another
+        cost, also returns a new hash at the configured cost to store.
+        """
+        if not self.verify(plain, hashed):
+            return False, None
+        if not needs_rehash(hashed, self.rounds):
+            return True, None
+        try:
+            new_hash = self.hash(plain)
+        except HasherBusy:
+            return True, None  # try again on a later login
+        self.rehashed += 1
+        return True, new_hash
+
+    def shutdown(self) -> None:
+        self._reset_pool()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "executor": self.kind,
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "in_flight": self.in_flight,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "rehashed": self.rehashed,
+        }
+
+
+_hasher: Optional[PasswordHasher] = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher() -> PasswordHasher:
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                _hasher = PasswordHasher()
+    return _hasher
@@ -0,0 +1,107 @@
+from __future__ import annotations
+from collections import deque
+from typing import Deque, Dict, Hashable, Optional
+import logging
+import threading
+import time
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class AttemptLimiter:
+    """
+    Sliding-window attempt counter per key (client IP, email, ...).
+
+    hit() records an attempt and returns None while the key is under
+    max_attempts in the last window seconds, else the seconds until the
+    oldest attempt leaves the window (for Retry-After). Counts are kept
+    per process, so on Lambda each warm instance limits on its own.
+    """
+
+    def __init__(
+        self, max_attempts: int, window: float, clock=time.monotonic, max_keys: int = 10000
+    ):
+        self.max_attempts = max_attempts
+        self.window = float(window)
+        self.max_keys = max_keys
+        self._clock = clock
+        self._hits: Dict[Hashable, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self.limited = 0
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window
+        self._hits = {k: q for k, q in self._hits.items() if q and q[-1] > cutoff}
+
+    def hit(self, key: Hashable) -> Optional[float]:
+        now = self._clock()
+        with self._lock:
+            hits = self._hits.get(key)
+            if hits is None:
+                if len(self._hits) >= self.max_keys:
+                    self._prune(now)
+                hits = self._hits[key] = deque(maxlen=self.max_attempts)
+            while hits and hits[0] <= now - self.window:
+                hits.popleft()
+            if len(hits) >= self.max_attempts:
+                self.limited += 1
+                return hits[0] + self.window - now
+            hits.append(now)
+            return None
+
+    def reset(self, key: Hashable) -> None:
+        with self._lock:
+            self._hits.pop(key, None)
+
+
+class AuthLimiter:
+    """Per-IP and per-email limits checked before any password hashing."""
+
+    def __init__(
+        self,
+        per_ip: Optional[int] = None,
+        per_email: Optional[int] = None,
+        window: Optional[float] = None,
+    ):
+        window = window or Config.AUTH_RATE_WINDOW_SEC
+        self.by_ip = AttemptLimiter(per_ip or Config.AUTH_RATE_MAX_PER_IP, window)
+        self.by_email = AttemptLimiter(per_email or Config.AUTH_RATE_MAX_PER_EMAIL, window)
+
+    def check(self, ip: Optional[str], email: Optional[str] = None) -> Optional[float]:
+        """
+        Records an attempt from ip (and for email); returns seconds to wait
+        if either is over its limit. A blocked IP does not use up the
+        email's allowance.
+        """
+        wait = self.by_ip.hit(ip or "-")
+        if wait is not None:
+            logger.warning(f"Auth attempts limited for ip={ip}")
+            return wait
+        if email:
+            wait = self.by_email.hit(email)
+            if wait is not None:
+                logger.warning(f"Auth attempts limited for email={email}")
+        return wait
+
+    def succeeded(self, email: str) -> None:
+        """A correct password clears the email's failed-attempt window."""
+        self.by_email.reset(email)
+
+    def stats(self) -> Dict[str, int]:
+        return {"limited_ip": self.by_ip.limited, "limited_email": self.by_email.limited}
+
+
+_auth_limiter: Optional[AuthLimiter] = None
+_auth_limiter_lock = threading.Lock()
+
+
+def get_auth_limiter() -> AuthLimiter:
+    global _auth_limiter
+    if _auth_limiter is None:
+        with _auth_limiter_lock:
+            if _auth_limiter is None:
+                _auth_limiter = AuthLimiter()
+    return _auth_limiter
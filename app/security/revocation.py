@@ -0,0 +1,114 @@
+from __future__ import annotations
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+import logging
+import threading
+import time
+
+from app.config import Config
+from app.db.models import RevokedSession
+from app.db.session import get_session
+from app.db.watermark import Watermark
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# How far before the previous sync each sync re-reads (see Watermark). It
+# reads from a replica, so this covers replica lag (which DB_READ_STICKY_SEC
+# assumes stays below its value) on top of commit latency and clock skew.
+SYNC_OVERLAP = timedelta(seconds=60 + Config.DB_READ_STICKY_SEC)
+
+
+def _epoch(value: datetime) -> float:
+    if value.tzinfo is None:  # SQLite drops tzinfo
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class RevocationList:
+    """
+    In-process set of revoked session (refresh-token family) ids, so an
+    access token's `sid` is checked with a dict lookup.
+
+    The set mirrors the revoked_sessions table: it is loaded on first use
+    and then topped up at most every REVOCATION_SYNC_SEC with the rows
+    revoked since the last sync (an index range on revoked_at). Revocations
+    made by this process are visible at once; other instances see them
+    within one sync interval. If the database can't be read the last known
+    set keeps being used.
+    """
+
+    def __init__(self, sync_interval: Optional[float] = None, clock=time.monotonic):
+        self.sync_interval = (
+            Config.REVOCATION_SYNC_SEC if sync_interval is None else sync_interval
+        )
+        self._clock = clock
+        self._revoked: Dict[str, float] = {}  # family_id -> expires (epoch)
+        self._watermark = Watermark(SYNC_OVERLAP)
+        self._synced_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self.syncs = 0
+        self.sync_errors = 0
+
+    def add(self, family_id: str, expires_at: datetime) -> None:
+        with self._lock:
+            self._revoked[family_id] = _epoch(expires_at)
+
+    def is_revoked(self, family_id: Optional[str]) -> bool:
+        if not family_id:
+            return False
+        self._maybe_sync()
+        with self._lock:
+            expires = self._revoked.get(family_id)
+        return expires is not None and expires > time.time()
+
+    def _maybe_sync(self) -> None:
+        synced_at = self._synced_at
+        if synced_at is not None and self._clock() - synced_at < self.sync_interval:
+            return
+        # One thread syncs; the others keep answering from the current set
+        if not self._sync_lock.acquire(blocking=synced_at is None):
+            return
+        try:
+            self.sync()
+        finally:
+            self._sync_lock.release()
+
+    def sync(self) -> None:
+        since, started = self._watermark.begin()
+        try:
+            with get_session(read_only=True, route="revocation_sync") as db:
+                rows = RevokedSession.revoked_since(db, since)
+        except Exception as e:
+            self.sync_errors += 1
+            logger.warning(f"Revocation sync failed, using last known set: {e}")
+            rows = None
+        self._synced_at = self._clock()
+        if rows is None:
+            return
+        now = time.time()
+        with self._lock:
+            for family_id, _, expires_at in rows:
+                self._revoked[family_id] = _epoch(expires_at)
+            self._revoked = {k: v for k, v in self._revoked.items() if v > now}
+        self._watermark.advance(started)
+        self.syncs += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._revoked)
+        return {"size": size, "syncs": self.syncs, "sync_errors": self.sync_errors}
+
+
+_revocations: Optional[RevocationList] = None
+_revocations_lock = threading.Lock()
+
+
+def get_revocation_list() -> RevocationList:
+    global _revocations
+    if _revocations is None:
+        with _revocations_lock:
+            if _revocations is None:
+                _revocations = RevocationList()
+    return _revocations
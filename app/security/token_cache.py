@@ -0,0 +1,104 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+import logging
+import threading
+import time
+
+from app.config import Config
+from app.security.auth import decode_token
+from app.security.revocation import get_revocation_list
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """Bounded LRU whose entries also expire at a per-entry deadline."""
+
+    def __init__(self, maxsize: int, ttl: float, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = float(ttl)
+        self._clock = clock
+        self._items: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                if item[0] > self._clock():
+                    self._items.move_to_end(key)
+                    self.hits += 1
+                    return item[1]
+                del self._items[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: V, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._items[key] = (self._clock() + ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_claims: Optional[TTLCache[Dict[str, Any]]] = None
+_claims_lock = threading.Lock()
+
+
+def get_token_cache() -> TTLCache[Dict[str, Any]]:
+    global _claims
+    if _claims is None:
+        with _claims_lock:
+            if _claims is None:
+                _claims = TTLCache(Config.AUTH_TOKEN_CACHE_SIZE, Config.AUTH_TOKEN_CACHE_TTL_SEC)
+    return _claims
+
+
+def verify_access_token(token: str) -> Optional[Dict[str, Any]]:
+    """
+    decode_token() for access tokens, with verified claims cached for up to
+    AUTH_TOKEN_CACHE_TTL_SEC (never past the token's own exp). Only valid
+    tokens are cached, so a forged one always pays for the signature check.
+    Tokens of a revoked session are refused, cached or not.
+    """
+    cache = get_token_cache()
+    claims = cache.get(token)
+    if claims is None:
+        claims = decode_token(token)
+        if not claims or claims.get("typ") != "access":
+            return None
+        cache.put(token, claims, ttl=float(claims.get("exp", 0)) - time.time())
+    if get_revocation_list().is_revoked(claims.get("sid")):
+        return None
+    return claims
+
+
+def forget_token(token: str) -> None:
+    get_token_cache().pop(token)
@@ -0,0 +1,92 @@
+from __future__ import annotations
+from typing import Any, Dict, Optional, Set
+import logging
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import Config
+from app.db.models import User
+from app.db.session import get_session
+from app.security.token_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# session.info slot holding user ids changed in the open transaction
+_DIRTY = "user_profile_dirty"
+
+_profiles: Optional[TTLCache[Dict[str, Any]]] = None
+_profiles_lock = threading.Lock()
+
+
+def get_profile_cache() -> TTLCache[Dict[str, Any]]:
+    global _profiles
+    if _profiles is None:
+        with _profiles_lock:
+            if _profiles is None:
+                _profiles = TTLCache(
+                    Config.USER_PROFILE_CACHE_SIZE, Config.USER_PROFILE_CACHE_TTL_SEC
+                )
+    return _profiles
+
+
+def profile_of(user: User) -> Dict[str, Any]:
+    """The fields /users/me returns; never the password hash."""
+    return {
+        "id": user.id,
+        "email": user.email,
+        "username": user.username,
+        "last_login_at": user.last_login_at,
+    }
+
+
+def get_user_profile(user_id: int) -> Optional[Dict[str, Any]]:
+    """
+    The user's profile from the cache, else from the database (read-only,
+    honouring that user's read-your-writes window). None if there's no
+    such user; misses are not cached.
+    """
+    cache = get_profile_cache()
+    profile = cache.get(user_id)
+    if profile is not None:
+        return profile
+    with get_session(read_only=True, sticky_key=user_id) as db:
+        user = db.get(User, user_id)
+        if user is None:
+            return None
+        profile = profile_of(user)
+    cache.put(user_id, profile)
+    return profile
+
+
+def invalidate_user(user_id: int) -> None:
+    get_profile_cache().pop(user_id)
+
+
+# ---------------- Invalidation on change ---------------- #
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target: User) -> None:
+    # Dropped now so this process stops serving it, and again on commit in
+    # case another request re-read the old row in between.
+    invalidate_user(target.id)  # type: ignore
+    session = Session.object_session(target)
+    if session is not None:
+        dirty: Set[int] = session.info.setdefault(_DIRTY, set())
+        dirty.add(target.id)  # type: ignore
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    for user_id in session.info.pop(_DIRTY, ()):
+        invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_dirty(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_DIRTY, None)
@@ -0,0 +1,385 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.clients.teamsnap_client import TeamSnapClient
+from app.clients.teamsnap_records import TeamSnapEvent
+from app.config import Config
+from app.db.loader_profiles import PROFILE_UPLOAD, loader_options
+from app.db.models import Event, Location, Opponent, Team
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+PREFER_LOCAL = "local"
+PREFER_REMOTE = "remote"
+
+
+# ---------------- Fingerprints ---------------- #
+
+
+def _zone(name: Optional[str]):
+    if not name:
+        return timezone.utc
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.utc
+
+
+def _utc_iso(value: Optional[datetime], tz_name: Optional[str] = None) -> Optional[str]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=_zone(tz_name))
+    return value.astimezone(timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def fingerprint(fields: Dict[str, Any]) -> str:
+    canonical = json.dumps(fields, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def local_fields(event: Event) -> Dict[str, Any]:
+    """
+    The subset of an Event that round-trips through TeamSnap, normalised so
+    it compares equal to remote_fields() of the same game.
+    """
+    return {
+        "start_date": _utc_iso(event.start_date, event.time_zone),  # type: ignore
+        "duration_in_minutes": event.duration_in_minutes,
+        "is_game": bool(event.is_game),
+        "opponent_id": event.opponent.teamsnap_opponent_id if event.opponent else None,
+        "location_id": event.location.teamsnap_location_id if event.location else None,
+    }
+
+
+def remote_fields(record: TeamSnapEvent) -> Dict[str, Any]:
+    return {
+        "start_date": _utc_iso(record.start_date),
+        "duration_in_minutes": record.duration_in_minutes,
+        "is_game": bool(record.is_game),
+        "opponent_id": record.opponent_id,
+        "location_id": record.location_id,
+    }
+
+
+# ---------------- Remote snapshot cache ---------------- #
+
+
+@dataclass
+class RemoteSnapshot:
+    events: Dict[str, TeamSnapEvent]
+    fetched_at: float
+
+    def fresh(self, ttl: float) -> bool:
+        return time.monotonic() - self.fetched_at < ttl
+
+
+_snapshots: Dict[Tuple[str, ...], RemoteSnapshot] = {}
+_snapshots_lock = threading.Lock()
+
+
+def invalidate_snapshots() -> None:
+    """
+    Drops every cached snapshot. Anything that creates, updates or deletes
+    TeamSnap events calls this so the next diff sync refetches.
+    """
+    with _snapshots_lock:
+        _snapshots.clear()
+
+
+# ---------------- Engine ---------------- #
+
+
+@dataclass
+class DiffSyncReport:
+    created: List[int] = field(default_factory=list)
+    updated: List[int] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    pulled: List[int] = field(default_factory=list)
+    conflicts: List[int] = field(default_factory=list)
+    unchanged: int = 0
+    errors: Dict[str, str] = field(default_factory=dict)
+    write_calls: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "created": len(self.created),
+            "updated": len(self.updated),
+            "deleted": len(self.deleted),
+            "pulled": len(self.pulled),
+            "conflicts": self.conflicts,
+            "unchanged": self.unchanged,
+            "write_calls": self.write_calls,
+            "errors": self.errors,
+        }
+
+
+class EventDiffSync:
+    """
+    Two-way, incremental sync of local Event rows against TeamSnap.
+
+    Each event stores `synced_hash`, the fingerprint of its synced fields
+    at the last sync. Comparing local and remote fingerprints with that
+    base tells who changed what:
+
+      local == remote            -> nothing to send
+      local changed, remote not  -> update_game
+      remote changed, local not  -> pull the remote values into the row
+      both changed               -> conflict, resolved by `prefer`
+
+    Events never uploaded are created. Linked events missing remotely were
+    deleted in TeamSnap: with prefer="local" they are re-created, with
+    prefer="remote" the local row is dropped. That is only decided against
+    a snapshot fetched during this sync, never a cached one. Remote games
+    with no local row are only deleted (delete_game) when `prune=True`.
+    """
+
+    def __init__(
+        self,
+        client: TeamSnapClient,
+        prefer: str = PREFER_LOCAL,
+        prune: bool = False,
+        snapshot_ttl: Optional[float] = None,
+        max_workers: Optional[int] = None,
+    ):
+        if prefer not in (PREFER_LOCAL, PREFER_REMOTE):
+            raise ValueError(f"prefer must be {PREFER_LOCAL!r} or {PREFER_REMOTE!r}")
+        self.client = client
+        self.prefer = prefer
+        self.prune = prune
+        self.snapshot_ttl = (
+            Config.TEAMSNP_SNAPSHOT_TTL_SEC if snapshot_ttl is None else snapshot_ttl
+        )
+        self.max_workers = max(1, max_workers or Config.TEAMSNP_UPLOAD_WORKERS)
+
+    def _snapshot(self, teamsnap_team_ids: List[str], refresh: bool) -> RemoteSnapshot:
+        key = tuple(sorted(teamsnap_team_ids))
+        with _snapshots_lock:
+            snapshot = _snapshots.get(key)
+        if snapshot is not None and not refresh and snapshot.fresh(self.snapshot_ttl):
+            return snapshot
+        events = {
+            record.id: record
+            for record in self.client.iter_bulk_load(teamsnap_team_ids, types=["event"])
+            if isinstance(record, TeamSnapEvent) and record.id
+        }
+        snapshot = RemoteSnapshot(events=events, fetched_at=time.monotonic())
+        with _snapshots_lock:
+            _snapshots[key] = snapshot
+        return snapshot
+
+    def _pull(
+        self,
+        event: Event,
+        record: TeamSnapEvent,
+        opponent_ids: Dict[str, int],
+        location_ids: Dict[str, int],
+    ) -> Dict[str, Any]:
+        changes: Dict[str, Any] = {"event_id": event.event_id}
+        if record.start_date is not None:
+            start = record.start_date
+            if start.tzinfo is not None:
+                start = start.astimezone(_zone(event.time_zone)).replace(tzinfo=None)  # type: ignore
+            changes["start_date"] = start
+        if record.duration_in_minutes is not None:
+            changes["duration_in_minutes"] = record.duration_in_minutes
+        changes["is_game"] = record.is_game
+        # Only follow remote opponent/location changes we can map locally
+        if record.opponent_id is None or record.opponent_id in opponent_ids:
+            changes["opponent_id"] = opponent_ids.get(record.opponent_id)  # type: ignore
+        if record.location_id is None or record.location_id in location_ids:
+            changes["location_id"] = location_ids.get(record.location_id)  # type: ignore
+        return changes
+
+    def sync_club(self, session: Session, club_id: str, refresh: bool = False) -> DiffSyncReport:
+        teams = Team.get_teams_by_club_id(session, club_id)  # type: ignore
+        return self.sync(session, [t.team_id for t in teams], refresh=refresh)
+
+    def sync(
+        self, session: Session, team_ids: List[int], refresh: bool = False
+    ) -> DiffSyncReport:
+        report = DiffSyncReport()
+        teams = session.query(Team).filter(Team.team_id.in_(team_ids)).all()
+        ts_team_ids = [str(t.teamsnap_team_id) for t in teams if t.teamsnap_team_id]
+        if not ts_team_ids:
+            return report
+
+        events = (
+            session.query(Event)
+            .options(*loader_options(Event, PROFILE_UPLOAD))
+            .filter(Event.team_id.in_(team_ids))
+            .all()
+        )
+        started = time.monotonic()
+        snapshot = self._snapshot(ts_team_ids, refresh)
+        if snapshot.fetched_at < started and any(
+            e.uploaded and e.teamsnap_event_id and e.teamsnap_event_id not in snapshot.events
+            for e in events
+        ):
+            # A cached snapshot can miss events created since; confirm before
+            # re-creating or dropping anything
+            snapshot = self._snapshot(ts_team_ids, refresh=True)
+        remote = dict(snapshot.events)
+
+        opponent_ids = {
+            o.teamsnap_opponent_id: o.opponent_id
+            for o in session.query(Opponent).filter(
+                Opponent.team_id.in_(team_ids), Opponent.teamsnap_opponent_id != None
+            )
+        }
+        location_ids = {
+            l.teamsnap_location_id: l.location_id
+            for l in session.query(Location).filter(
+                Location.team_id.in_(team_ids), Location.teamsnap_location_id != None
+            )
+        }
+
+        creates: List[Tuple[Event, str]] = []
+        pushes: List[Tuple[Event, str]] = []
+        rows: List[Dict[str, Any]] = []
+        drops: List[int] = []
+
+        for event in events:
+            ts_id = event.teamsnap_event_id
+            record = remote.pop(ts_id, None) if ts_id else None  # type: ignore
+            try:
+                local_hash = fingerprint(local_fields(event))
+            except Exception as e:
+                report.errors[f"event:{event.event_id}"] = str(e)
+                continue
+
+            if not ts_id or not event.uploaded:
+                creates.append((event, local_hash))
+                continue
+            if record is None:
+                if self.prefer == PREFER_LOCAL:
+                    creates.append((event, local_hash))
+                else:
+                    drops.append(event.event_id)  # type: ignore
+                continue
+
+            remote_hash = fingerprint(remote_fields(record))
+            base = event.synced_hash
+            local_changed = local_hash != base or bool(event.updated)
+            remote_changed = remote_hash != base
+
+            if local_hash == remote_hash:
+                report.unchanged += 1
+                if base != local_hash or event.updated:
+                    rows.append(
+                        {"event_id": event.event_id, "synced_hash": local_hash, "updated": False}
+                    )
+            elif base is None or (local_changed and not remote_changed):
+                pushes.append((event, local_hash))
+            elif remote_changed and not local_changed:
+                changes = self._pull(event, record, opponent_ids, location_ids)
+                changes.update(synced_hash=remote_hash, updated=False)
+                rows.append(changes)
+                report.pulled.append(event.event_id)  # type: ignore
+            else:
+                report.conflicts.append(event.event_id)  # type: ignore
+                if self.prefer == PREFER_LOCAL:
+                    pushes.append((event, local_hash))
+                else:
+                    changes = self._pull(event, record, opponent_ids, location_ids)
+                    changes.update(synced_hash=remote_hash, updated=False)
+                    rows.append(changes)
+                    report.pulled.append(event.event_id)  # type: ignore
+
+        orphans = [
+            ts_id for ts_id, record in remote.items() if record.is_game
+        ] if self.prune else []
+
+        # Payloads are built here, on the session's thread
+        jobs: List[Tuple[str, Any, Any]] = []
+        for event, local_hash in creates:
+            try:
+                jobs.append(("create", (event.event_id, local_hash), event.to_teamsnap_payload()))
+            except ValueError as e:
+                report.errors[f"event:{event.event_id}"] = str(e)
+        for event, local_hash in pushes:
+            try:
+                jobs.append(
+                    ("update", (event.event_id, local_hash, event.teamsnap_event_id),
+                     event.to_teamsnap_payload())
+                )
+            except ValueError as e:
+                report.errors[f"event:{event.event_id}"] = str(e)
+        for ts_id in orphans:
+            jobs.append(("delete", ts_id, None))
+
+        def run(job: Tuple[str, Any, Any]) -> Tuple[str, Any, Any, Optional[str]]:
+            op, ident, payload = job
+            try:
+                if op == "create":
+                    remote_id = self.client.create_event(payload)
+                    if not remote_id:
+                        return op, ident, None, "TeamSnap did not return an event id"
+                    return op, ident, str(remote_id), None
+                if op == "update":
+                    result = self.client.update_game(ident[2], payload)
+                else:
+                    result = self.client.delete_game(ident)
+            except Exception as e:
+                return op, ident, None, str(e)
+            return op, ident, None, result.get("error")
+
+        if jobs:
+            with ThreadPoolExecutor(
+                max_workers=min(self.max_workers, len(jobs)), thread_name_prefix="ts-diff"
+            ) as pool:
+                outcomes = list(pool.map(run, jobs))
+        else:
+            outcomes = []
+        report.write_calls = len(jobs)
+
+        for op, ident, remote_id, error in outcomes:
+            if op == "delete":
+                if error:
+                    report.errors[f"teamsnap:{ident}"] = error
+                else:
+                    report.deleted.append(ident)
+                continue
+            event_id, local_hash = ident[0], ident[1]
+            if error:
+                report.errors[f"event:{event_id}"] = error
+                continue
+            row = {"event_id": event_id, "synced_hash": local_hash, "updated": False}
+            if op == "create":
+                row.update(uploaded=True, teamsnap_event_id=remote_id)
+                report.created.append(event_id)
+            else:
+                report.updated.append(event_id)
+            rows.append(row)
+
+        # One executemany per shape; rows differ in which columns they set
+        by_shape: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_shape.setdefault(tuple(sorted(row)), []).append(row)
+        for batch in by_shape.values():
+            session.execute(update(Event), batch)
+        if drops:
+            session.query(Event).filter(Event.event_id.in_(drops)).delete(
+                synchronize_session=False
+            )
+
+        if report.write_calls or report.pulled or drops:
+            # Our own writes changed the remote side; refetch next time
+            with _snapshots_lock:
+                _snapshots.pop(tuple(sorted(ts_team_ids)), None)
+
+        logger.info(f"Diff sync for teams {team_ids}: {report.as_dict()}")
+        return report
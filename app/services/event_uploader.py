@@ -0,0 +1,169 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set
+import logging
+import time
+
+from sqlalchemy.orm import Session
+
+from app.clients.teamsnap_client import TeamSnapClient
+from app.config import Config
+from app.db.models import Event
+from app.db.query_budget import query_budget
+from app.services.event_diff_sync import invalidate_snapshots
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+@dataclass
+class EventUploadResult:
+    event_id: int
+    teamsnap_event_id: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.teamsnap_event_id is not None
+
+
+@dataclass
+class UploadReport:
+    results: List[EventUploadResult] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+    # Created in TeamSnap, but the local row was gone when IDs were written
+    unmatched: Set[int] = field(default_factory=set)
+
+    @property
+    def created(self) -> List[EventUploadResult]:
+        """Created in TeamSnap, whether or not the local row was updated."""
+        return [r for r in self.results if r.ok]
+
+    @property
+    def succeeded(self) -> List[EventUploadResult]:
+        return [r for r in self.results if r.ok and r.event_id not in self.unmatched]
+
+    @property
+    def failed(self) -> List[EventUploadResult]:
+        return [r for r in self.results if not r.ok]
+
+    @property
+    def events_per_second(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return len(self.succeeded) / self.elapsed_seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "total": len(self.results),
+            "succeeded": len(self.succeeded),
+            "failed": [
+                {"event_id": r.event_id, "error": r.error} for r in self.failed
+            ],
+            "unmatched": sorted(self.unmatched),
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "events_per_second": round(self.events_per_second, 2),
+        }
+
+
+class BulkEventUploader:
+    """
+    Creates many events in TeamSnap through a bounded thread pool, then
+    records every returned teamsnap_event_id with one batched UPDATE.
+
+    Payloads are built on the calling thread so the workers never touch the
+    ORM session; only HTTP happens off-thread.
+    """
+
+    def __init__(self, client: TeamSnapClient, max_workers: Optional[int] = None):
+        self.client = client
+        self.max_workers = max(1, max_workers or Config.TEAMSNP_UPLOAD_WORKERS)
+
+    def _create(self, event_id: int, payload: Dict[str, Any]) -> EventUploadResult:
+        try:
+            teamsnap_event_id = self.client.create_event(payload)
+        except Exception as e:
+            logger.exception(f"Upload of event {event_id} raised")
+            return EventUploadResult(event_id=event_id, error=str(e))
+        if not teamsnap_event_id:
+            return EventUploadResult(
+                event_id=event_id, error="TeamSnap did not return an event id"
+            )
+        return EventUploadResult(
+            event_id=event_id, teamsnap_event_id=str(teamsnap_event_id)
+        )
+
+    def upload(self, session: Session, events: Iterable[Event]) -> UploadReport:
+        """
+        Uploads the given events (typically a list from
+        Event.get_not_uploaded(..., profile="upload")).
+        Events whose dependencies are not in TeamSnap yet are reported as
+        failures without being sent.
+        """
+        report = UploadReport()
+        payloads: Dict[int, Dict[str, Any]] = {}
+        # Events should arrive with the "upload" loader profile applied;
+        # anything above zero here is a lazy load per event.
+        with query_budget(0, "event payloads"):
+            for event in events:
+                try:
+                    payloads[event.event_id] = event.to_teamsnap_payload()  # type: ignore
+                except ValueError as e:
+                    report.results.append(
+                        EventUploadResult(event_id=event.event_id, error=str(e))  # type: ignore
+                    )
+
+        started = time.perf_counter()
+        if payloads:
+            workers = min(self.max_workers, len(payloads))
+            with ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="ts-upload"
+            ) as pool:
+                futures = [
+                    pool.submit(self._create, event_id, payload)
+                    for event_id, payload in payloads.items()
+                ]
+                for future in as_completed(futures):
+                    report.results.append(future.result())
+
+        report.unmatched = Event.bulk_update_uploaded_status(
+            session,
+            {r.event_id: r.teamsnap_event_id for r in report.created},  # type: ignore
+        )
+        if report.created:
+            invalidate_snapshots()
+        report.elapsed_seconds = time.perf_counter() - started
+
+        logger.info(
+            f"Bulk upload finished: {len(report.succeeded)}/{len(report.results)} "
+            f"events in {report.elapsed_seconds:.2f}s "
+            f"({report.events_per_second:.1f}/s)"
+        )
+        return report
+
+    def upload_backlog(
+        self,
+        session: Session,
+        team_id: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+    ) -> UploadReport:
+        """
+        Uploads every not-uploaded event (optionally for one team), streaming
+        it from Event.iter_not_uploaded one chunk at a time. Each chunk's
+        TeamSnap IDs are committed on `session` as soon as they are written,
+        so a run that dies partway never re-creates what it already sent,
+        and the next run resumes after them. Committed rows are expunged, so
+        memory stays flat however large the backlog is.
+        """
+        chunk_size = chunk_size or Config.TEAMSNP_UPLOAD_CHUNK_SIZE
+        report = UploadReport()
+        for chunk in Event.iter_not_uploaded(session, team_id, chunk_size):
+            chunk_report = self.upload(session, chunk)
+            report.results.extend(chunk_report.results)
+            report.unmatched |= chunk_report.unmatched
+            report.elapsed_seconds += chunk_report.elapsed_seconds
+            session.commit()
+            for event in chunk:
+                session.expunge(event)
+        return report
@@ -0,0 +1,102 @@
+from __future__ import annotations
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, Optional
+import logging
+import time
+
+from sqlalchemy import func, select, text
+
+from app.config import Config
+from app.db.models import OAuthState, RefreshToken, RevokedSession
+from app.db.session import get_session
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Task name -> model with a delete_expired(session, limit) classmethod. Each
+# deletes by primary key after an index range on expires_at, so neither the
+# sweep nor the hot-path lookups scan these tables, and each batch commits
+# on its own so no lock is held for long.
+TASKS: Dict[str, Any] = {
+    "oauth_states": OAuthState,
+    "refresh_tokens": RefreshToken,
+    "revoked_sessions": RevokedSession,
+}
+
+
+@dataclass
+class CompactionReport:
+    deleted: Dict[str, int] = field(default_factory=dict)
+    batches: Dict[str, int] = field(default_factory=dict)
+    duration_ms: Dict[str, float] = field(default_factory=dict)
+    rows_left: Dict[str, Optional[int]] = field(default_factory=dict)  # estimated table size after
+    done: Dict[str, bool] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def table_size(model: Any, exact: bool = False) -> Optional[int]:
+    """
+    Row count for the metrics: MySQL's information_schema estimate, or an
+    exact COUNT(*) (a full index scan) when asked for. None if it couldn't
+    be read or the dialect has no estimate.
+    """
+    try:
+        with get_session(read_only=True, route="maintenance") as session:
+            if exact:
+                return session.execute(select(func.count()).select_from(model)).scalar_one()
+            if session.get_bind().dialect.name != "mysql":
+                return None
+            return session.execute(
+                text(
+                    "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :name"
+                ),
+                {"name": model.__tablename__},
+            ).scalar()
+    except Exception as e:
+        logger.warning(f"Could not count {model.__tablename__}: {e}")
+        return None
+
+
+def compact(
+    tasks: Optional[Iterable[str]] = None,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+    deadline: Optional[float] = None,
+    exact_counts: bool = False,
+) -> CompactionReport:
+    """
+    Runs each task in committed batches until it has nothing left to
+    delete, max_batches (per task) have run, or time.monotonic() passes
+    deadline. exact_counts reports rows_left with COUNT(*) instead of the
+    table statistics.
+    """
+    batch_size = batch_size or Config.COMPACTION_BATCH_SIZE
+    report = CompactionReport()
+    for name in tasks or TASKS:
+        model = TASKS[name]
+        started = time.perf_counter()
+        deleted = batches = 0
+        done = False
+        while max_batches is None or batches < max_batches:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            with get_session() as session:
+                count = model.delete_expired(session, batch_size)
+            deleted += count
+            batches += 1
+            if count < batch_size:
+                done = True
+                break
+        report.deleted[name] = deleted
+        report.batches[name] = batches
+        report.duration_ms[name] = round((time.perf_counter() - started) * 1000, 1)
+        report.rows_left[name] = table_size(model, exact=exact_counts)
+        report.done[name] = done
+        logger.info(
+            f"Compaction {name}: deleted={deleted} batches={batches} "
+            f"duration_ms={report.duration_ms[name]} rows_left={report.rows_left[name]}"
+        )
+    return report
@@ -0,0 +1,322 @@
+from __future__ import annotations
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+import logging
+import time
+import uuid
+
+from sqlalchemy.orm import Session
+
+from app.clients.teamsnap_client import TeamSnapClient
+from app.config import Config
+from app.db.bulk import chunked, update_if_unchanged
+from app.db.loader_profiles import PROFILE_UPLOAD, loader_options
+from app.db.models import Event, OutboxMessage, Team
+from app.db.models.outbox import (
+    KIND_CREATE_EVENT,
+    KIND_DELETE_EVENT,
+    KIND_SYNC_CLUB,
+    KIND_SYNC_TEAM,
+    KIND_UPDATE_EVENT,
+    STATUS_DONE,
+    STATUS_FAILED,
+    STATUS_IN_PROGRESS,
+    STATUS_PENDING,
+    now_utc,
+)
+from app.db.session import get_session
+from app.services.event_diff_sync import fingerprint, invalidate_snapshots, local_fields
+from app.services.event_uploader import BulkEventUploader
+from app.services.sync_pipeline import SyncPipeline
+from app.services.teamsnap_tokens import access_token_for_club
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class OutboxError(Exception):
+    """A message could not be applied; it is retried until max attempts."""
+
+    pass
+
+
+# ---------------- Enqueue helpers ---------------- #
+
+
+def new_job_id() -> str:
+    return str(uuid.uuid4())
+
+
+def enqueue_team_sync(
+    session: Session, team_id: int, club_id: Optional[str] = None, job_id: Optional[str] = None
+) -> str:
+    """
+    Returns the job ID the team's sync is tracked under; if a sync for the
+    team is already queued that job's ID is returned.
+    """
+    message = OutboxMessage.enqueue(
+        session,
+        job_id=job_id or new_job_id(),
+        kind=KIND_SYNC_TEAM,
+        payload={"team_id": team_id},
+        idempotency_key=f"{KIND_SYNC_TEAM}:{team_id}",
+        club_id=club_id,
+    )
+    return message.job_id  # type: ignore
+
+
+def enqueue_club_sync(session: Session, club_id: str, job_id: Optional[str] = None) -> str:
+    """
+    Queues one sync_team message per team so a large club is spread over
+    several batches and progress is reported per team.
+    """
+    job_id = job_id or new_job_id()
+    for team in Team.get_teams_by_club_id(session, club_id):  # type: ignore
+        enqueue_team_sync(session, team.team_id, club_id=club_id, job_id=job_id)  # type: ignore
+    return job_id
+
+
+# ---------------- Worker ---------------- #
+
+
+def client_for_club(session: Session, club_id: str) -> TeamSnapClient:
+    token = access_token_for_club(session, club_id)
+    if token is None:
+        raise OutboxError(f"No TeamSnap account linked to club {club_id}")
+    return TeamSnapClient(bearer_token=token, base_url=Config.TEAMSNP_API_BASE)
+
+
+class OutboxWorker:
+    """
+    Drains teamsnap_outbox in batches.
+
+    Each batch is leased in its own transaction, then messages are applied
+    per club: create_event messages a chunk at a time, everything else one
+    message at a time, each in its own transaction that also extends the
+    lease on the club's messages still waiting. The TeamSnap IDs a message
+    produces and the message's done status commit together, so a crash
+    never loses track of what was sent; an expired lease simply makes the
+    message claimable again. Handlers skip targets that already carry a
+    TeamSnap ID, which makes replays safe.
+    """
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        lease_seconds: Optional[int] = None,
+        create_chunk_size: Optional[int] = None,
+        client_factory: Callable[[Session, str], TeamSnapClient] = client_for_club,
+    ):
+        self.batch_size = batch_size or Config.OUTBOX_BATCH_SIZE
+        self.max_attempts = max_attempts or Config.OUTBOX_MAX_ATTEMPTS
+        self.lease_seconds = lease_seconds or Config.OUTBOX_LEASE_SEC
+        self.create_chunk_size = create_chunk_size or Config.OUTBOX_CREATE_CHUNK_SIZE
+        self.client_factory = client_factory
+
+    def _fail(self, message: OutboxMessage, error: str) -> None:
+        message.last_error = error[:4000]  # type: ignore
+        message.locked_until = None  # type: ignore
+        if (message.attempts or 0) >= self.max_attempts:
+            message.status = STATUS_FAILED  # type: ignore
+            logger.error(f"Outbox message {message.id} failed permanently: {error}")
+        else:
+            backoff = min(2 ** (message.attempts or 1) * 5, 900)
+            message.status = STATUS_PENDING  # type: ignore
+            message.available_at = now_utc() + timedelta(seconds=backoff)  # type: ignore
+            logger.warning(f"Outbox message {message.id} will retry in {backoff}s: {error}")
+
+    def _done(self, message: OutboxMessage, result: Any = None) -> None:
+        message.status = STATUS_DONE  # type: ignore
+        message.result = result  # type: ignore
+        message.last_error = None  # type: ignore
+        message.locked_until = None  # type: ignore
+
+    def _apply_sync(self, session: Session, client: TeamSnapClient, message: OutboxMessage) -> None:
+        pipeline = SyncPipeline(client)
+        if message.kind == KIND_SYNC_TEAM:
+            report = pipeline.sync_team(session, message.payload["team_id"])
+        else:
+            report = pipeline.sync_club(session, message.payload["club_id"])
+        result = report.as_dict()
+        if report.dependency_errors or report.events.failed:
+            # Whatever succeeded is kept; a retry only picks up the rest
+            message.result = result  # type: ignore
+            self._fail(message, "partial sync")
+            return
+        self._done(message, result)
+
+    def _apply_creates(
+        self, session: Session, client: TeamSnapClient, messages: List[OutboxMessage]
+    ) -> None:
+        by_event = {m.payload["event_id"]: m for m in messages}
+        events = (
+            session.query(Event)
+            .options(*loader_options(Event, PROFILE_UPLOAD))
+            .filter(Event.event_id.in_(list(by_event)))
+            .all()
+        )
+        pending = []
+        for event in events:
+            if event.uploaded and event.teamsnap_event_id:
+                self._done(by_event.pop(event.event_id), {"teamsnap_event_id": event.teamsnap_event_id})
+            else:
+                pending.append(event)
+        report = BulkEventUploader(client).upload(session, pending)
+        for result in report.results:
+            message = by_event.pop(result.event_id)
+            if result.event_id in report.unmatched:
+                message.status = STATUS_FAILED  # type: ignore
+                message.result = {"teamsnap_event_id": result.teamsnap_event_id}  # type: ignore
+                message.last_error = "event deleted during upload"  # type: ignore
+            elif result.ok:
+                self._done(message, {"teamsnap_event_id": result.teamsnap_event_id})
+            else:
+                self._fail(message, result.error or "upload failed")
+        for message in by_event.values():
+            message.status = STATUS_FAILED  # type: ignore
+            message.last_error = "event no longer exists"  # type: ignore
+
+    def _apply_update(
+        self, session: Session, client: TeamSnapClient, message: OutboxMessage
+    ) -> None:
+        event = session.get(Event, message.payload["event_id"])
+        if event is None or not event.teamsnap_event_id:
+            raise OutboxError("event is missing or not uploaded yet")
+        sent = {column: getattr(event, column) for column in Event.PAYLOAD_COLUMNS}
+        sent["synced_hash"] = event.synced_hash
+        local_hash = fingerprint(local_fields(event))
+        result = client.update_game(event.teamsnap_event_id, event.to_teamsnap_payload())  # type: ignore
+        if "error" in result:
+            raise OutboxError(result["error"])
+        invalidate_snapshots()
+        # Only if the row still holds what was sent; an edit made meanwhile
+        # has queued its own update_event message and stays flagged
+        update_if_unchanged(
+            session,
+            Event,
+            {event.event_id: {"updated": False, "synced_hash": local_hash}},  # type: ignore
+            {event.event_id: sent},  # type: ignore
+        )
+        self._done(message)
+
+    def _apply_one(self, session: Session, client: TeamSnapClient, message: OutboxMessage) -> None:
+        if message.kind in (KIND_SYNC_TEAM, KIND_SYNC_CLUB):
+            self._apply_sync(session, client, message)
+            return
+        if message.kind == KIND_DELETE_EVENT:
+            result = client.delete_game(message.payload["teamsnap_event_id"])
+            # 404: already gone, which is what we wanted
+            if "error" in result and result.get("status") != 404:
+                raise OutboxError(result["error"])
+            invalidate_snapshots()
+            self._done(message)
+            return
+        if message.kind == KIND_UPDATE_EVENT:
+            self._apply_update(session, client, message)
+            return
+        message.status = STATUS_FAILED  # type: ignore
+        message.last_error = f"unknown kind {message.kind!r}"  # type: ignore
+
+    @staticmethod
+    def _load(session: Session, message_ids: List[int]) -> List[OutboxMessage]:
+        return (
+            session.query(OutboxMessage)
+            .filter(OutboxMessage.id.in_(message_ids))
+            .order_by(OutboxMessage.id)
+            .all()
+        )
+
+    def _extend_lease(self, session: Session, message_ids: List[int]) -> None:
+        """Keeps messages still waiting in this batch from being reclaimed."""
+        if not message_ids:
+            return
+        session.query(OutboxMessage).filter(
+            OutboxMessage.id.in_(message_ids),
+            OutboxMessage.status == STATUS_IN_PROGRESS,
+        ).update(
+            {OutboxMessage.locked_until: now_utc() + timedelta(seconds=self.lease_seconds)},
+            synchronize_session=False,
+        )
+
+    def _process_club(self, club_id: Optional[str], message_ids: List[int]) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+
+        def tally(messages: List[OutboxMessage]) -> None:
+            for message in messages:
+                counts[message.status] = counts.get(message.status, 0) + 1  # type: ignore
+
+        with get_session() as session:
+            messages = self._load(session, message_ids)
+            try:
+                if club_id is None:
+                    raise OutboxError("message has no club_id")
+                client = self.client_factory(session, club_id)
+            except Exception as e:
+                for message in messages:
+                    self._fail(message, str(e))
+                tally(messages)
+                return counts
+            creates = [m.id for m in messages if m.kind == KIND_CREATE_EVENT]
+            others = [m.id for m in messages if m.kind != KIND_CREATE_EVENT]
+        waiting = creates + others
+
+        for chunk in chunked(creates, self.create_chunk_size):
+            waiting = waiting[len(chunk) :]
+            with get_session() as session:
+                messages = self._load(session, list(chunk))
+                try:
+                    self._apply_creates(session, client, messages)
+                except Exception as e:
+                    logger.exception("Outbox create batch raised")
+                    for message in messages:
+                        self._fail(message, str(e))
+                tally(messages)
+                self._extend_lease(session, waiting)
+
+        for message_id in others:
+            waiting = waiting[1:]
+            with get_session() as session:
+                message = session.get(OutboxMessage, message_id)
+                if message is None:
+                    continue
+                try:
+                    self._apply_one(session, client, message)
+                except Exception as e:
+                    self._fail(message, str(e))
+                tally([message])
+                self._extend_lease(session, waiting)
+        return counts
+
+    def run_once(self) -> Dict[str, int]:
+        with get_session() as session:
+            claimed = OutboxMessage.claim_batch(session, self.batch_size, self.lease_seconds)
+            groups: Dict[Optional[str], List[int]] = {}
+            for message in claimed:
+                groups.setdefault(message.club_id, []).append(message.id)  # type: ignore
+
+        totals: Dict[str, int] = {"claimed": sum(len(ids) for ids in groups.values())}
+        for club_id, ids in groups.items():
+            for status, count in self._process_club(club_id, ids).items():
+                totals[status] = totals.get(status, 0) + count
+        return totals
+
+    def drain(
+        self, max_batches: Optional[int] = None, deadline: Optional[float] = None
+    ) -> Dict[str, int]:
+        """
+        Runs batches until the outbox is empty, `max_batches` is reached or
+        the monotonic `deadline` passes.
+        """
+        totals: Dict[str, int] = {"batches": 0}
+        while max_batches is None or totals["batches"] < max_batches:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            counts = self.run_once()
+            if not counts["claimed"]:
+                break
+            totals["batches"] += 1
+            for status, count in counts.items():
+                totals[status] = totals.get(status, 0) + count
+        logger.info(f"Outbox drain finished: {totals}")
+        return totals
@@ -0,0 +1,231 @@
+from __future__ import annotations
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import logging
+import time
+
+from sqlalchemy.orm import Session
+
+from app.clients.teamsnap_client import TeamSnapClient
+from app.config import Config
+from app.db.loader_profiles import PROFILE_UPLOAD
+from app.db.models import Event, Location, Opponent, Team
+from app.db.query_budget import query_budget
+from app.services.event_diff_sync import invalidate_snapshots
+from app.services.event_uploader import EventUploadResult, UploadReport
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# ("opponent", opponent_id) or ("location", location_id)
+DepKey = Tuple[str, int]
+
+
+@dataclass
+class SyncReport:
+    opponents: Dict[int, str] = field(default_factory=dict)
+    locations: Dict[int, str] = field(default_factory=dict)
+    dependency_errors: Dict[DepKey, str] = field(default_factory=dict)
+    events: UploadReport = field(default_factory=UploadReport)
+    # Created in TeamSnap, but the local row was gone when IDs were written
+    unmatched_opponents: Set[int] = field(default_factory=set)
+    unmatched_locations: Set[int] = field(default_factory=set)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "opponents_created": len(self.opponents),
+            "locations_created": len(self.locations),
+            "dependency_errors": [
+                {"type": kind, "id": local_id, "error": error}
+                for (kind, local_id), error in self.dependency_errors.items()
+            ],
+            "unmatched_opponents": sorted(self.unmatched_opponents),
+            "unmatched_locations": sorted(self.unmatched_locations),
+            "events": self.events.as_dict(),
+        }
+
+
+class SyncPipeline:
+    """
+    Pushes a team's (or club's) pending opponents, locations and events to
+    TeamSnap in one pass.
+
+    Every missing opponent and location is created concurrently. Each event
+    is submitted the moment its own opponent and location resolve, without
+    waiting for the rest of the dependency stage. All TeamSnap IDs are
+    written back with one batched UPDATE per table at the end.
+
+    ORM objects are only touched on the calling thread; workers only do HTTP.
+    """
+
+    def __init__(self, client: TeamSnapClient, max_workers: Optional[int] = None):
+        self.client = client
+        self.max_workers = max(1, max_workers or Config.TEAMSNP_UPLOAD_WORKERS)
+
+    def sync_team(self, session: Session, team_id: int) -> SyncReport:
+        return self.run(session, [team_id])
+
+    def sync_club(self, session: Session, club_id: str) -> SyncReport:
+        teams = Team.get_teams_by_club_id(session, club_id)  # type: ignore
+        return self.run(session, [t.team_id for t in teams])
+
+    @staticmethod
+    def _call(fn: Callable[[Dict[str, Any]], Optional[str]], payload: Dict[str, Any]):
+        try:
+            remote_id = fn(payload)
+        except Exception as e:
+            logger.exception("TeamSnap create raised")
+            return None, str(e)
+        if not remote_id:
+            return None, "TeamSnap did not return an id"
+        return str(remote_id), None
+
+    def run(self, session: Session, team_ids: List[int]) -> SyncReport:
+        report = SyncReport()
+        started = time.perf_counter()
+
+        opponents: List[Opponent] = []
+        locations: List[Location] = []
+        events: List[Event] = []
+        for team_id in team_ids:
+            opponents.extend(
+                Opponent.get_opponents(session, team_id, profile=PROFILE_UPLOAD) or []
+            )
+            locations.extend(
+                Location.get_locations(session, team_id, profile=PROFILE_UPLOAD) or []
+            )
+            events.extend(Event.get_not_uploaded(session, team_id, profile=PROFILE_UPLOAD))
+
+        # Event -> unresolved dependency keys, and the reverse index
+        blocked_by: Dict[int, Set[DepKey]] = {}
+        dependents: Dict[DepKey, List[int]] = {}
+        events_by_id: Dict[int, Event] = {}
+        pending_deps: Set[DepKey] = {
+            ("opponent", o.opponent_id) for o in opponents  # type: ignore
+        } | {("location", l.location_id) for l in locations}  # type: ignore
+        for event in events:
+            events_by_id[event.event_id] = event  # type: ignore
+            deps = {
+                key
+                for key in (
+                    ("opponent", event.opponent_id),
+                    ("location", event.location_id),
+                )
+                if key in pending_deps
+            }
+            blocked_by[event.event_id] = deps  # type: ignore
+            for key in deps:
+                dependents.setdefault(key, []).append(event.event_id)  # type: ignore
+
+        futures: Dict[Future, Tuple[str, Any]] = {}
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="ts-sync"
+        ) as pool:
+
+            def submit_event(event_id: int) -> None:
+                event = events_by_id[event_id]
+                try:
+                    payload = event.to_teamsnap_payload(
+                        teamsnap_opponent_id=report.opponents.get(event.opponent_id),  # type: ignore
+                        teamsnap_location_id=report.locations.get(event.location_id),  # type: ignore
+                    )
+                except ValueError as e:
+                    report.events.results.append(
+                        EventUploadResult(event_id=event_id, error=str(e))
+                    )
+                    return
+                futures[pool.submit(self._call, self.client.create_event, payload)] = (
+                    "event",
+                    event_id,
+                )
+
+            # Rows arrive with the "upload" loader profile applied; anything
+            # above zero here is a lazy load of row.team per row.
+            with query_budget(0, "dependency payloads"):
+                for kind, rows, create in (
+                    ("opponent", opponents, self.client.create_opponent),
+                    ("location", locations, self.client.create_location),
+                ):
+                    for row in rows:
+                        key: DepKey = (kind, getattr(row, f"{kind}_id"))
+                        try:
+                            payload = row.to_teamsnap_payload()
+                        except ValueError as e:
+                            report.dependency_errors[key] = str(e)
+                            continue
+                        futures[pool.submit(self._call, create, payload)] = ("dep", key)
+
+            # Events whose dependencies already exist (or failed to build)
+            for key, error in report.dependency_errors.items():
+                for event_id in dependents.get(key, []):
+                    if blocked_by.pop(event_id, None) is not None:
+                        report.events.results.append(
+                            EventUploadResult(
+                                event_id=event_id, error=f"{key[0]} failed: {error}"
+                            )
+                        )
+            for event_id in [e for e, deps in blocked_by.items() if not deps]:
+                blocked_by.pop(event_id)
+                submit_event(event_id)
+
+            while futures:
+                done, _ = wait(list(futures), return_when=FIRST_COMPLETED)
+                for future in done:
+                    tag, ident = futures.pop(future)
+                    remote_id, error = future.result()
+                    if tag == "event":
+                        report.events.results.append(
+                            EventUploadResult(
+                                event_id=ident, teamsnap_event_id=remote_id, error=error
+                            )
+                        )
+                        continue
+
+                    kind, local_id = ident
+                    if remote_id is None:
+                        report.dependency_errors[ident] = error  # type: ignore
+                    elif kind == "opponent":
+                        report.opponents[local_id] = remote_id
+                    else:
+                        report.locations[local_id] = remote_id
+
+                    for event_id in dependents.get(ident, []):
+                        deps = blocked_by.get(event_id)
+                        if deps is None:
+                            continue
+                        if remote_id is None:
+                            blocked_by.pop(event_id)
+                            report.events.results.append(
+                                EventUploadResult(
+                                    event_id=event_id, error=f"{kind} failed: {error}"
+                                )
+                            )
+                            continue
+                        deps.discard(ident)
+                        if not deps:
+                            blocked_by.pop(event_id)
+                            submit_event(event_id)
+
+        report.unmatched_opponents = Opponent.bulk_update_opponents(
+            session, report.opponents
+        )
+        report.unmatched_locations = Location.bulk_update_locations(
+            session, report.locations
+        )
+        report.events.unmatched = Event.bulk_update_uploaded_status(
+            session,
+            {r.event_id: r.teamsnap_event_id for r in report.events.created},  # type: ignore
+        )
+        if report.events.created:
+            invalidate_snapshots()
+        report.events.elapsed_seconds = time.perf_counter() - started
+
+        logger.info(
+            f"Sync of teams {team_ids}: {len(report.opponents)} opponents, "
+            f"{len(report.locations)} locations, "
+            f"{len(report.events.succeeded)}/{len(report.events.results)} events "
+            f"in {report.events.elapsed_seconds:.2f}s"
+        )
+        return report
@@ -0,0 +1,303 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+import threading
+import time
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.api.utils import decrypt, decrypt_many, encrypt_many
+from app.clients.teamsnap_client import refresh_access_token
+from app.config import Config
+from app.db.bulk import update_if_unchanged
+from app.db.models import TeamSnapAccount
+from app.db.session import get_isolated_session, get_session
+from app.security.token_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+RefreshFn = Callable[[str], Dict[str, Any]]
+
+
+def now_utc() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _aware(value: datetime) -> datetime:
+    if value.tzinfo is None:  # SQLite drops tzinfo
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+# ---------------- Hot token cache ---------------- #
+
+_tokens: Optional[TTLCache[str]] = None
+_tokens_lock = threading.Lock()
+
+
+def get_club_token_cache() -> TTLCache[str]:
+    """club_id -> decrypted access token, kept until TEAMSNP_TOKEN_SKEW_SEC before expiry."""
+    global _tokens
+    if _tokens is None:
+        with _tokens_lock:
+            if _tokens is None:
+                # The per-entry TTL (time left on the token) is what applies
+                _tokens = TTLCache(Config.TEAMSNP_TOKEN_CACHE_SIZE, ttl=float("inf"))
+    return _tokens
+
+
+def _cache_token(club_id: str, token: str, expires_at: datetime) -> None:
+    ttl = (_aware(expires_at) - now_utc()).total_seconds() - Config.TEAMSNP_TOKEN_SKEW_SEC
+    get_club_token_cache().put(club_id, token, ttl=ttl)
+
+
+def forget_club_token(club_id: str) -> None:
+    get_club_token_cache().pop(club_id)
+
+
+def access_token_for_club(session: Session, club_id: str) -> Optional[str]:
+    """
+    A usable access token for the club: from the in-process cache, else
+    decrypted from its latest TeamSnap account (refreshed first if it is
+    about to expire; the new tokens commit at once on their own session,
+    whatever becomes of the caller's transaction). None if the club has no
+    linked account.
+    """
+    token = get_club_token_cache().get(club_id)
+    if token is not None:
+        return token
+
+    account = (
+        session.query(TeamSnapAccount)
+        .filter(TeamSnapAccount.club_id == club_id)
+        .order_by(TeamSnapAccount.access_token_expires_at.desc())
+        .first()
+    )
+    if account is None:
+        return None
+    skew = timedelta(seconds=Config.TEAMSNP_TOKEN_SKEW_SEC)
+    if _aware(account.access_token_expires_at) - skew <= now_utc() and account.refresh_token_enc:  # type: ignore
+        token = TeamSnapTokenRefresher().refresh_account(account)
+        if token is not None:
+            return token
+        logger.warning(f"Inline token refresh failed for club {club_id}; using the stored token")
+
+    token = decrypt(account.access_token_enc)  # type: ignore
+    _cache_token(club_id, token, account.access_token_expires_at)  # type: ignore
+    return token
+
+
+# ---------------- Background refresher ---------------- #
+
+
+@dataclass
+class RefreshReport:
+    scanned: int = 0
+    refreshed: int = 0
+    failed: int = 0
+    conflicts: int = 0  # refreshed elsewhere between our read and write
+    batches: int = 0
+    done: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class TeamSnapTokenRefresher:
+    """
+    Refreshes TeamSnap access tokens that expire within `window` before
+    sync workers hit them.
+
+    Due accounts are paged by (access_token_expires_at, id) through the
+    expiry index. Each batch is refreshed concurrently against /oauth/token
+    outside any transaction, then all its new tokens are re-encrypted and
+    written back in one transaction, and put in the hot per-club cache.
+    Each write only applies if the account still holds the refresh token
+    that was read, so a concurrent refresh is never overwritten with older
+    tokens. Accounts whose refresh fails keep their tokens and are retried
+    on the next run.
+    """
+
+    def __init__(
+        self,
+        window: Optional[timedelta] = None,
+        batch_size: Optional[int] = None,
+        workers: Optional[int] = None,
+        refresh_fn: RefreshFn = refresh_access_token,
+    ):
+        self.window = window or timedelta(seconds=Config.TEAMSNP_TOKEN_REFRESH_WINDOW_SEC)
+        self.batch_size = batch_size or Config.TEAMSNP_TOKEN_REFRESH_BATCH_SIZE
+        self.workers = workers or Config.TEAMSNP_TOKEN_REFRESH_WORKERS
+        self.refresh_fn = refresh_fn
+
+    def due_batch(
+        self, session: Session, cutoff: datetime, after: Optional[Tuple[datetime, int]]
+    ) -> List[Any]:
+        query = session.query(
+            TeamSnapAccount.id,
+            TeamSnapAccount.club_id,
+            TeamSnapAccount.refresh_token_enc,
+            TeamSnapAccount.access_token_expires_at,
+        ).filter(
+            TeamSnapAccount.access_token_expires_at < cutoff,
+            TeamSnapAccount.refresh_token_enc.isnot(None),
+        )
+        if after is not None:
+            expires_at, account_id = after
+            query = query.filter(
+                or_(
+                    TeamSnapAccount.access_token_expires_at > expires_at,
+                    and_(
+                        TeamSnapAccount.access_token_expires_at == expires_at,
+                        TeamSnapAccount.id > account_id,
+                    ),
+                )
+            )
+        return (
+            query.order_by(TeamSnapAccount.access_token_expires_at, TeamSnapAccount.id)
+            .limit(self.batch_size)
+            .all()
+        )
+
+    @staticmethod
+    def _decrypt(encrypted: List[str]) -> List[Optional[str]]:
+        try:
+            return decrypt_many(encrypted)
+        except Exception:
+            # Find the unreadable ones rather than failing the whole batch
+            plains: List[Optional[str]] = []
+            for value in encrypted:
+                try:
+                    plains.append(decrypt(value))
+                except Exception:
+                    plains.append(None)
+            return plains
+
+    def _refresh_one(self, refresh_token: Optional[str]) -> Dict[str, Any]:
+        if refresh_token is None:
+            return {"error": "refresh token could not be decrypted", "status": None}
+        return self.refresh_fn(refresh_token)
+
+    def _exchange(
+        self, refresh_tokens: List[Optional[str]], pool: Optional[ThreadPoolExecutor] = None
+    ) -> List[Dict[str, Any]]:
+        if pool is None or len(refresh_tokens) == 1:
+            return [self._refresh_one(token) for token in refresh_tokens]
+        return list(pool.map(self._refresh_one, refresh_tokens))
+
+    def _new_values(
+        self,
+        rows: List[Any],
+        results: List[Dict[str, Any]],
+        plains: List[Optional[str]],
+        report: RefreshReport,
+    ) -> Tuple[Dict[int, Dict[str, Any]], Dict[int, Tuple[str, str, datetime]]]:
+        """
+        Column values per refreshed account id, plus (club_id, plaintext
+        access token, expiry) for the cache.
+        """
+        now = now_utc()
+        fresh: List[Tuple[Any, str, str, datetime]] = []
+        for row, result, old_refresh in zip(rows, results, plains):
+            if "error" in result or not result.get("access_token"):
+                report.failed += 1
+                logger.warning(
+                    f"TeamSnap token refresh failed for account {row.id} "
+                    f"(club {row.club_id}): {result.get('status')} {result.get('error')}"
+                )
+                continue
+            expires_at = now + timedelta(seconds=int(result.get("expires_in", 3600)))
+            fresh.append(
+                (
+                    row,
+                    result["access_token"],
+                    result.get("refresh_token") or old_refresh,  # rotated or kept
+                    expires_at,
+                )
+            )
+        access_enc = encrypt_many([f[1] for f in fresh])
+        refresh_enc = encrypt_many([f[2] for f in fresh])
+        values: Dict[int, Dict[str, Any]] = {}
+        cached: Dict[int, Tuple[str, str, datetime]] = {}
+        for (row, access, _, expires_at), a_enc, r_enc in zip(fresh, access_enc, refresh_enc):
+            values[row.id] = {
+                "access_token_enc": a_enc,
+                "refresh_token_enc": r_enc,
+                "access_token_expires_at": expires_at,
+            }
+            cached[row.id] = (row.club_id, access, expires_at)
+        return values, cached
+
+    def refresh_account(self, account: Any) -> Optional[str]:
+        """
+        Refreshes one account now (`account` as read by the caller) and
+        commits the new tokens straight away on an isolated session.
+        Returns the new plaintext access token, or None on failure.
+        """
+        plains = self._decrypt([account.refresh_token_enc])
+        results = self._exchange(plains)
+        values, cached = self._new_values([account], results, plains, RefreshReport())
+        if not values:
+            return None
+        with get_isolated_session() as session:
+            skipped = update_if_unchanged(
+                session,
+                TeamSnapAccount,
+                values,
+                {account.id: {"refresh_token_enc": account.refresh_token_enc}},
+            )
+        club_id, token, expires_at = cached[account.id]
+        if skipped:
+            # Still a valid token, but the stored one is newer; don't cache ours
+            logger.info(f"TeamSnap account {account.id} was refreshed concurrently")
+        else:
+            _cache_token(club_id, token, expires_at)
+        return token
+
+    def run(
+        self, max_batches: Optional[int] = None, deadline: Optional[float] = None
+    ) -> RefreshReport:
+        """
+        Refreshes every account due within the window, max_batches batches,
+        or until time.monotonic() passes deadline.
+        """
+        report = RefreshReport()
+        cutoff = now_utc() + self.window
+        after: Optional[Tuple[datetime, int]] = None
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="teamsnap-token"
+        ) as pool:
+            while max_batches is None or report.batches < max_batches:
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                with get_session() as session:
+                    rows = self.due_batch(session, cutoff, after)
+                if not rows:
+                    report.done = True
+                    break
+                report.scanned += len(rows)
+                report.batches += 1
+                after = (rows[-1].access_token_expires_at, rows[-1].id)
+
+                plains = self._decrypt([row.refresh_token_enc for row in rows])
+                results = self._exchange(plains, pool)
+                values, cached = self._new_values(rows, results, plains, report)
+                if values:
+                    read = {row.id: {"refresh_token_enc": row.refresh_token_enc} for row in rows}
+                    with get_session() as session:
+                        skipped = update_if_unchanged(session, TeamSnapAccount, values, read)
+                    for account_id, (club_id, token, expires_at) in cached.items():
+                        if account_id not in skipped:
+                            _cache_token(club_id, token, expires_at)
+                    report.refreshed += len(values) - len(skipped)
+                    report.conflicts += len(skipped)
+                if len(rows) < self.batch_size:
+                    report.done = True
+                    break
+        logger.info(f"TeamSnap token refresh: {report.to_dict()}")
+        return report
@@ -0,0 +1,108 @@
+from __future__ import annotations
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+import logging
+import time
+
+from sqlalchemy.orm import Session
+
+from app.api.utils import is_current, rotate
+from app.config import Config
+from app.db.bulk import update_if_unchanged
+from app.db.models import TeamSnapAccount
+from app.db.session import get_session
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+TOKEN_COLUMNS = ("access_token_enc", "refresh_token_enc")
+
+
+@dataclass
+class ReencryptReport:
+    scanned: int = 0
+    rotated: int = 0  # rows rewritten under the newest key
+    conflicts: int = 0  # rows changed by another writer before ours landed
+    unreadable: int = 0  # rows with a token no key in the keyring opens
+    batches: int = 0
+    last_id: int = 0
+    done: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class TokenReencryptor:
+    """
+    Rewrites TeamSnapAccount tokens still encrypted under an older key of
+    the TOKEN_ENC_SECRETS keyring. Walks accounts by id in batches, each
+    committed on its own, so a run can stop at a deadline and resume from
+    report.last_id. A row is only rewritten if both tokens are still the
+    ones read, so a token refresh in between is never undone; such rows
+    are already on the newest key.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None):
+        self.batch_size = batch_size or Config.TOKEN_REENCRYPT_BATCH_SIZE
+
+    def reencrypt_batch(self, session: Session, after_id: int, report: ReencryptReport) -> int:
+        """Rotates one batch of accounts with id > after_id; returns the batch size."""
+        rows = (
+            session.query(
+                TeamSnapAccount.id,
+                TeamSnapAccount.access_token_enc,
+                TeamSnapAccount.refresh_token_enc,
+            )
+            .filter(TeamSnapAccount.id > after_id)
+            .order_by(TeamSnapAccount.id)
+            .limit(self.batch_size)
+            .all()
+        )
+        values: Dict[int, Dict[str, Any]] = {}
+        read: Dict[int, Dict[str, Any]] = {}
+        for row in rows:
+            report.scanned += 1
+            report.last_id = row.id
+            try:
+                changes = {
+                    column: rotate(token)
+                    for column, token in zip(TOKEN_COLUMNS, row[1:])
+                    if token is not None and not is_current(token)
+                }
+            except Exception as e:  # cryptography.fernet.InvalidToken
+                report.unreadable += 1
+                logger.warning(f"TeamSnapAccount id={row.id} has an unreadable token: {e!r}")
+                continue
+            if changes:
+                values[row.id] = changes
+                read[row.id] = dict(zip(TOKEN_COLUMNS, row[1:]))
+
+        if values:
+            skipped = update_if_unchanged(session, TeamSnapAccount, values, read)
+            report.rotated += len(values) - len(skipped)
+            report.conflicts += len(skipped)
+        return len(rows)
+
+    def run(
+        self,
+        after_id: int = 0,
+        max_batches: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ) -> ReencryptReport:
+        """
+        Re-encrypts until every account is on the newest key, max_batches
+        have run, or time.monotonic() passes deadline.
+        """
+        report = ReencryptReport(last_id=after_id)
+        while max_batches is None or report.batches < max_batches:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            with get_session() as session:
+                count = self.reencrypt_batch(session, report.last_id, report)
+            if count:
+                report.batches += 1
+            if count < self.batch_size:
+                report.done = True
+                break
+        logger.info(f"Token re-encryption: {report.to_dict()}")
+        return report
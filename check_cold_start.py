@@ -0,0 +1,101 @@
+# check_cold_start.py
+"""
+Cold-start import budget for the Lambda entry point.
+
+    python check_cold_start.py                      # fail if over budget
+    python check_cold_start.py --profile --top 25   # per-module import cost
+    python check_cold_start.py --module wsgi --budget-ms 800
+
+Each run imports the module in a fresh interpreter with `-X importtime`,
+so nothing is cached between samples. The check uses the fastest of
+--runs samples to keep noise from failing it.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+DEFAULT_MODULE = "lambda_handler"
+DEFAULT_BUDGET_MS = float(os.getenv("COLD_START_BUDGET_MS", "250"))
+
+# (module, self_us, cumulative_us, depth)
+ImportRow = Tuple[str, int, int, int]
+
+
+def import_times(module: str) -> List[ImportRow]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if proc.returncode != 0:
+        tail = "\n".join(proc.stderr.strip().splitlines()[-5:])
+        raise SystemExit(f"Importing {module} failed:\n{tail}")
+
+    rows: List[ImportRow] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def total_ms(rows: List[ImportRow], module: str) -> float:
+    for name, _, cumulative, _ in rows:
+        if name == module:
+            return cumulative / 1000.0
+    return sum(cumulative for _, _, cumulative, depth in rows if depth == 0) / 1000.0
+
+
+def by_package(rows: List[ImportRow]) -> Dict[str, float]:
+    totals: Dict[str, float] = {}
+    for name, self_us, _, _ in rows:
+        top = name.split(".")[0]
+        totals[top] = totals.get(top, 0.0) + self_us / 1000.0
+    return totals
+
+
+def profile(module: str, top: int) -> None:
+    rows = import_times(module)
+    print(f"Cold import of {module}: {total_ms(rows, module):.1f} ms\n")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_us, cumulative, depth in sorted(rows, key=lambda r: -r[2])[:top]:
+        print(f"{cumulative / 1000:14.1f} {self_us / 1000:9.1f}  {'  ' * depth}{name}")
+    print(f"\n{'self ms':>14}  top-level package")
+    for package, ms in sorted(by_package(rows).items(), key=lambda kv: -kv[1])[:top]:
+        print(f"{ms:14.1f}  {package}")
+
+
+def check(module: str, budget_ms: float, runs: int) -> bool:
+    samples = [total_ms(import_times(module), module) for _ in range(max(1, runs))]
+    best = min(samples)
+    ok = best <= budget_ms
+    print(
+        f"{'✅' if ok else '❌'} cold import of {module}: {best:.1f} ms "
+        f"(budget {budget_ms:.0f} ms, samples {', '.join(f'{s:.0f}' for s in samples)})"
+    )
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cold-start import budget")
+    parser.add_argument("--module", default=DEFAULT_MODULE)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--profile", action="store_true", help="print per-module import cost")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.profile:
+        profile(args.module, args.top)
+        return
+    if not check(args.module, args.budget_ms, args.runs):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
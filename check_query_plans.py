@@ -0,0 +1,167 @@
+# check_query_plans.py
+"""
+Runs EXPLAIN for the model lookups on hot paths and fails if any of them
+would scan a whole table instead of using an index.
+
+    python check_query_plans.py                  # against EZ_SCHEDULE_DB_URI
+    EZ_SCHEDULE_DB_URI=sqlite:///:memory: python check_query_plans.py --create-schema
+
+Supports MySQL (EXPLAIN), SQLite (EXPLAIN QUERY PLAN) and PostgreSQL
+(EXPLAIN with enable_seqscan off, so tiny tables don't hide missing indexes).
+"""
+import argparse
+import sys
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Connection
+
+from app.db.base import Base
+from app.db.models import (
+    Event,
+    Location,
+    OAuthState,
+    Opponent,
+    RefreshToken,
+    RevokedSession,
+    TeamSnapAccount,
+    UniqueLocation,
+    UniqueTeam,
+)
+from app.db.session import engine
+
+SAMPLE_DATE = datetime(2025, 5, 1, 18, 0)
+
+
+def hot_paths() -> Dict[str, Any]:
+    """The WHERE clauses used by the model methods, with sample values."""
+    paths: Dict[str, Any] = {
+        "Event.get_or_create": select(Event.event_id).where(
+            Event.opponent_id == 1,
+            Event.location_id == 1,
+            Event.start_date == SAMPLE_DATE,
+        ),
+        "Event.bulk_get_or_create": select(Event.event_id).where(
+            Event.start_date.in_([SAMPLE_DATE, datetime(2025, 5, 2, 18, 0)])
+        ),
+        "Event.get_not_uploaded": select(Event.event_id).where(Event.uploaded == False),
+        "Event.get_not_uploaded(team)": select(Event.event_id).where(
+            Event.uploaded == False, Event.team_id == 1
+        ),
+        "Opponent.get_or_create": select(Opponent.opponent_id).where(
+            Opponent.name == "Rovers", Opponent.team_id == 1
+        ),
+        "Opponent.bulk_get_or_create": select(Opponent.opponent_id).where(
+            Opponent.team_id.in_([1, 2]), Opponent.name.in_(["Rovers", "United"])
+        ),
+        "UniqueTeam.get_or_create": select(UniqueTeam.team_id).where(
+            UniqueTeam.name == "U12 Boys", UniqueTeam.division_id == 1
+        ),
+        "RefreshToken.rotate(child)": select(RefreshToken.jti).where(
+            RefreshToken.parent_jti == "x", RefreshToken.revoked_at.is_(None)
+        ),
+        "RefreshToken.delete_expired": select(RefreshToken.jti).where(
+            RefreshToken.expires_at < SAMPLE_DATE
+        ),
+        "RevokedSession.revoked_since": select(RevokedSession.family_id).where(
+            RevokedSession.revoked_at > SAMPLE_DATE
+        ),
+        "OAuthState.delete_expired": select(OAuthState.id).where(
+            OAuthState.expires_at < SAMPLE_DATE
+        ),
+        "RevokedSession.delete_expired": select(RevokedSession.family_id).where(
+            RevokedSession.expires_at < SAMPLE_DATE
+        ),
+        "TeamSnapTokenRefresher.due_batch": select(TeamSnapAccount.id)
+        .where(TeamSnapAccount.access_token_expires_at < SAMPLE_DATE)
+        .order_by(TeamSnapAccount.access_token_expires_at, TeamSnapAccount.id),
+    }
+    paths["UniqueLocation.get_with_coordinates(since)"] = select(
+        UniqueLocation.location_id
+    ).where(UniqueLocation.coordinates_updated_at > SAMPLE_DATE)
+    for field in Location.MATCH_FIELDS:
+        paths[f"Location.find_existing({field})"] = select(Location.location_id).where(
+            Location.team_id == 1, getattr(Location, field) == "x"
+        )
+    for field in UniqueLocation.MATCH_FIELDS:
+        paths[f"UniqueLocation.find_existing({field})"] = select(
+            UniqueLocation.location_id
+        ).where(getattr(UniqueLocation, field) == "x")
+    return paths
+
+
+def _explain_mysql(conn: Connection, sql: str) -> Tuple[bool, str]:
+    rows = conn.execute(text(f"EXPLAIN {sql}")).mappings().all()
+    # type=ALL reads the whole table and type=index the whole index. Any
+    # other access must name the key it chose; rows without a type (e.g.
+    # "Impossible WHERE") and one-row system tables read nothing.
+    scans = [
+        r
+        for r in rows
+        if r["type"] in ("ALL", "index")
+        or (r["type"] not in (None, "system") and r["key"] is None)
+    ]
+    plan = "; ".join(f"{r['table']}: type={r['type']} key={r['key']}" for r in rows)
+    return not scans, plan
+
+
+def _explain_sqlite(conn: Connection, sql: str) -> Tuple[bool, str]:
+    details = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    # "SCAN t USING COVERING INDEX" still reads every row of the index
+    scans = [d for d in details if d.startswith("SCAN") and "CONSTANT ROW" not in d]
+    return not scans, "; ".join(details)
+
+
+def _explain_postgresql(conn: Connection, sql: str) -> Tuple[bool, str]:
+    conn.execute(text("SET enable_seqscan = off"))
+    lines = [row[0] for row in conn.execute(text(f"EXPLAIN {sql}"))]
+    return not any("Seq Scan" in line for line in lines), " | ".join(l.strip() for l in lines)
+
+
+EXPLAINERS: Dict[str, Callable[[Connection, str], Tuple[bool, str]]] = {
+    "mysql": _explain_mysql,
+    "sqlite": _explain_sqlite,
+    "postgresql": _explain_postgresql,
+}
+
+
+def check(create_schema: bool = False) -> List[str]:
+    """Returns the names of hot paths that would do a full table scan."""
+    dialect = engine.dialect
+    explain = EXPLAINERS.get(dialect.name)
+    if explain is None:
+        raise SystemExit(f"No EXPLAIN support for dialect {dialect.name!r}")
+    if create_schema:
+        Base.metadata.create_all(bind=engine)
+
+    failures = []
+    with engine.connect() as conn:
+        for name, stmt in hot_paths().items():
+            sql = str(stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+            ok, plan = explain(conn, sql)
+            print(f"{'ok  ' if ok else 'SCAN'} {name}: {plan}")
+            if not ok:
+                failures.append(name)
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check hot-path query plans for full scans")
+    parser.add_argument(
+        "--create-schema", action="store_true", help="create tables from the models first"
+    )
+    args = parser.parse_args()
+    failures = check(create_schema=args.create_schema)
+    if failures:
+        print(f"❌ {len(failures)} hot path(s) would scan a full table: {', '.join(failures)}")
+        sys.exit(1)
+    print("✅ All hot paths are index-backed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,5 +2,6 @@
 from apig_wsgi import make_lambda_handler
 from app import create_app
 
-app = create_app()
+# Blueprints (and SQLAlchemy, bcrypt, cryptography...) load on first use
+app = create_app(lazy=True)
 handler = make_lambda_handler(app)
@@ -0,0 +1,61 @@
+# maintenance_handler.py
+"""
+Periodic sweep of expired rows (see app.services.maintenance.TASKS):
+abandoned OAuth states, refresh tokens and revoked sessions.
+
+Lambda: schedule `maintenance_handler.handler` (e.g. hourly from
+EventBridge). Locally: `python maintenance_handler.py [--task NAME ...]`.
+"""
+import argparse
+import json
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.handlers import deadline_from
+from app.logging_cfg import configure_logging
+from app.services.maintenance import TASKS, compact
+
+configure_logging()
+
+
+def handler(event, context):
+    """
+    Event (optional): { "tasks": ["oauth_states"], "batch_size": 500, "max_batches": 100,
+                        "exact_counts": false }
+    Returns rows deleted, sweep duration and remaining table size per task.
+    """
+    event = event or {}
+    deadline = deadline_from(context)
+    report = compact(
+        tasks=event.get("tasks"),
+        batch_size=event.get("batch_size"),
+        max_batches=event.get("max_batches"),
+        deadline=deadline,
+        exact_counts=bool(event.get("exact_counts")),
+    )
+    return {"ok": True, **report.to_dict()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Delete expired rows")
+    parser.add_argument("--task", action="append", choices=sorted(TASKS), help="default: all")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--batches", type=int, default=None, help="max batches per task")
+    parser.add_argument(
+        "--exact-counts", action="store_true", help="report rows left with COUNT(*)"
+    )
+    args = parser.parse_args()
+
+    report = compact(
+        tasks=args.task,
+        batch_size=args.batch_size,
+        max_batches=args.batches,
+        exact_counts=args.exact_counts,
+    )
+    print(json.dumps(report.to_dict()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# reencrypt_handler.py
+"""
+Re-encrypts stored TeamSnap tokens under the newest TOKEN_ENC_SECRETS key.
+
+Rotation: prepend the new secret to TOKEN_ENC_SECRETS (keep the old ones),
+deploy, run this until it reports done, then remove the old secrets.
+
+Lambda: invoke `reencrypt_handler.handler`; pass the returned last_id back
+as after_id to resume. Locally: `python reencrypt_handler.py`.
+"""
+import argparse
+import json
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.handlers import deadline_from
+from app.logging_cfg import configure_logging
+from app.services.token_reencrypt import TokenReencryptor
+
+configure_logging()
+
+
+def handler(event, context):
+    """
+    Event (optional): { "after_id": 0, "max_batches": 10, "batch_size": 200 }
+    """
+    event = event or {}
+    deadline = deadline_from(context)
+    job = TokenReencryptor(batch_size=event.get("batch_size"))
+    report = job.run(
+        after_id=int(event.get("after_id") or 0),
+        max_batches=event.get("max_batches"),
+        deadline=deadline,
+    )
+    return {"ok": True, **report.to_dict()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-encrypt TeamSnap tokens")
+    parser.add_argument("--after-id", type=int, default=0, help="resume after this account id")
+    parser.add_argument("--batches", type=int, default=None, help="max batches to run")
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    job = TokenReencryptor(batch_size=args.batch_size)
+    report = job.run(after_id=args.after_id, max_batches=args.batches)
+    print(json.dumps(report.to_dict()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# token_refresh_handler.py
+"""
+Refreshes TeamSnap access tokens before they expire.
+
+Lambda: schedule `token_refresh_handler.handler` more often than
+TEAMSNP_TOKEN_REFRESH_WINDOW_SEC (e.g. every 5 minutes for the default
+15-minute window). Locally: `python token_refresh_handler.py`.
+"""
+import argparse
+import json
+from datetime import timedelta
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.handlers import deadline_from
+from app.logging_cfg import configure_logging
+from app.services.teamsnap_tokens import TeamSnapTokenRefresher
+
+configure_logging()
+
+
+def handler(event, context):
+    """
+    Event (optional): { "window_sec": 900, "batch_size": 50, "max_batches": 10 }
+    """
+    event = event or {}
+    deadline = deadline_from(context)
+    window = event.get("window_sec")
+    refresher = TeamSnapTokenRefresher(
+        window=timedelta(seconds=window) if window else None,
+        batch_size=event.get("batch_size"),
+    )
+    report = refresher.run(max_batches=event.get("max_batches"), deadline=deadline)
+    return {"ok": True, **report.to_dict()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Refresh expiring TeamSnap tokens")
+    parser.add_argument("--window-sec", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--batches", type=int, default=None, help="max batches to run")
+    args = parser.parse_args()
+
+    refresher = TeamSnapTokenRefresher(
+        window=timedelta(seconds=args.window_sec) if args.window_sec else None,
+        batch_size=args.batch_size,
+    )
+    report = refresher.run(max_batches=args.batches)
+    print(json.dumps(report.to_dict()))
+
+
+if __name__ == "__main__":
+    main()
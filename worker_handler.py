@@ -0,0 +1,54 @@
+# worker_handler.py
+"""
+TeamSnap outbox worker.
+
+Lambda: schedule `worker_handler.handler` (e.g. every minute, or from an
+SQS/EventBridge trigger). Locally: `python worker_handler.py [--batches N]`.
+"""
+import argparse
+import json
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.handlers import deadline_from
+from app.logging_cfg import configure_logging
+from app.services.outbox_worker import OutboxWorker
+
+configure_logging()
+
+
+def handler(event, context):
+    """
+    Event (optional): { "max_batches": 10, "batch_size": 50 }
+    """
+    event = event or {}
+    deadline = deadline_from(context)
+    worker = OutboxWorker(batch_size=event.get("batch_size"))
+    totals = worker.drain(max_batches=event.get("max_batches"), deadline=deadline)
+    return {"ok": True, **totals}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Drain the TeamSnap outbox")
+    parser.add_argument("--batches", type=int, default=None, help="max batches to run")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument(
+        "--loop", action="store_true", help="keep polling instead of exiting when empty"
+    )
+    parser.add_argument("--interval", type=float, default=5.0, help="poll interval with --loop")
+    args = parser.parse_args()
+
+    worker = OutboxWorker(batch_size=args.batch_size)
+    while True:
+        totals = worker.drain(max_batches=args.batches)
+        print(json.dumps(totals))
+        if not args.loop:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()